@@ -1,8 +1,8 @@
 from utils.gcp.gcs import get_file
-from agent.config import GCPConfig
+from agent.config import get_gcp_config
 
-# Instantiate GCPConfig at the module level
-gcp_config = GCPConfig()
+# GCPConfig shared by the whole process
+gcp_config = get_gcp_config()
 
 
 def load_system_prompt():
@@ -1,6 +1,7 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from pydantic import Field, SecretStr, PrivateAttr
-from typing import Annotated
+from typing import Annotated, Literal
 from loguru import logger
 from utils.gcp.secret_manager import get_secret
 
@@ -60,6 +61,20 @@ class GCPConfig(BaseSettings, validate_assignment=True):
             description="Name of the column representing the PK",
         ),
     ]
+    BQ_WRITE_MODE: Annotated[
+        Literal["streaming", "batch"],
+        Field(
+            default="batch",
+            description="How rows are written to BigQuery: batch uses a single load job per write, streaming the streaming insert API. Single rows (add_row) are always streamed",
+        ),
+    ]
+    BQ_LOAD_FORMAT: Annotated[
+        Literal["ndjson", "parquet"],
+        Field(
+            default="ndjson",
+            description="Format of the files sent to the load jobs, if BQ_WRITE_MODE is batch. parquet needs pyarrow",
+        ),
+    ]
     BUCKET_NAME: Annotated[
         str,
         Field(
@@ -99,6 +114,18 @@ class GCPConfig(BaseSettings, validate_assignment=True):
         extra = "allow"
 
 
+@lru_cache(maxsize=1)
+def get_gcp_config() -> GCPConfig:
+    """
+    Gets the GCPConfig, read from the environment and the .env file on the first call and
+    shared by the whole process
+
+    Returns:
+        GCPConfig -> The config
+    """
+    return GCPConfig()
+
+
 class AgentConfig(BaseSettings, validate_assignment=True):
     """
     Class that holds configuration values for the agent, it requires to assign
@@ -106,7 +133,7 @@ class AgentConfig(BaseSettings, validate_assignment=True):
     """
 
     # Private attributes cannot be added in Annotated
-    _CLOUD_PROVIDER: GCPConfig = PrivateAttr(default=GCPConfig())
+    _CLOUD_PROVIDER: GCPConfig = PrivateAttr(default_factory=get_gcp_config)
     _GEMINI_API_KEY: SecretStr = PrivateAttr(default=SecretStr("dummy-api-key"))
 
     # Public attributes
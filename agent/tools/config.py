@@ -3,7 +3,7 @@ from pydantic_settings import BaseSettings
 from pydantic import SecretStr, PrivateAttr
 from loguru import logger
 
-from agent.config import GCPConfig
+from agent.config import GCPConfig, get_gcp_config
 
 
 class GCPToolConfig(ABC, BaseSettings):
@@ -12,7 +12,7 @@ class GCPToolConfig(ABC, BaseSettings):
     It handles the loading of the API key from the secret manager.
     """
 
-    _CLOUD_PROVIDER: GCPConfig = PrivateAttr(default=GCPConfig())
+    _CLOUD_PROVIDER: GCPConfig = PrivateAttr(default_factory=get_gcp_config)
     _GEMINI_API_KEY: SecretStr = PrivateAttr(default=SecretStr("dummy-api-key"))
 
     def __init__(self):
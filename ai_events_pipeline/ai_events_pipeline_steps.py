@@ -5,6 +5,10 @@ from pandas.tseries.offsets import MonthBegin
 from loguru import logger
 
 from ai_events_pipeline.events_auxiliars import get_initial_and_final_dates
+from utils.http.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+
+# Paces the requests sent to each events site
+events_rate_limiter = AdaptiveRateLimiter()
 
 
 def retrieve_ai_events(events_url: str) -> list[dict]:
@@ -23,7 +27,12 @@ def retrieve_ai_events(events_url: str) -> list[dict]:
     }  # To avoid get uncomplete data from the website
 
     logger.info("Sending request to fetch web data")
-    response = requests.get(events_url, headers=headers)
+    with events_rate_limiter.limit(events_url) as permit:
+        response = requests.get(events_url, headers=headers)
+        permit.record(
+            response.status_code,
+            parse_retry_after(response.headers.get("Retry-After")),
+        )
 
     if response.status_code != 200:
         raise ValueError(
@@ -0,0 +1,4 @@
+from .base import JobStore
+from .local import InMemoryJobStore, SQLiteJobStore
+
+__all__ = ["JobStore", "InMemoryJobStore", "SQLiteJobStore"]
@@ -0,0 +1,40 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class JobStore(ABC):
+    """
+    Store of background jobs (e.g. pipeline runs), so their status and results can be
+    retrieved after the request that created them has finished. Jobs are JSON-serializable
+    dictionaries identified by a job id.
+    """
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[dict]:
+        """
+        Returns the job stored under job_id, or None if there is none
+        """
+        pass
+
+    @abstractmethod
+    def save(self, job_id: str, job: dict) -> None:
+        """
+        Stores (or replaces) the job under job_id
+        """
+        pass
+
+    def update(self, job_id: str, **changes) -> Optional[dict]:
+        """
+        Updates some fields of the job stored under job_id
+
+        Returns:
+            Optional[dict] -> The job updated, None if there is no job under job_id
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+
+        job.update(changes)
+        self.save(job_id, job)
+
+        return job
@@ -0,0 +1,108 @@
+import copy
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from .base import JobStore
+
+
+class InMemoryJobStore(JobStore):
+    """
+    JobStore kept in the memory of the process, so jobs are lost when it stops. Once max_jobs
+    is reached, the oldest jobs are removed
+    """
+
+    def __init__(self, max_jobs: int = 1000):
+        """
+        Args:
+            max_jobs: int -> Maximum number of jobs kept
+        """
+        if not isinstance(max_jobs, int) or max_jobs < 1:
+            raise ValueError("max_jobs must be a positive integer")
+
+        self.__max_jobs = max_jobs
+        self.__jobs: OrderedDict[str, dict] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self.__lock:
+            job = self.__jobs.get(job_id)
+
+        # A copy, so the job stored is only changed through save
+        return copy.deepcopy(job)
+
+    def save(self, job_id: str, job: dict) -> None:
+        with self.__lock:
+            self.__jobs[job_id] = copy.deepcopy(job)
+
+            while len(self.__jobs) > self.__max_jobs:
+                self.__jobs.popitem(last=False)
+
+
+class SQLiteJobStore(JobStore):
+    """
+    JobStore persisted in a local SQLite database file. Once max_jobs is reached, the oldest
+    jobs are removed
+    """
+
+    def __init__(self, db_path: str, max_jobs: int = 1000):
+        """
+        Args:
+            db_path: str -> Path to the SQLite file. Created if it does not exist
+            max_jobs: int -> Maximum number of jobs kept
+        """
+        if not isinstance(db_path, str) or db_path.strip() == "":
+            raise ValueError("db_path must be a non-empty string")
+        if not isinstance(max_jobs, int) or max_jobs < 1:
+            raise ValueError("max_jobs must be a positive integer")
+
+        self.__db_path = db_path
+        self.__max_jobs = max_jobs
+
+        with self.__connect() as connection:
+            connection.execute(
+                "create table if not exists jobs ("
+                "job_id text not null primary key, "
+                "value text not null)"
+            )
+
+    @property
+    def db_path(self) -> str:
+        return self.__db_path
+
+    @contextmanager
+    def __connect(self) -> Iterator[sqlite3.Connection]:
+        # A new connection per operation allows using the store from several threads
+        connection = sqlite3.connect(self.__db_path, timeout=30)
+
+        try:
+            with connection:  # Commits the transaction if no exception is raised
+                yield connection
+
+        finally:
+            connection.close()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self.__connect() as connection:
+            row = connection.execute(
+                "select value from jobs where job_id = ?", (job_id,)
+            ).fetchone()
+
+        return json.loads(row[0]) if row else None
+
+    def save(self, job_id: str, job: dict) -> None:
+        with self.__connect() as connection:
+            # Updating a job keeps its rowid, so the rowids follow the order of creation
+            connection.execute(
+                "insert into jobs (job_id, value) values (?, ?) "
+                "on conflict (job_id) do update set value = excluded.value",
+                (job_id, json.dumps(job)),
+            )
+            connection.execute(
+                "delete from jobs where rowid <= ("
+                "select rowid from jobs order by rowid desc limit 1 offset ?)",
+                (self.__max_jobs,),
+            )
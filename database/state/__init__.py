@@ -0,0 +1,4 @@
+from .base import StateStore
+from .local import JSONFileStateStore, SQLiteStateStore
+
+__all__ = ["StateStore", "JSONFileStateStore", "SQLiteStateStore"]
@@ -0,0 +1,30 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class StateStore(ABC):
+    """
+    Key-value store used to persist small pieces of state between pipeline runs (e.g. HTTP
+    validators of a feed). Values are JSON-serializable dictionaries, grouped by namespace.
+    """
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> Optional[dict]:
+        """
+        Returns the value stored under namespace and key, or None if there is none
+        """
+        pass
+
+    @abstractmethod
+    def set(self, namespace: str, key: str, value: dict) -> None:
+        """
+        Stores (or replaces) the value under namespace and key
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str) -> None:
+        """
+        Removes the value stored under namespace and key, if any
+        """
+        pass
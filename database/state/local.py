@@ -0,0 +1,125 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from .base import StateStore
+
+
+class SQLiteStateStore(StateStore):
+    """
+    StateStore persisted in a local SQLite database file
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: str -> Path to the SQLite file. Created if it does not exist
+        """
+        if not isinstance(db_path, str) or db_path.strip() == "":
+            raise ValueError("db_path must be a non-empty string")
+
+        self.__db_path = db_path
+
+        with self.__connect() as connection:
+            connection.execute(
+                "create table if not exists state ("
+                "namespace text not null, "
+                "key text not null, "
+                "value text not null, "
+                "primary key (namespace, key))"
+            )
+
+    @property
+    def db_path(self) -> str:
+        return self.__db_path
+
+    @contextmanager
+    def __connect(self) -> Iterator[sqlite3.Connection]:
+        # A new connection per operation allows using the store from several threads
+        connection = sqlite3.connect(self.__db_path, timeout=30)
+
+        try:
+            with connection:  # Commits the transaction if no exception is raised
+                yield connection
+
+        finally:
+            connection.close()
+
+    def get(self, namespace: str, key: str) -> Optional[dict]:
+        with self.__connect() as connection:
+            row = connection.execute(
+                "select value from state where namespace = ? and key = ?",
+                (namespace, key),
+            ).fetchone()
+
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace: str, key: str, value: dict) -> None:
+        with self.__connect() as connection:
+            connection.execute(
+                "insert or replace into state (namespace, key, value) values (?, ?, ?)",
+                (namespace, key, json.dumps(value)),
+            )
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self.__connect() as connection:
+            connection.execute(
+                "delete from state where namespace = ? and key = ?", (namespace, key)
+            )
+
+
+class JSONFileStateStore(StateStore):
+    """
+    StateStore persisted in a local JSON file. The whole file is rewritten on every change, so it
+    is only suited for small amounts of state
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Args:
+            file_path: str -> Path to the JSON file. Created on the first write
+        """
+        if not isinstance(file_path, str) or file_path.strip() == "":
+            raise ValueError("file_path must be a non-empty string")
+
+        self.__file_path = file_path
+        self.__lock = threading.Lock()
+
+    @property
+    def file_path(self) -> str:
+        return self.__file_path
+
+    def __read(self) -> dict[str, dict[str, dict]]:
+        if not os.path.isfile(self.__file_path):
+            return dict()
+
+        with open(self.__file_path, encoding="utf-8") as file:
+            return json.load(file)
+
+    def __write(self, state: dict[str, dict[str, dict]]) -> None:
+        # Writing to a temporary file first avoids leaving a corrupted file if the process dies
+        temporary_path = f"{self.__file_path}.tmp"
+
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+
+        os.replace(temporary_path, self.__file_path)
+
+    def get(self, namespace: str, key: str) -> Optional[dict]:
+        with self.__lock:
+            return self.__read().get(namespace, dict()).get(key)
+
+    def set(self, namespace: str, key: str, value: dict) -> None:
+        with self.__lock:
+            state = self.__read()
+            state.setdefault(namespace, dict())[key] = value
+            self.__write(state)
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self.__lock:
+            state = self.__read()
+            if state.get(namespace, dict()).pop(key, None) is not None:
+                self.__write(state)
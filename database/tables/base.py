@@ -10,6 +10,13 @@ class Table(ABC):
     def _id_in_table(self, **kargs) -> bool:
         pass
 
+    @abstractmethod
+    def _ids_in_table(self, **kargs) -> set[str]:
+        """
+        Bulk version of _id_in_table, retrieves which ones of several ids already exist
+        """
+        pass
+
     @abstractmethod
     def _insert_row(self, **kargs) -> str:
         """
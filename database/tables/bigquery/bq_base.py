@@ -1,22 +1,19 @@
+from typing import Optional
+
 from database.tables import Table
-from agent.config import GCPConfig
+from agent.config import get_gcp_config
 from utils.gcp.bigquery import query_data
 
 
-gcp_config = GCPConfig()
-
-
 class BigQueryTable(Table):
-    __project_id: str = gcp_config.PROJECT_ID
-    __dataset_id: str = gcp_config.BQ_DATASET_ID
-
+    # Read from GCPConfig on first use, so importing the table does not read the settings
     @property
     def project_id(self):
-        return self.__project_id
+        return get_gcp_config().PROJECT_ID
 
     @property
     def dataset_id(self):
-        return self.__dataset_id
+        return get_gcp_config().BQ_DATASET_ID
 
     def _id_in_table(
         self, primary_key_row_value: str, primary_key_column_name: str, table_name: str
@@ -48,3 +45,47 @@ class BigQueryTable(Table):
 
         except StopIteration:  # If the iterator is empty
             return False
+
+    def _ids_in_table(
+        self,
+        primary_key_row_values: list[str],
+        primary_key_column_name: str,
+        table_name: str,
+        timeout: Optional[float] = None,
+    ) -> set[str]:
+        """
+        Checks which ones of several primary key values already exist in the table, using
+        a single parameterized query regardless of the number of values
+
+        Args:
+            primary_key_row_values: list[str] -> Values of the primary key to look for
+            primary_key_column_name: str -> Name of the column that represents the PK
+            table_name: str -> Name of the table to query
+            timeout: Optional[float] -> Seconds to wait for the query. None waits indefinitely
+
+        Returns:
+            set[str] -> Subset of primary_key_row_values that exist in the table
+        """
+        from google.cloud import bigquery
+
+        if not primary_key_row_values:
+            return set()
+
+        query = (
+            f"select "
+            f"{primary_key_column_name} "
+            f"from `{self.project_id}.{self.dataset_id}.{table_name}` "
+            f"where {primary_key_column_name} in unnest(@ids)"
+        )
+
+        rows_iterator = query_data(
+            query,
+            query_parameters=[
+                bigquery.ArrayQueryParameter(
+                    "ids", "STRING", list(set(primary_key_row_values))
+                )
+            ],
+            timeout=timeout,
+        )
+
+        return {row[primary_key_column_name] for row in rows_iterator}
@@ -1,28 +1,23 @@
 from loguru import logger
 import hashlib
 from datetime import datetime, timezone
+from typing import Callable, Optional
 
-from utils.gcp.bigquery import insert_rows
+from utils.gcp.bigquery import insert_rows, load_rows
 
 from .bq_base import BigQueryTable
 from database.schemas import NewsMetadata
-from agent.config import GCPConfig
-
-
-gcp_config = GCPConfig()
+from agent.config import get_gcp_config
 
 
 class NewsExtractionTable(BigQueryTable):
-    __name: str = gcp_config.NEWS_EXTRACTION_TABLE_ID
-    __primary_key: str = gcp_config.NEWS_EXTRACTION_TABLE_PK
-
     @property
     def name(self):
-        return self.__name
+        return get_gcp_config().NEWS_EXTRACTION_TABLE_ID
 
     @property
     def primary_key(self):
-        return self.__primary_key
+        return get_gcp_config().NEWS_EXTRACTION_TABLE_PK
 
     def _generate_id(self, news_link: str) -> str:
         """
@@ -38,9 +33,66 @@ class NewsExtractionTable(BigQueryTable):
         """
         return hashlib.sha256(news_link.encode("utf-8")).hexdigest()
 
+    def get_stored_news_links(self, news_links: list[str]) -> set[str]:
+        """
+        Checks which news links are already stored in the table, using a single query
+
+        Args:
+            news_links: list[str] -> Links of the news to look for
+
+        Returns:
+            set[str] -> Subset of news_links already stored in the table
+        """
+        links_by_id = {
+            self._generate_id(news_link): news_link for news_link in news_links
+        }
+
+        stored_ids = self._ids_in_table(
+            primary_key_row_values=list(links_by_id),
+            primary_key_column_name=self.primary_key,
+            table_name=self.name,
+        )
+
+        return {links_by_id[news_id] for news_id in stored_ids}
+
+    def _write_rows(self, rows: list[dict], timeout: Optional[float] = None) -> None:
+        """
+        Writes rows to this table with a single load job, or with streaming inserts, as set
+        by BQ_WRITE_MODE in GCPConfig
+
+        Args:
+            rows: list[dict] -> Rows to write, as serialized by NewsMetadata.model_dump
+            timeout: Optional[float] -> Seconds to wait for BigQuery. None waits indefinitely
+
+        Returns:
+            None
+        """
+        gcp_config = get_gcp_config()
+
+        if gcp_config.BQ_WRITE_MODE == "batch":
+            load_rows(
+                table_name=self.name,
+                dataset_name=self.dataset_id,
+                project_id=self.project_id,
+                rows=rows,
+                file_format=gcp_config.BQ_LOAD_FORMAT,
+                timeout=timeout,
+            )
+
+        else:
+            insert_rows(
+                table_name=self.name,
+                dataset_name=self.dataset_id,
+                project_id=self.project_id,
+                rows=rows,
+                timeout=timeout,
+            )
+
     def _insert_row(self, news_metadata: NewsMetadata) -> None:
         """
-        Main logic to insert a row in this table
+        Main logic to insert a row in this table. Single rows are always written with a
+        streaming insert, whatever BQ_WRITE_MODE is, as a load job per row would soon reach
+        the daily quota of load jobs of the table
 
         Args:
             news_metadata: NewsMetadata -> Class containing all the necessary data by the table
@@ -55,9 +107,7 @@ class NewsExtractionTable(BigQueryTable):
                 table_name=self.name,
                 dataset_name=self.dataset_id,
                 project_id=self.project_id,
-                rows=[
-                    news_metadata.model_dump(exclude_none=True),
-                ],
+                rows=[news_metadata.model_dump(exclude_none=True)],
             )
 
         except Exception as e:
@@ -78,7 +128,7 @@ class NewsExtractionTable(BigQueryTable):
         news_metadata.news_id = self._generate_id(news_metadata.news_link)
 
         logger.debug("Adding news to the database...")
-        if not self._id_in_table(
+        if self._id_in_table(
             primary_key_column_name=self.primary_key,
             primary_key_row_value=news_metadata.news_id,
             table_name=self.name,
@@ -92,15 +142,26 @@ class NewsExtractionTable(BigQueryTable):
 
         return news_metadata.news_id
 
-    def add_rows(self, list_news_metadata: list[NewsMetadata]) -> None:
+    def add_rows(
+        self,
+        list_news_metadata: list[NewsMetadata],
+        timeout: Optional[float] = None,
+        on_inserted: Optional[Callable[[int], None]] = None,
+    ) -> bool:
         """
-        Insert multiple rows in BigQuery at once
+        Insert multiple rows in BigQuery at once, with a single load job unless
+        BQ_WRITE_MODE is streaming
 
         Args:
             list_news_metadata: list[NewsMetadata] -> List of NewsMetadata objects
+            timeout: Optional[float] -> Seconds to wait for each BigQuery call. None waits
+                                        indefinitely
+            on_inserted: Optional[Callable[[int], None]] -> Receives the number of rows
+                                        inserted, without the news already stored (e.g. to
+                                        export them as metrics)
 
         Returns:
-            None
+            bool -> True if, after the call, all the news are stored in the table
         """
         if not isinstance(list_news_metadata, list) or not all(
             isinstance(data, NewsMetadata) for data in list_news_metadata
@@ -108,39 +169,52 @@ class NewsExtractionTable(BigQueryTable):
             logger.error(
                 "The parameter list_news_metadata must be a list of NewsMetadata objects"
             )
+            return False
 
-        # Adding fields that are filled once the data is up to be ingested into the database
-        news_to_add = [
-            news_metadata.model_copy(
-                update={
-                    "news_id": self._generate_id(news_metadata.news_link),
-                    "extracted_at": datetime.now(timezone.utc),
-                }
-            ).model_dump()  # To convert NewsMetadata in a Python dictionary
+        # The ids are generated once per row, and all of them are checked against
+        # the table in a single query
+        news_ids = [
+            self._generate_id(news_metadata.news_link)
             for news_metadata in list_news_metadata
-            # Due to this condition is evaluated before the news_id is created in the NewsMetadata instance
-            # it is required to generate the id instead of calling news_metadata.news_id (at that moment is always None)
-            if not self._id_in_table(
-                primary_key_column_name=self.primary_key,
-                primary_key_row_value=self._generate_id(news_metadata.news_link),
-                table_name=self.name,
-            )
         ]
+        stored_ids = self._ids_in_table(
+            primary_key_row_values=news_ids,
+            primary_key_column_name=self.primary_key,
+            table_name=self.name,
+            timeout=timeout,
+        )
+
+        # Adding fields that are filled once the data is up to be ingested into the database
+        extracted_at = datetime.now(timezone.utc)
+        news_to_add = list()
+        for news_id, news_metadata in zip(news_ids, list_news_metadata):
+            # Also avoids inserting the same news twice if it is repeated in the batch
+            if news_id in stored_ids:
+                continue
+
+            stored_ids.add(news_id)
+            news_to_add.append(
+                news_metadata.model_copy(
+                    update={"news_id": news_id, "extracted_at": extracted_at}
+                ).model_dump()  # To convert NewsMetadata in a Python dictionary
+            )
 
         if not news_to_add:
             logger.warning("All the news has been previously added to the database.")
-            return
+            return True
 
         logger.info(
             f"Inserting {len(news_to_add)} new rows into BigQuery table {self.name}"
         )
         try:
-            insert_rows(
-                table_name=self.name,
-                dataset_name=self.dataset_id,
-                project_id=self.project_id,
-                rows=news_to_add,
-            )
+            # A single load job (or streaming requests) for all the rows of the run
+            self._write_rows(news_to_add, timeout=timeout)
 
         except Exception as e:
             logger.error(f"Error while inserting rows into BigQuery: {e}")
+            return False
+
+        if on_inserted:
+            on_inserted(len(news_to_add))
+
+        return True
@@ -0,0 +1,8 @@
+from .local_base import LocalNewsExtractionTable
+from .news_metadata import InMemoryNewsExtractionTable, SQLiteNewsExtractionTable
+
+__all__ = [
+    "LocalNewsExtractionTable",
+    "InMemoryNewsExtractionTable",
+    "SQLiteNewsExtractionTable",
+]
@@ -0,0 +1,158 @@
+import hashlib
+from abc import abstractmethod
+from datetime import datetime, timezone
+from loguru import logger
+from typing import Callable, Optional
+
+from database.tables import Table
+from database.schemas import NewsMetadata
+
+
+class LocalNewsExtractionTable(Table):
+    """
+    Table of news stored locally, with the same semantics as the BigQuery
+    NewsExtractionTable: rows are identified by the sha256 of their news_link, and news
+    already stored are skipped. Subclasses only define how the rows are kept, looked up by
+    their primary key and inserted
+    """
+
+    primary_key: str = "news_id"
+
+    @property
+    @abstractmethod
+    def rows(self) -> list[dict]:
+        """
+        Rows stored, in insertion order
+        """
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Removes all the rows stored
+        """
+        pass
+
+    @abstractmethod
+    def _ids_in_table(self, primary_key_row_values: list[str]) -> set[str]:
+        pass
+
+    @abstractmethod
+    def _insert_rows(self, rows: list[dict]) -> int:
+        """
+        Inserts the rows whose primary key is not stored yet, leaving the rest unchanged
+
+        Returns:
+            int -> Number of rows inserted
+        """
+        pass
+
+    def _generate_id(self, news_link: str) -> str:
+        """
+        Args:
+            news_link: str -> Link of the news
+
+        Returns:
+            str -> ID of the row
+        """
+        return hashlib.sha256(news_link.encode("utf-8")).hexdigest()
+
+    def _id_in_table(self, primary_key_row_value: str) -> bool:
+        return bool(self._ids_in_table([primary_key_row_value]))
+
+    def _insert_row(self, news_metadata: NewsMetadata) -> None:
+        self._insert_rows(
+            [
+                news_metadata.model_copy(
+                    update={"extracted_at": datetime.now(timezone.utc)}
+                ).model_dump()
+            ]
+        )
+
+    def get_stored_news_links(self, news_links: list[str]) -> set[str]:
+        """
+        Checks which news links are already stored in the table
+
+        Args:
+            news_links: list[str] -> Links of the news to look for
+
+        Returns:
+            set[str] -> Subset of news_links already stored in the table
+        """
+        links_by_id = {
+            self._generate_id(news_link): news_link for news_link in news_links
+        }
+        stored_ids = self._ids_in_table(list(links_by_id))
+
+        return {links_by_id[news_id] for news_id in stored_ids}
+
+    def add_row(self, news_metadata: NewsMetadata) -> str:
+        """
+        Orchestrates the steps to add a row to the table
+
+        Args:
+            news_metadata: NewsMetadata -> Class containing the necessary parameters which its validators
+
+        Returns:
+            str: ID of the news inserted
+        """
+        news_metadata.news_id = self._generate_id(news_metadata.news_link)
+
+        if self._id_in_table(news_metadata.news_id):
+            logger.warning(
+                f"Extracted news {news_metadata.title} already in database, skipping it..."
+            )
+
+        else:
+            self._insert_row(news_metadata=news_metadata)
+
+        return news_metadata.news_id
+
+    def add_rows(
+        self,
+        list_news_metadata: list[NewsMetadata],
+        timeout: Optional[float] = None,
+        on_inserted: Optional[Callable[[int], None]] = None,
+    ) -> bool:
+        """
+        Insert multiple rows at once, skipping the ones already stored
+
+        Args:
+            list_news_metadata: list[NewsMetadata] -> List of NewsMetadata objects
+            timeout: Optional[float] -> Not used, kept to match NewsExtractionTable
+            on_inserted: Optional[Callable[[int], None]] -> Receives the number of rows
+                                        inserted, without the news already stored
+
+        Returns:
+            bool -> True if, after the call, all the news are stored in the table
+        """
+        if not isinstance(list_news_metadata, list) or not all(
+            isinstance(data, NewsMetadata) for data in list_news_metadata
+        ):
+            logger.error(
+                "The parameter list_news_metadata must be a list of NewsMetadata objects"
+            )
+            return False
+
+        extracted_at = datetime.now(timezone.utc)
+        rows = [
+            news_metadata.model_copy(
+                update={
+                    "news_id": self._generate_id(news_metadata.news_link),
+                    "extracted_at": extracted_at,
+                }
+            ).model_dump()
+            for news_metadata in list_news_metadata
+        ]
+
+        try:
+            inserted_rows = self._insert_rows(rows)
+
+        except Exception as e:
+            logger.error(f"Error while inserting rows into the local table: {e}")
+            return False
+
+        if on_inserted:
+            on_inserted(inserted_rows)
+
+        return True
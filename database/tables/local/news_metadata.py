@@ -0,0 +1,137 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+from .local_base import LocalNewsExtractionTable
+
+# Columns of the rows stored, as serialized by NewsMetadata.model_dump
+NEWS_COLUMNS = (
+    "news_id",
+    "title",
+    "published_at",
+    "extracted_at",
+    "news_link",
+    "image_link",
+)
+
+# Primary keys looked up per query, below the limit of variables of old SQLite versions
+SQLITE_MAX_IDS_PER_QUERY = 500
+
+
+class InMemoryNewsExtractionTable(LocalNewsExtractionTable):
+    """
+    Table of news kept in a dictionary indexed by its primary key. Nothing is persisted, so
+    it is only suited for local runs and benchmarks
+    """
+
+    def __init__(self):
+        self.__rows: dict[str, dict] = dict()
+        self.__lock = threading.Lock()
+
+    @property
+    def rows(self) -> list[dict]:
+        with self.__lock:
+            return [dict(row) for row in self.__rows.values()]
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__rows.clear()
+
+    def _ids_in_table(self, primary_key_row_values: list[str]) -> set[str]:
+        with self.__lock:
+            return {
+                news_id for news_id in primary_key_row_values if news_id in self.__rows
+            }
+
+    def _insert_rows(self, rows: list[dict]) -> int:
+        with self.__lock:
+            rows_before = len(self.__rows)
+            for row in rows:
+                self.__rows.setdefault(row[self.primary_key], row)
+
+            return len(self.__rows) - rows_before
+
+
+class SQLiteNewsExtractionTable(LocalNewsExtractionTable):
+    """
+    Table of news persisted in a local SQLite database file, with news_id as its primary key,
+    so looking up the news already stored uses its index
+    """
+
+    table_name: str = "news_extraction"
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: str -> Path to the SQLite file. Created if it does not exist
+        """
+        if not isinstance(db_path, str) or db_path.strip() == "":
+            raise ValueError("db_path must be a non-empty string")
+
+        self.__db_path = db_path
+
+        with self.__connect() as connection:
+            connection.execute(
+                f"create table if not exists {self.table_name} ("
+                f"{self.primary_key} text primary key, "
+                "title text not null, "
+                "published_at text not null, "
+                "extracted_at text, "
+                "news_link text not null, "
+                "image_link text)"
+            )
+
+    @property
+    def db_path(self) -> str:
+        return self.__db_path
+
+    @contextmanager
+    def __connect(self) -> Iterator[sqlite3.Connection]:
+        # A new connection per operation allows using the table from several threads
+        connection = sqlite3.connect(self.__db_path, timeout=30)
+
+        try:
+            with connection:  # Commits the transaction if no exception is raised
+                yield connection
+
+        finally:
+            connection.close()
+
+    @property
+    def rows(self) -> list[dict]:
+        with self.__connect() as connection:
+            cursor = connection.execute(
+                f"select {', '.join(NEWS_COLUMNS)} from {self.table_name} order by rowid"
+            )
+            return [dict(zip(NEWS_COLUMNS, row)) for row in cursor.fetchall()]
+
+    def clear(self) -> None:
+        with self.__connect() as connection:
+            connection.execute(f"delete from {self.table_name}")
+
+    def _ids_in_table(self, primary_key_row_values: list[str]) -> set[str]:
+        news_ids = list(set(primary_key_row_values))
+
+        stored_ids = set()
+        with self.__connect() as connection:
+            for start in range(0, len(news_ids), SQLITE_MAX_IDS_PER_QUERY):
+                batch = news_ids[start : start + SQLITE_MAX_IDS_PER_QUERY]
+                cursor = connection.execute(
+                    f"select {self.primary_key} from {self.table_name} "
+                    f"where {self.primary_key} in ({', '.join('?' * len(batch))})",
+                    batch,
+                )
+                stored_ids.update(row[0] for row in cursor.fetchall())
+
+        return stored_ids
+
+    def _insert_rows(self, rows: list[dict]) -> int:
+        with self.__connect() as connection:
+            cursor = connection.executemany(
+                f"insert or ignore into {self.table_name} ({', '.join(NEWS_COLUMNS)}) "
+                f"values ({', '.join('?' * len(NEWS_COLUMNS))})",
+                [tuple(row[column] for column in NEWS_COLUMNS) for row in rows],
+            )
+            # Ignored rows are not counted
+            return cursor.rowcount
@@ -1,29 +1,320 @@
-from fastapi import FastAPI
-from news_extraction_pipeline.app.models import ExtractionPipelineResponse
+import asyncio
+import json
+import time
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from loguru import logger
+from typing import Any, AsyncIterator, Coroutine, Optional
+from news_extraction_pipeline.app.metrics import SharedStateCollector
+from news_extraction_pipeline.app.models import ExtractionPipelineResponse, JobResponse
+from news_extraction_pipeline.resources import get_job_runner, get_result_cache
 from news_extraction_pipeline.schemas import PipelineArgs
-from news_extraction_pipeline.pipeline import main
+from news_extraction_pipeline import metrics
+from news_extraction_pipeline.pipeline import amain, astream, new_step_runner
+from utils.jobs import JOB_FAILED, JOB_SUCCEEDED
+from utils.progress import Progress
 import pandas as pd
 
 app = FastAPI()
 
+metrics.registry.register(SharedStateCollector())
 
-@app.post("/extract_articles", response_model=ExtractionPipelineResponse)
-def get_articles(pipeline_args: PipelineArgs):
-    articles_extracted = main(
-        case_sen_search_kw=pipeline_args.case_sen_search_kw,
-        case_insen_search_kw=pipeline_args.case_insen_search_kw,
-        max_days_old=pipeline_args.max_days_old,
+
+@app.middleware("http")
+async def record_request_duration(request: Request, call_next):
+    """
+    Records the duration of every request, labelled by the route template (e.g.
+    /jobs/{job_id}), so the number of series does not grow with the ids requested
+    """
+    started_at = time.perf_counter()
+    status = 500
+
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+
+    finally:
+        route = request.scope.get("route")
+        metrics.http_request_duration_seconds.labels(
+            method=request.method,
+            path=getattr(route, "path", "unmatched"),
+            status=str(status),
+        ).observe(time.perf_counter() - started_at)
+
+
+# Seconds between checks of the client connection while a request is being processed
+DISCONNECT_POLL_SECONDS = 0.5
+
+# Non-standard status code used when the client closed the connection before the response
+CLIENT_CLOSED_REQUEST = 499
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def run_until_disconnected(
+    request: Request, coroutine: Coroutine[Any, Any, Any]
+) -> tuple[bool, Any]:
+    """
+    Runs the coroutine, cancelling it if the client disconnects before it finishes, so no
+    work is done for a response nobody will read
+
+    Args:
+        request: Request -> Request being processed
+        coroutine: Coroutine -> Work of the request
+
+    Returns:
+        tuple[bool, Any] -> False and None if the client disconnected, otherwise True and the
+                            result of the coroutine
+    """
+    task = asyncio.ensure_future(coroutine)
+
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return True, task.result()
+
+            if await request.is_disconnected():
+                logger.warning(
+                    f"Client disconnected from {request.url.path}, cancelling the request"
+                )
+                return False, None
+
+    finally:
+        task.cancel()  # Does nothing if the task has already finished
+
+
+def is_complete_result(articles_extracted: Optional[pd.DataFrame]) -> bool:
+    """
+    Checks if the pipeline returned articles and none of its sources was truncated, so the
+    result can be reused
+    """
+    return isinstance(articles_extracted, pd.DataFrame) and not (
+        articles_extracted.attrs.get("truncated_sources")
+    )
+
+
+async def run_pipeline(
+    pipeline_args: PipelineArgs, include_run_report: bool = False
+) -> Optional[pd.DataFrame]:
+    """
+    Runs the pipeline, reusing the result cached for identical arguments if any. Concurrent
+    requests with identical arguments and deadline share a single execution. The deadline is
+    left out of the cache key, as only complete results are cached
+
+    Args:
+        pipeline_args: PipelineArgs -> Arguments of the request
+        include_run_report: bool -> The run report is requested. Its memory is traced (unless
+                                    another run is tracing it), and the cache is bypassed,
+                                    so the report describes this run
+
+    Returns:
+        Optional[pd.DataFrame] -> Articles returned by the pipeline
+    """
+
+    def run() -> Coroutine[Any, Any, Optional[pd.DataFrame]]:
+        return amain(
+            case_sen_search_kw=pipeline_args.case_sen_search_kw,
+            case_insen_search_kw=pipeline_args.case_insen_search_kw,
+            max_days_old=pipeline_args.max_days_old,
+            incremental=pipeline_args.incremental,
+            skip_stored_articles=pipeline_args.skip_stored_articles,
+            deadline_seconds=pipeline_args.deadline_seconds,
+            step_runner=new_step_runner(trace_memory=include_run_report),
+        )
+
+    result_cache = get_result_cache()
+    if result_cache is None or include_run_report:
+        return await run()
+
+    return await result_cache.get_or_compute(
+        pipeline_args.cache_key(),
+        run,
+        should_cache=is_complete_result,
+        flight_key=f"{pipeline_args.cache_key()}:{pipeline_args.deadline_seconds}",
     )
 
+
+def build_response(
+    articles_extracted: Optional[pd.DataFrame], include_run_report: bool = False
+) -> ExtractionPipelineResponse:
+    """
+    Builds the response of the endpoint from the articles returned by the pipeline
+
+    Args:
+        articles_extracted: Optional[pd.DataFrame] -> Articles returned by the pipeline
+        include_run_report: bool -> Add the report of the run to the response
+
+    Returns:
+        ExtractionPipelineResponse -> Response of the endpoint
+    """
+    run_report = None
+
     if not isinstance(articles_extracted, pd.DataFrame):  # if not DataFrame, is None
+        truncated_sources = list()
         articles_extracted = list()
 
     else:
+        truncated_sources = articles_extracted.attrs.get("truncated_sources", list())
+        if include_run_report:
+            run_report = articles_extracted.attrs.get("run_report")
         # Create a list of dictionaries - expectede by ExtractionPipelineResponse
         articles_extracted = articles_extracted.to_dict(orient="records")
 
-    response = ExtractionPipelineResponse(
-        total_articles=len(articles_extracted), data=articles_extracted
+    return ExtractionPipelineResponse(
+        total_articles=len(articles_extracted),
+        data=articles_extracted,
+        partial=bool(truncated_sources),
+        truncated_sources=truncated_sources,
+        run_report=run_report,
+    )
+
+
+@app.post("/extract_articles", response_model=ExtractionPipelineResponse)
+async def get_articles(
+    pipeline_args: PipelineArgs, request: Request, include_run_report: bool = False
+):
+    completed, articles_extracted = await run_until_disconnected(
+        request, run_pipeline(pipeline_args, include_run_report)
+    )
+
+    if not completed:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+    return build_response(articles_extracted, include_run_report)
+
+
+async def stream_records(
+    request: Request, records: AsyncIterator[dict]
+) -> AsyncIterator[str]:
+    """
+    Serializes the records of the pipeline as newline-delimited JSON, stopping the pipeline if
+    the client disconnects
+
+    Args:
+        request: Request -> Request being processed
+        records: AsyncIterator[dict] -> Records yielded by the pipeline
+
+    Returns:
+        AsyncIterator[str] -> One JSON document per line
+    """
+    try:
+        async for record in records:
+            if await request.is_disconnected():
+                logger.warning(
+                    f"Client disconnected from {request.url.path}, cancelling the request"
+                )
+                break
+
+            yield json.dumps(record, default=str) + "\n"
+
+    finally:
+        await records.aclose()
+
+
+@app.post("/extract_articles/stream")
+async def stream_articles(pipeline_args: PipelineArgs, request: Request):
+    """
+    Streaming variant of /extract_articles. Each article is sent as a line of JSON as soon as
+    its feed has been extracted, followed by a final summary line once they are stored.
+    Results are not cached
+    """
+    records = astream(
+        case_sen_search_kw=pipeline_args.case_sen_search_kw,
+        case_insen_search_kw=pipeline_args.case_insen_search_kw,
+        max_days_old=pipeline_args.max_days_old,
+        incremental=pipeline_args.incremental,
+        skip_stored_articles=pipeline_args.skip_stored_articles,
+        deadline_seconds=pipeline_args.deadline_seconds,
+    )
+
+    return StreamingResponse(
+        stream_records(request, records), media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+@app.get("/extract_articles/cache_stats")
+async def get_result_cache_stats() -> dict[str, int]:
+    """
+    Number of results cached and in flight, and the hit, miss and coalesced request counters
+    of the result cache. All of them are zero if the cache is disabled
+    """
+    result_cache = get_result_cache()
+    if result_cache is None:
+        return {"entries": 0, "in_flight": 0, "hits": 0, "misses": 0, "coalesced": 0}
+
+    return result_cache.stats()
+
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def submit_job(pipeline_args: PipelineArgs):
+    """
+    Runs the pipeline in the background, for runs longer than the request timeout (e.g.
+    backfills with a large max_days_old). Returns the job right away, to be polled in
+    /jobs/{job_id}. Results are not cached, and include the report of the run
+    """
+
+    async def run(progress: Progress) -> dict:
+        articles_extracted = await amain(
+            case_sen_search_kw=pipeline_args.case_sen_search_kw,
+            case_insen_search_kw=pipeline_args.case_insen_search_kw,
+            max_days_old=pipeline_args.max_days_old,
+            incremental=pipeline_args.incremental,
+            skip_stored_articles=pipeline_args.skip_stored_articles,
+            deadline_seconds=pipeline_args.deadline_seconds,
+            progress=progress,
+        )
+        return build_response(articles_extracted, include_run_report=True).model_dump(
+            mode="json"
+        )
+
+    return await get_job_runner().submit(
+        run, params=pipeline_args.model_dump(mode="json")
     )
 
-    return response
+
+async def get_job_or_404(job_id: str) -> dict:
+    job = await get_job_runner().get(job_id)
+
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    return job
+
+
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """
+    Status of the job, and its progress: feeds done, articles extracted and rows stored
+    """
+    return await get_job_or_404(job_id)
+
+
+@app.get("/jobs/{job_id}/result", response_model=ExtractionPipelineResponse)
+async def get_job_result(job_id: str):
+    """
+    Articles extracted by the job. Conflict (409) if the job has not succeeded
+    """
+    job = await get_job_or_404(job_id)
+
+    if job["status"] == JOB_FAILED:
+        raise HTTPException(
+            status_code=409, detail=f"Job {job_id} failed: {job['error']}"
+        )
+    if job["status"] != JOB_SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job['status']}")
+
+    return job["result"]
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Metrics of the API and the pipeline in the Prometheus text format. The state of the rate
+    limiter and the result cache is read at scrape time
+    """
+    return PlainTextResponse(
+        generate_latest(metrics.registry), media_type=CONTENT_TYPE_LATEST
+    )
@@ -0,0 +1,45 @@
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+from typing import Iterable
+
+from news_extraction_pipeline.resources import get_rate_limiter, get_result_cache
+
+
+class SharedStateCollector(Collector):
+    """
+    Exports the counters kept by the rate limiter and the result cache shared by the API.
+    They are read when /metrics is scraped, so the hot paths of both are not instrumented
+    """
+
+    def collect(self) -> Iterable[Metric]:
+        concurrency_limit = GaugeMetricFamily(
+            "rate_limiter_concurrency_limit",
+            "Requests in flight allowed to each host by the adaptive rate limiter",
+            labels=("host",),
+        )
+        throttle_events = CounterMetricFamily(
+            "rate_limiter_throttle_events",
+            "Throttling responses (429, 503) received from each host",
+            labels=("host",),
+        )
+        for host, host_metrics in get_rate_limiter().metrics().items():
+            concurrency_limit.add_metric((host,), host_metrics["concurrency_limit"])
+            throttle_events.add_metric((host,), host_metrics["throttle_events"])
+
+        yield concurrency_limit
+        yield throttle_events
+
+        result_cache = get_result_cache()
+        if result_cache is None:
+            return
+
+        result_cache_events = CounterMetricFamily(
+            "result_cache_events",
+            "Hits, misses and coalesced requests of the /extract_articles result cache",
+            labels=("event",),
+        )
+        stats = result_cache.stats()
+        for event in ("hits", "misses", "coalesced"):
+            result_cache_events.add_metric((event,), stats[event])
+
+        yield result_cache_events
@@ -1,9 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import Annotated
+from typing import Annotated, Literal, Optional
 
-from news_extraction_pipeline.config import AINewsConfig
+from news_extraction_pipeline.config import get_news_config
 
-news_config = AINewsConfig()
+news_config = get_news_config()
 
 
 class ExtractionPipelineResponse(BaseModel):
@@ -20,3 +20,56 @@ class ExtractionPipelineResponse(BaseModel):
             description="list of dictionaries, each dictionary is an extrated article"
         ),
     ]
+    partial: Annotated[
+        bool,
+        Field(
+            default=False,
+            description="True if the deadline cut the extraction of any source",
+        ),
+    ]
+    truncated_sources: Annotated[
+        list[str],
+        Field(
+            default_factory=list,
+            description="Feed urls whose extraction was cut by the deadline",
+        ),
+    ]
+    run_report: Annotated[
+        Optional[dict],
+        Field(
+            default=None,
+            description="Wall time, CPU time, rows in and out and peak memory of each step of the run, if requested",
+        ),
+    ]
+
+
+class JobResponse(BaseModel):
+    job_id: Annotated[str, Field(description="Id of the job")]
+    status: Annotated[
+        Literal["pending", "running", "succeeded", "failed"],
+        Field(description="Status of the job"),
+    ]
+    params: Annotated[
+        dict,
+        Field(default_factory=dict, description="Arguments of the pipeline run"),
+    ]
+    created_at: Annotated[str, Field(description="ISO timestamp of the submission")]
+    started_at: Annotated[
+        Optional[str],
+        Field(default=None, description="ISO timestamp of the start of the run"),
+    ]
+    finished_at: Annotated[
+        Optional[str],
+        Field(default=None, description="ISO timestamp of the end of the run"),
+    ]
+    progress: Annotated[
+        dict[str, int],
+        Field(
+            default_factory=dict,
+            description="Counters of the run: feeds_total, feeds_done, articles_extracted and rows_stored",
+        ),
+    ]
+    error: Annotated[
+        Optional[str],
+        Field(default=None, description="Error that made the job fail"),
+    ]
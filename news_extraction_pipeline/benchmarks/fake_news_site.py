@@ -0,0 +1,413 @@
+import hashlib
+import multiprocessing
+import os
+import random
+import shutil
+import ssl
+import subprocess
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from xml.sax.saxutils import escape
+
+# Paths of the feeds served, mimicking the real sites. The key is the AINewsConfig field of
+# the feed, so the pipeline can be pointed at them
+FEED_PATHS = {
+    "MIT_NEWS_FEED_URL": "/rss/feed",
+    "AI_NEWS_FEED_URL": "/artificial-intelligence-news/feed/",
+}
+
+# Paragraph repeated to reach the size of the article pages
+FILLER_PARAGRAPH = (
+    "<p>Researchers trained a neural network on a large dataset and evaluated it on "
+    "several benchmarks, reporting results that improve on previous approaches.</p>\n"
+)
+
+
+def generate_certificate(directory: str) -> tuple[str, str]:
+    """
+    Creates a self-signed certificate for 127.0.0.1 and localhost with the openssl CLI. The
+    site is served over HTTPS because the pipeline only accepts https links
+
+    Args:
+        directory: str -> Directory where the certificate and its key are written
+
+    Returns:
+        tuple[str, str] -> Paths to the certificate and to its private key
+    """
+    openssl = shutil.which("openssl")
+    if openssl is None:
+        raise RuntimeError("The openssl CLI is needed to serve the fake news site")
+
+    cert_file = os.path.join(directory, "fake_news_site_cert.pem")
+    key_file = os.path.join(directory, "fake_news_site_key.pem")
+
+    completed_process = subprocess.run(
+        [
+            openssl,
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=localhost",
+            "-addext",
+            "subjectAltName=IP:127.0.0.1,DNS:localhost",
+            "-keyout",
+            key_file,
+            "-out",
+            cert_file,
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    if completed_process.returncode != 0:
+        raise RuntimeError(
+            f"Error generating the certificate: {completed_process.stderr.strip()}"
+        )
+
+    return cert_file, key_file
+
+
+def build_feed(site: str, base_url: str, entries: int) -> bytes:
+    """
+    Args:
+        site: str -> Name of the site, used in the links and titles of the articles
+        base_url: str -> URL of the site, without the trailing slash
+        entries: int -> Number of entries of the feed, published one minute apart
+
+    Returns:
+        bytes -> RSS feed whose entries link to the articles of the site
+    """
+    now = datetime.now(timezone.utc)
+
+    items = list()
+    for number in range(entries):
+        link = f"{base_url}/{site}/articles/{number}/"
+        title = f"Machine Learning study number {number} from {site}"
+        published = format_datetime(now - timedelta(minutes=number))
+        items.append(
+            "<item>"
+            f"<title>{escape(title)}</title>"
+            f"<link>{escape(link)}</link>"
+            f"<guid>{escape(link)}</guid>"
+            f"<pubDate>{published}</pubDate>"
+            "</item>"
+        )
+
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0"><channel>'
+        f"<title>{site}</title><link>{escape(base_url)}/</link>"
+        f"{''.join(items)}"
+        "</channel></rss>"
+    ).encode("utf-8")
+
+
+def build_article(
+    article_path: str,
+    base_url: str,
+    page_size_bytes: int,
+    open_graph: bool,
+    widget_containers: int = 1,
+) -> bytes:
+    """
+    Args:
+        article_path: str -> Path of the article
+        base_url: str -> URL of the site, without the trailing slash
+        page_size_bytes: int -> Approximate size of the page
+        open_graph: bool -> Include the og:image metadata in the <head>. Otherwise the
+                            image is only found by the site specific extractors
+        widget_containers: int -> Number of AI-News widget containers. As in the real site,
+                            only the last one has the 800px image, and the previous ones have
+                            a thumbnail and some text
+
+    Returns:
+        bytes -> html of the article, with the structure expected by the image extractors
+                    of MIT and AI-News
+    """
+    image_path = f"/images{article_path.rstrip('/')}.jpg"
+    head = "<head><title>Article</title>"
+    if open_graph:
+        head += f'<meta property="og:image" content="{base_url}{image_path}">'
+    head += "</head>"
+
+    previous_widgets = (
+        '<div class="elementor-widget-container">'
+        f'<img src="{base_url}/images/thumbnail.jpg" width="300">{FILLER_PARAGRAPH}</div>'
+    ) * max(0, widget_containers - 1)
+    body = (
+        '<body><div class="news-article--media--image--file">'
+        f'<img data-src="{image_path}" src="{image_path}"></div>'
+        f"{previous_widgets}"
+        '<div class="elementor-widget-container">'
+        f'<img src="{base_url}{image_path}" width="800"></div>'
+    )
+
+    page_start = f"<!DOCTYPE html><html>{head}{body}"
+    page_end = "</body></html>"
+    filler_size = max(0, page_size_bytes - len(page_start) - len(page_end))
+    filler = FILLER_PARAGRAPH * (filler_size // len(FILLER_PARAGRAPH) + 1)
+
+    return f"{page_start}{filler[:filler_size]}{page_end}".encode("utf-8")
+
+
+def serve(
+    connection,
+    cert_file: str,
+    key_file: str,
+    entries_per_feed: int,
+    page_size_bytes: int,
+    latency_seconds: float,
+    error_rate: float,
+    open_graph: bool,
+    widget_containers: int,
+    seed: int,
+) -> None:
+    """
+    Serves the fake news site until the process is terminated. Runs in its own process, so
+    the server does not compete with the pipeline measured for the GIL
+
+    Args:
+        connection -> End of a multiprocessing Pipe, where the port of the server is sent
+        Rest of the arguments as in FakeNewsSite
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler)
+    base_url = f"https://127.0.0.1:{server.server_address[1]}"
+
+    feeds = {
+        feed_path: build_feed(
+            field.removesuffix("_FEED_URL").lower().replace("_", "-"),
+            base_url,
+            entries_per_feed,
+        )
+        for field, feed_path in FEED_PATHS.items()
+    }
+    # The feeds do not change while the site is served, so they are validated by an ETag of
+    # their content and by the time the site started
+    feed_etags = {
+        feed_path: f'"{hashlib.sha256(feed).hexdigest()[:16]}"'
+        for feed_path, feed in feeds.items()
+    }
+    feeds_modified_at = datetime.now(timezone.utc).replace(microsecond=0)
+    random_generator = random.Random(seed)
+    random_lock = threading.Lock()
+
+    class FakeNewsSiteHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args) -> None:
+            pass  # Every request would be logged to stderr otherwise
+
+        def __send(
+            self,
+            status: int,
+            content_type: str,
+            content: bytes,
+            headers: Optional[dict[str, str]] = None,
+        ) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(content)))
+            for name, value in (headers or dict()).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(content)
+
+        def __feed_not_modified(self) -> bool:
+            """
+            Evaluates the conditional headers of a feed request. If-Modified-Since is only
+            used without If-None-Match, as in RFC 9110
+            """
+            if_none_match = self.headers.get("If-None-Match")
+            if if_none_match is not None:
+                etags = {etag.strip() for etag in if_none_match.split(",")}
+                return "*" in etags or feed_etags[self.path] in etags
+
+            if_modified_since = self.headers.get("If-Modified-Since")
+            if if_modified_since is None:
+                return False
+
+            try:
+                return parsedate_to_datetime(if_modified_since) >= feeds_modified_at
+
+            except (TypeError, ValueError):  # Invalid dates are ignored
+                return False
+
+        def do_GET(self) -> None:
+            if self.path in feeds:
+                validators = {
+                    "ETag": feed_etags[self.path],
+                    "Last-Modified": format_datetime(feeds_modified_at, usegmt=True),
+                }
+                if self.__feed_not_modified():
+                    self.__send(304, "application/rss+xml", b"", validators)
+                else:
+                    self.__send(
+                        200, "application/rss+xml", feeds[self.path], validators
+                    )
+                return
+
+            if "/articles/" not in self.path:
+                self.__send(404, "text/plain", b"Not found")
+                return
+
+            if latency_seconds > 0:
+                time.sleep(latency_seconds)
+
+            with random_lock:
+                failed = random_generator.random() < error_rate
+
+            if failed:
+                self.__send(500, "text/plain", b"Injected error")
+                return
+
+            self.__send(
+                200,
+                "text/html; charset=utf-8",
+                build_article(
+                    self.path, base_url, page_size_bytes, open_graph, widget_containers
+                ),
+            )
+
+    server.RequestHandlerClass = FakeNewsSiteHandler
+    server.daemon_threads = True
+
+    ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    ssl_context.load_cert_chain(cert_file, key_file)
+    server.socket = ssl_context.wrap_socket(server.socket, server_side=True)
+
+    connection.send(server.server_address[1])
+    connection.close()
+    server.serve_forever()
+
+
+class FakeNewsSite:
+    """
+    Local HTTPS stand-in of the news sites read by the pipeline, serving synthetic RSS feeds
+    and articles, so the pipeline can be benchmarked offline. Each feed of FEED_PATHS has
+    entries_per_feed articles, all of them relevant and published within the last hours.
+    The feeds are sent with an ETag and a Last-Modified, and answered with a 304 to the
+    conditional requests that match them.
+
+    Usage:
+        with FakeNewsSite(cert_file, key_file, entries_per_feed=100) as site:
+            os.environ.update(site.feed_urls)
+    """
+
+    def __init__(
+        self,
+        cert_file: str,
+        key_file: str,
+        entries_per_feed: int = 50,
+        page_size_bytes: int = 50_000,
+        latency_seconds: float = 0.0,
+        error_rate: float = 0.0,
+        open_graph: bool = True,
+        widget_containers: int = 1,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            cert_file: str -> Certificate of the site (e.g. from generate_certificate)
+            key_file: str -> Private key of the certificate
+            entries_per_feed: int -> Articles listed by each feed
+            page_size_bytes: int -> Approximate size of each article page
+            latency_seconds: float -> Delay added before answering each article request
+            error_rate: float -> Fraction of the article requests answered with a 500
+            open_graph: bool -> Include the og:image metadata in the articles
+            widget_containers: int -> AI-News widget containers of each article, the 800px
+                            image being in the last one
+            seed: int -> Seed of the errors injected
+        """
+        if entries_per_feed < 0 or page_size_bytes < 0 or latency_seconds < 0:
+            raise ValueError(
+                "entries_per_feed, page_size_bytes and latency_seconds must not be negative"
+            )
+        if not 0 <= error_rate <= 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        if widget_containers < 1:
+            raise ValueError("widget_containers must be at least 1")
+
+        self.__serve_args = (
+            cert_file,
+            key_file,
+            entries_per_feed,
+            page_size_bytes,
+            latency_seconds,
+            error_rate,
+            open_graph,
+            widget_containers,
+            seed,
+        )
+        self.__process: Optional[multiprocessing.Process] = None
+        self.__port: Optional[int] = None
+
+    @property
+    def base_url(self) -> str:
+        if self.__port is None:
+            raise RuntimeError("The fake news site is not running")
+
+        return f"https://127.0.0.1:{self.__port}"
+
+    @property
+    def feed_urls(self) -> dict[str, str]:
+        """
+        URL of each feed, by the AINewsConfig field it replaces
+        """
+        return {
+            field: f"{self.base_url}{feed_path}"
+            for field, feed_path in FEED_PATHS.items()
+        }
+
+    def start(self, timeout: float = 30) -> None:
+        """
+        Starts serving the site in a child process, returning once it accepts connections
+        """
+        if self.__process is not None:
+            return
+
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        self.__process = multiprocessing.get_context("spawn").Process(
+            target=serve, args=(sender, *self.__serve_args), daemon=True
+        )
+        self.__process.start()
+        sender.close()
+
+        try:
+            if not receiver.poll(timeout):
+                raise RuntimeError("The fake news site did not start in time")
+
+            self.__port = receiver.recv()
+
+        except EOFError:  # The child process ended before sending the port
+            self.stop()
+            raise RuntimeError("The fake news site could not be started")
+
+        except RuntimeError:
+            self.stop()
+            raise
+
+        finally:
+            receiver.close()
+
+    def stop(self) -> None:
+        if self.__process is None:
+            return
+
+        self.__process.terminate()
+        self.__process.join()
+        self.__process = None
+        self.__port = None
+
+    def __enter__(self) -> "FakeNewsSite":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
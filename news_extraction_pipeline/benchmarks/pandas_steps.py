@@ -0,0 +1,283 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import numpy as np
+import pandas as pd
+from loguru import logger
+from typing import Callable, Optional
+
+from news_extraction_pipeline.config import get_news_config
+from news_extraction_pipeline.pipeline_steps import (
+    convert_datetime_columns_to_str,
+    filter_by_date_threshold,
+    filter_by_keywords,
+)
+from news_extraction_pipeline.schemas import PipelineArgs
+from utils.step_runner import StepRunner
+
+news_config = get_news_config()
+
+# Sizes of the article frames of a historical backfill
+DEFAULT_SIZES = (100_000, 300_000, 1_000_000)
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "pandas_steps_baseline.json")
+
+# Allowed increase over the baseline, as a fraction of it, before a result is a regression.
+# Time varies more than memory between runs of the same code
+DEFAULT_TIME_THRESHOLD = 0.5
+DEFAULT_MEMORY_THRESHOLD = 0.2
+
+# Words the titles of the synthetic articles are made of. Around half of the titles match
+# the default keywords of the pipeline
+TITLE_WORDS = np.array(
+    [
+        "Researchers",
+        "Campus",
+        "Students",
+        "Climate",
+        "Robotics",
+        "Energy",
+        "Policy",
+        "Startup",
+        "Funding",
+        "Biology",
+        "Machine Learning",
+        "AI",
+        "ChatGPT",
+        "neural networks",
+        "Computer Vision",
+    ]
+)
+
+DEFAULT_PIPELINE_ARGS = PipelineArgs()
+
+# Steps measured, each one receiving the articles generated
+STEPS: dict[str, Callable[[pd.DataFrame], Optional[pd.DataFrame]]] = {
+    "filter_by_keywords": lambda df: filter_by_keywords(
+        df,
+        filter_column="title",
+        case_sen_search_kw=DEFAULT_PIPELINE_ARGS.case_sen_search_kw,
+        case_insen_search_kw=DEFAULT_PIPELINE_ARGS.case_insen_search_kw,
+    ),
+    "filter_by_date_threshold": lambda df: filter_by_date_threshold(
+        df, filter_column="publish_date", max_days_old=15
+    ),
+    "convert_datetime_columns_to_str": lambda df: convert_datetime_columns_to_str(
+        df, string_format=news_config.DATE_STRING_FORMAT
+    ),
+}
+
+
+def generate_articles(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Args:
+        rows: int -> Number of articles
+        seed: int -> Seed of the random titles and dates
+
+    Returns:
+        pd.DataFrame -> Articles with the columns extracted from the feeds, published
+                        within the last 30 days
+    """
+    random_generator = np.random.default_rng(seed)
+    numbers = np.arange(rows).astype(str)
+
+    words = random_generator.choice(TITLE_WORDS, size=(rows, 3))
+    titles = pd.Series(words[:, 0]).str.cat([words[:, 1], words[:, 2]], sep=" ")
+
+    seconds_old = random_generator.integers(0, 30 * 24 * 60 * 60, size=rows)
+    publish_dates = pd.Timestamp.now(tz="UTC") - pd.to_timedelta(seconds_old, unit="s")
+
+    return pd.DataFrame(
+        {
+            "title": titles,
+            "news_link": np.char.add("https://news.example.com/articles/", numbers),
+            "image_link": np.char.add("https://news.example.com/images/", numbers),
+            "publish_date": publish_dates,
+            "feed_url": "https://news.example.com/feed",
+        }
+    )
+
+
+def measure_step(
+    name: str, articles: pd.DataFrame, repeats: int = 5
+) -> dict[str, float]:
+    """
+    Measures a step of STEPS over the same articles. The time is the median of several runs,
+    and the memory is measured in an extra run, as tracing it slows down the step
+
+    Args:
+        name: str -> Name of the step
+        articles: pd.DataFrame -> Articles received by the step
+        repeats: int -> Runs timed
+
+    Returns:
+        dict[str, float] -> seconds and peak_memory_bytes of the step
+    """
+    step_function = STEPS[name]
+
+    step_runner = StepRunner(name)
+    for _ in range(repeats):
+        with step_runner.step(name, rows_in=len(articles)):
+            step_function(articles)
+
+    memory_step_runner = StepRunner(name, trace_memory=True)
+    with memory_step_runner.step(name, rows_in=len(articles)):
+        step_function(articles)
+
+    wall_seconds = [step["wall_seconds"] for step in step_runner.report()["steps"]]
+    memory_step = memory_step_runner.report()["steps"][0]
+
+    return {
+        "seconds": statistics.median(wall_seconds),
+        "peak_memory_bytes": memory_step["peak_memory_delta_bytes"],
+    }
+
+
+def run_benchmark(
+    sizes: tuple[int, ...] = DEFAULT_SIZES, repeats: int = 5, seed: int = 0
+) -> dict:
+    """
+    Args:
+        sizes: tuple[int, ...] -> Number of articles the steps are measured with
+        repeats: int -> Runs timed of each step and size
+        seed: int -> Seed of the articles generated
+
+    Returns:
+        dict -> Results of measure_step, by step and by number of articles
+    """
+    results = {name: dict() for name in STEPS}
+
+    for rows in sizes:
+        articles = generate_articles(rows, seed=seed)
+
+        for name in STEPS:
+            results[name][str(rows)] = measure_step(name, articles, repeats)
+
+    return results
+
+
+def find_regressions(
+    results: dict,
+    baseline: dict,
+    time_threshold: float = DEFAULT_TIME_THRESHOLD,
+    memory_threshold: float = DEFAULT_MEMORY_THRESHOLD,
+) -> list[str]:
+    """
+    Compares the results of run_benchmark with a baseline. Steps or sizes missing from the
+    baseline are not compared
+
+    Args:
+        results: dict -> Results of run_benchmark
+        baseline: dict -> Results of a previous run_benchmark
+        time_threshold: float -> Allowed increase of the seconds, as a fraction of the baseline
+        memory_threshold: float -> Allowed increase of the peak memory, as a fraction of the
+                                    baseline
+
+    Returns:
+        list[str] -> Description of each result beyond its threshold
+    """
+    thresholds = {"seconds": time_threshold, "peak_memory_bytes": memory_threshold}
+
+    regressions = list()
+    for name, results_by_size in results.items():
+        for rows, measures in results_by_size.items():
+            baseline_measures = baseline.get(name, dict()).get(rows)
+            if baseline_measures is None:
+                continue
+
+            for measure, threshold in thresholds.items():
+                limit = baseline_measures[measure] * (1 + threshold)
+                if measures[measure] > limit:
+                    regressions.append(
+                        f"{name} with {rows} rows: {measure} {measures[measure]:.6g} "
+                        f"exceeds {limit:.6g} (baseline {baseline_measures[measure]:.6g} "
+                        f"+ {threshold:.0%})"
+                    )
+
+    return regressions
+
+
+def format_results(results: dict, baseline: Optional[dict] = None) -> str:
+    """
+    Returns:
+        str -> Table of the results of run_benchmark, with the change over the baseline
+    """
+    baseline = baseline or dict()
+    lines = [
+        f"{'rows':>10} {'ms':>10} {'vs base':>8} {'peak MiB':>9} {'vs base':>8}  step"
+    ]
+
+    def change(value: float, baseline_value: Optional[float]) -> str:
+        if not baseline_value:
+            return "-"
+        return f"{value / baseline_value - 1:+.0%}"
+
+    for name, results_by_size in results.items():
+        for rows, measures in results_by_size.items():
+            baseline_measures = baseline.get(name, dict()).get(rows, dict())
+            lines.append(
+                f"{rows:>10} {measures['seconds'] * 1000:>10.1f} "
+                f"{change(measures['seconds'], baseline_measures.get('seconds')):>8} "
+                f"{measures['peak_memory_bytes'] / 2**20:>9.1f} "
+                f"{change(measures['peak_memory_bytes'], baseline_measures.get('peak_memory_bytes')):>8}"
+                f"  {name}"
+            )
+
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the pandas steps of the pipeline against a stored baseline"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_SIZES),
+        help="Number of articles the steps are measured with",
+    )
+    parser.add_argument("--repeats", type=int, default=5, help="Runs of each step")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--time-threshold", type=float, default=DEFAULT_TIME_THRESHOLD)
+    parser.add_argument(
+        "--memory-threshold", type=float, default=DEFAULT_MEMORY_THRESHOLD
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write the results as the new baseline instead of comparing them",
+    )
+    args = parser.parse_args()
+
+    # The steps log every call
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    results = run_benchmark(sizes=tuple(args.sizes), repeats=args.repeats)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+            file.write("\n")
+
+        print(format_results(results))
+        print(f"Baseline written to {args.baseline}")
+        sys.exit(0)
+
+    baseline = dict()
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    print(format_results(results, baseline))
+
+    regressions = find_regressions(
+        results, baseline, args.time_threshold, args.memory_threshold
+    )
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+
+    sys.exit(1 if regressions else 0)
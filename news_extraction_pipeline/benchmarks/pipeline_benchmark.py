@@ -0,0 +1,289 @@
+import argparse
+import json
+import math
+import os
+import resource
+import sys
+import tempfile
+from loguru import logger
+from typing import Optional
+
+from news_extraction_pipeline.benchmarks.fake_news_site import (
+    FEED_PATHS,
+    FakeNewsSite,
+    generate_certificate,
+)
+
+# Allows the port of the fake site in the links of the articles
+LOCAL_BASE_URL_PATTERN = r"https://[\w\.:-]+/"
+
+# Settings applied unless they are already in the environment. The rate limits are raised so
+# the benchmark measures the pipeline rather than the politeness towards the real sites
+DEFAULT_BENCHMARK_SETTINGS = {
+    "RATE_LIMIT_MAX_REQUESTS_PER_SECOND": "10000",
+    "RATE_LIMIT_BURST": "10000",
+}
+
+
+def percentile(values: list[float], q: float) -> Optional[float]:
+    """
+    Args:
+        values: list[float] -> Values measured
+        q: float -> Percentile, between 0 and 100
+
+    Returns:
+        Optional[float] -> Percentile of the values, interpolating between the closest
+                            ranks. None if there are no values
+    """
+    if not values:
+        return None
+
+    ordered_values = sorted(values)
+    rank = (len(ordered_values) - 1) * q / 100
+    lower_rank, upper_rank = math.floor(rank), math.ceil(rank)
+
+    return ordered_values[lower_rank] + (
+        ordered_values[upper_rank] - ordered_values[lower_rank]
+    ) * (rank - lower_rank)
+
+
+def peak_rss_bytes() -> int:
+    """
+    Returns:
+        int -> Peak resident memory of the current process
+    """
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Reported in bytes on macOS and in kilobytes on Linux
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def configure_environment(
+    site: FakeNewsSite, cert_file: str, work_dir: str, table_backend: str = "memory"
+) -> None:
+    """
+    Points the pipeline at the fake site, with a local table and its local state in
+    work_dir. Must be called before the settings of the pipeline are loaded
+
+    Args:
+        site: FakeNewsSite -> Site already started
+        cert_file: str -> Certificate of the site, trusted by the HTTP clients
+        work_dir: str -> Directory for the local state of the pipeline
+        table_backend: str -> NEWS_TABLE_BACKEND used, memory or sqlite
+    """
+    if table_backend not in ("memory", "sqlite"):
+        raise ValueError("table_backend must be memory or sqlite")
+
+    if "news_extraction_pipeline.config" in sys.modules:
+        raise RuntimeError(
+            "The environment must be configured before the settings of the pipeline are loaded"
+        )
+
+    os.environ.update(site.feed_urls)
+    os.environ.update(
+        {
+            "BASE_URL_PATTERN": LOCAL_BASE_URL_PATTERN,
+            "NEWS_TABLE_BACKEND": table_backend,
+            "NEWS_TABLE_PATH": os.path.join(work_dir, "news.db"),
+            "HTTP_CACHE_ENABLED": "false",
+            "STATE_STORE_PATH": os.path.join(work_dir, "state.db"),
+            # Trusted by httpx and requests respectively
+            "SSL_CERT_FILE": cert_file,
+            "REQUESTS_CA_BUNDLE": cert_file,
+        }
+    )
+    for name, value in DEFAULT_BENCHMARK_SETTINGS.items():
+        os.environ.setdefault(name, value)
+
+
+def summarize(run_reports: list[dict], articles_per_run: list[int]) -> dict:
+    """
+    Args:
+        run_reports: list[dict] -> Reports of the runs measured (attrs["run_report"])
+        articles_per_run: list[int] -> Articles returned by each run
+
+    Returns:
+        dict -> Throughput, p50 and p95 of the wall time of the runs and of each step, and
+                peak RSS of the process
+    """
+    run_seconds = [report["total_wall_seconds"] for report in run_reports]
+
+    step_seconds: dict[str, list[float]] = dict()
+    for report in run_reports:
+        for step in report["steps"]:
+            step_seconds.setdefault(step["name"], list()).append(step["wall_seconds"])
+
+    return {
+        "runs": len(run_reports),
+        "articles": sum(articles_per_run),
+        "articles_per_second": (
+            sum(articles_per_run) / sum(run_seconds) if sum(run_seconds) else None
+        ),
+        "run_seconds": {
+            "p50": percentile(run_seconds, 50),
+            "p95": percentile(run_seconds, 95),
+        },
+        "step_seconds": {
+            name: {"p50": percentile(values, 50), "p95": percentile(values, 95)}
+            for name, values in step_seconds.items()
+        },
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def run_benchmark(
+    runs: int = 5,
+    warmup_runs: int = 1,
+    entries_per_feed: int = 50,
+    page_size_bytes: int = 50_000,
+    latency_seconds: float = 0.0,
+    error_rate: float = 0.0,
+    open_graph: bool = True,
+    widget_containers: int = 1,
+    seed: int = 0,
+    table_backend: str = "memory",
+) -> dict:
+    """
+    Runs pipeline.main end to end against a FakeNewsSite, storing the articles in a local
+    table that is emptied before each run, so every run extracts all of them.
+    The settings of the pipeline are loaded by this function, so it can only be called once
+    per process
+
+    Args:
+        runs: int -> Runs measured
+        warmup_runs: int -> Runs done before the measured ones, and left out of the results
+        table_backend: str -> NEWS_TABLE_BACKEND used, memory or sqlite
+        Rest of the arguments as in FakeNewsSite
+
+    Returns:
+        dict -> Settings of the benchmark and its results, as returned by summarize
+    """
+    if runs < 1 or warmup_runs < 0:
+        raise ValueError("runs must be positive and warmup_runs not negative")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        cert_file, key_file = generate_certificate(work_dir)
+
+        with FakeNewsSite(
+            cert_file,
+            key_file,
+            entries_per_feed=entries_per_feed,
+            page_size_bytes=page_size_bytes,
+            latency_seconds=latency_seconds,
+            error_rate=error_rate,
+            open_graph=open_graph,
+            widget_containers=widget_containers,
+            seed=seed,
+        ) as site:
+            configure_environment(site, cert_file, work_dir, table_backend)
+
+            from news_extraction_pipeline import pipeline
+            from news_extraction_pipeline.resources import get_news_extraction_table
+
+            run_reports, articles_per_run = list(), list()
+            for run in range(warmup_runs + runs):
+                get_news_extraction_table().clear()
+                articles = pipeline.main(incremental=False)
+
+                if run >= warmup_runs:
+                    run_reports.append(articles.attrs["run_report"])
+                    articles_per_run.append(len(articles))
+
+    return {
+        "settings": {
+            "runs": runs,
+            "warmup_runs": warmup_runs,
+            "feeds": len(FEED_PATHS),
+            "entries_per_feed": entries_per_feed,
+            "page_size_bytes": page_size_bytes,
+            "latency_seconds": latency_seconds,
+            "error_rate": error_rate,
+            "open_graph": open_graph,
+            "widget_containers": widget_containers,
+            "table_backend": table_backend,
+        },
+        "results": summarize(run_reports, articles_per_run),
+    }
+
+
+def format_results(benchmark: dict) -> str:
+    """
+    Returns:
+        str -> Table of the results of run_benchmark, in milliseconds
+    """
+    results = benchmark["results"]
+    lines = [
+        f"Runs: {results['runs']}, articles: {results['articles']}, "
+        f"articles/s: {results['articles_per_second'] or 0:.1f}, "
+        f"peak RSS: {results['peak_rss_bytes'] / 2**20:.1f} MiB",
+        f"{'p50 ms':>10} {'p95 ms':>10}  stage",
+    ]
+
+    stages = {"total": results["run_seconds"], **results["step_seconds"]}
+    for name, seconds in stages.items():
+        lines.append(
+            f"{seconds['p50'] * 1000:>10.1f} {seconds['p95'] * 1000:>10.1f}  {name}"
+        )
+
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the news extraction pipeline against a local fake news site"
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Runs measured")
+    parser.add_argument("--warmup-runs", type=int, default=1, help="Runs not measured")
+    parser.add_argument("--entries", type=int, default=50, help="Entries of each feed")
+    parser.add_argument(
+        "--page-kb", type=float, default=50, help="Size of each article page in KB"
+    )
+    parser.add_argument(
+        "--latency-ms", type=float, default=0, help="Delay of each article response"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0, help="Fraction of articles failing"
+    )
+    parser.add_argument(
+        "--no-open-graph",
+        action="store_true",
+        help="Leave out og:image, so the site specific image extractors are used",
+    )
+    parser.add_argument(
+        "--widget-containers",
+        type=int,
+        default=1,
+        help="AI-News widget containers per article, the 800px image being in the last one",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the errors")
+    parser.add_argument(
+        "--table-backend",
+        choices=["memory", "sqlite"],
+        default="memory",
+        help="Table where the articles are stored",
+    )
+    parser.add_argument("--output", help="JSON file where the results are written")
+    args = parser.parse_args()
+
+    # The logs of every step and article would hide the results
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+    benchmark = run_benchmark(
+        runs=args.runs,
+        warmup_runs=args.warmup_runs,
+        entries_per_feed=args.entries,
+        page_size_bytes=int(args.page_kb * 1000),
+        latency_seconds=args.latency_ms / 1000,
+        error_rate=args.error_rate,
+        open_graph=not args.no_open_graph,
+        widget_containers=args.widget_containers,
+        seed=args.seed,
+        table_backend=args.table_backend,
+    )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(benchmark, file, indent=2)
+
+    print(format_results(benchmark))
@@ -1,6 +1,7 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import Annotated
+from typing import Annotated, Literal
 
 
 class AINewsConfig(BaseSettings):
@@ -46,9 +47,268 @@ class AINewsConfig(BaseSettings):
             description="Name of the column that will be filtered by keywords",
         ),
     ]
+    HTTP_USER_AGENT: Annotated[
+        str,
+        Field(
+            default="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36",
+            description="User-Agent header sent when fetching feeds and articles",
+        ),
+    ]
+    HTTP_TIMEOUT_SECONDS: Annotated[
+        float,
+        Field(
+            default=60,
+            description="Seconds to wait for a response when fetching feeds and articles",
+            gt=0,
+        ),
+    ]
+    HTTP_MAX_CONNECTIONS: Annotated[
+        int,
+        Field(
+            default=20,
+            description="Maximum number of feed and article requests in flight at the same time",
+            ge=1,
+        ),
+    ]
+    HTTP_MAX_CONNECTIONS_PER_HOST: Annotated[
+        int,
+        Field(
+            default=5,
+            description="Maximum number of requests in flight at the same time to a single host",
+            ge=1,
+        ),
+    ]
+    IMAGE_EXTRACTION_MAX_WORKERS: Annotated[
+        int,
+        Field(
+            default=8,
+            description="Maximum number of articles of a feed whose image is extracted at the same time",
+            ge=1,
+        ),
+    ]
+    NEWS_TABLE_BACKEND: Annotated[
+        Literal["bigquery", "memory", "sqlite"],
+        Field(
+            default="bigquery",
+            description="Type of table where the articles extracted are stored. memory keeps them only while the process runs, and sqlite in a local file (e.g. for local runs and benchmarks)",
+        ),
+    ]
+    NEWS_TABLE_PATH: Annotated[
+        str,
+        Field(
+            default="news_extraction_pipeline_news.db",
+            description="Path of the SQLite file where the articles are stored, if NEWS_TABLE_BACKEND is sqlite",
+        ),
+    ]
+    STATE_STORE_BACKEND: Annotated[
+        Literal["sqlite", "json"],
+        Field(
+            default="sqlite",
+            description="Type of local store where the state kept between runs (e.g. feed validators) is persisted",
+        ),
+    ]
+    STATE_STORE_PATH: Annotated[
+        str,
+        Field(
+            default="news_extraction_pipeline_state.db",
+            description="Path of the file where the state kept between runs is persisted",
+        ),
+    ]
+    HTTP_CACHE_ENABLED: Annotated[
+        bool,
+        Field(
+            default=True,
+            description="Keep the html of the articles fetched in a local cache shared between runs",
+        ),
+    ]
+    HTTP_CACHE_PATH: Annotated[
+        str,
+        Field(
+            default="news_extraction_pipeline_http_cache.db",
+            description="Path of the SQLite file where the html of the articles is cached",
+        ),
+    ]
+    HTTP_CACHE_TTL_SECONDS: Annotated[
+        float,
+        Field(
+            default=24 * 60 * 60,
+            description="Seconds the html of an article is kept in the cache",
+            gt=0,
+        ),
+    ]
+    HTTP_CACHE_MAX_SIZE_MB: Annotated[
+        float,
+        Field(
+            default=100,
+            description="Maximum size (compressed) of the html cache. Least recently used pages are evicted",
+            gt=0,
+        ),
+    ]
+    HTTP_MAX_PAGE_SIZE_MB: Annotated[
+        float,
+        Field(
+            default=5,
+            description="Maximum size of an article page downloaded while looking for its image, in case its stop reading pattern never matches",
+            gt=0,
+        ),
+    ]
+    RATE_LIMIT_MAX_REQUESTS_PER_SECOND: Annotated[
+        float,
+        Field(
+            default=5,
+            description="Maximum requests per second sent to a single host. Reduced automatically while the host throttles",
+            gt=0,
+        ),
+    ]
+    RATE_LIMIT_BURST: Annotated[
+        int,
+        Field(
+            default=5,
+            description="Requests that can be sent at once to a single host before being rate limited",
+            ge=1,
+        ),
+    ]
+    RATE_LIMIT_LATENCY_TARGET_SECONDS: Annotated[
+        float,
+        Field(
+            default=5,
+            description="Responses slower than this reduce the requests in flight allowed to their host",
+            gt=0,
+        ),
+    ]
+    FEED_TIMEOUT_SECONDS: Annotated[
+        float,
+        Field(
+            default=15,
+            description="Seconds to wait for a feed response, lower than HTTP_TIMEOUT_SECONDS so a slow feed is given up early",
+            gt=0,
+        ),
+    ]
+    HTTP_RETRY_MAX_ATTEMPTS: Annotated[
+        int,
+        Field(
+            default=3,
+            description="Attempts done for requests failing with transient errors (timeouts, connection errors, 429 and 5xx)",
+            ge=1,
+        ),
+    ]
+    HTTP_RETRY_BASE_DELAY_SECONDS: Annotated[
+        float,
+        Field(
+            default=0.5,
+            description="Maximum delay before the first retry, doubled on every retry (with full jitter)",
+            ge=0,
+        ),
+    ]
+    HTTP_RETRY_MAX_DELAY_SECONDS: Annotated[
+        float,
+        Field(
+            default=8,
+            description="Maximum delay before any retry",
+            ge=0,
+        ),
+    ]
+    FEED_CIRCUIT_BREAKER_FAILURE_THRESHOLD: Annotated[
+        int,
+        Field(
+            default=3,
+            description="Consecutive failed runs after which a feed is skipped during the cool-down",
+            ge=1,
+        ),
+    ]
+    FEED_CIRCUIT_BREAKER_COOLDOWN_SECONDS: Annotated[
+        float,
+        Field(
+            default=30 * 60,
+            description="Seconds a failing feed is skipped before trying it again",
+            gt=0,
+        ),
+    ]
+    DEADLINE_STORE_RESERVE_SECONDS: Annotated[
+        float,
+        Field(
+            default=10,
+            description="Seconds of a request deadline reserved to store the articles extracted, so partial results are not lost",
+            ge=0,
+        ),
+    ]
+    DEADLINE_STORE_RESERVE_MAX_FRACTION: Annotated[
+        float,
+        Field(
+            default=0.25,
+            description="Maximum fraction of a request deadline reserved to store the articles, so short deadlines still leave time to extract them",
+            gt=0,
+            lt=1,
+        ),
+    ]
+    RESULT_CACHE_ENABLED: Annotated[
+        bool,
+        Field(
+            default=True,
+            description="Reuse the results of /extract_articles for identical arguments, and run concurrent identical requests once",
+        ),
+    ]
+    RESULT_CACHE_TTL_SECONDS: Annotated[
+        float,
+        Field(
+            default=5 * 60,
+            description="Seconds the results of /extract_articles are reused",
+            gt=0,
+        ),
+    ]
+    RESULT_CACHE_MAX_ENTRIES: Annotated[
+        int,
+        Field(
+            default=128,
+            description="Maximum number of results of /extract_articles kept",
+            ge=1,
+        ),
+    ]
+    JOB_STORE_BACKEND: Annotated[
+        Literal["memory", "sqlite"],
+        Field(
+            default="memory",
+            description="Type of store where the jobs of /jobs and their results are kept",
+        ),
+    ]
+    JOB_STORE_PATH: Annotated[
+        str,
+        Field(
+            default="news_extraction_pipeline_jobs.db",
+            description="Path of the SQLite file where the jobs are kept, if JOB_STORE_BACKEND is sqlite",
+        ),
+    ]
+    JOB_STORE_MAX_JOBS: Annotated[
+        int,
+        Field(
+            default=1000,
+            description="Maximum number of jobs kept. The oldest ones are removed",
+            ge=1,
+        ),
+    ]
+    JOBS_MAX_CONCURRENT: Annotated[
+        int,
+        Field(
+            default=1,
+            description="Maximum number of jobs running at the same time. The rest wait as pending",
+            ge=1,
+        ),
+    ]
 
     # To force to read .env file
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
         extra = "allow"
+
+
+@lru_cache(maxsize=1)
+def get_news_config() -> AINewsConfig:
+    """
+    Gets the AINewsConfig, read from the environment and the .env file on the first call and
+    shared by the whole process
+
+    Returns:
+        AINewsConfig -> The config
+    """
+    return AINewsConfig()
@@ -0,0 +1,246 @@
+from abc import ABC, abstractmethod
+import pandas as pd
+from loguru import logger
+from typing import Callable, Optional
+
+from database.state import StateStore
+from news_extraction_pipeline.keyword_matching import compile_keyword_matcher
+
+# Namespace of the StateStore where the watermark of each feed is kept
+FEED_WATERMARKS_NAMESPACE = "feed_watermarks"
+
+
+class BaseEntryFilter(ABC):
+    """
+    Filters applied by the NewsExtractor over the raw entries of a feed, right after the feed is
+    parsed and before any article page is fetched. Each raw entry is a dictionary with the keys:
+        - title
+        - news_link
+        - publish_date (pd.Timestamp in UTC)
+    """
+
+    @abstractmethod
+    def filter(self, feed_url: str, entries: list[dict]) -> list[dict]:
+        """
+        Args:
+            feed_url: str -> Feed the entries come from
+            entries: list[dict] -> Raw entries of the feed
+
+        Returns:
+            list[dict] -> Entries that must be kept
+        """
+        pass
+
+
+class PredicateEntryFilter(BaseEntryFilter):
+    """
+    Applies the same date and keyword predicates as filter_by_date_threshold and
+    filter_by_keywords, but over the feed metadata, so discarded articles are never fetched.
+    If the keywords are searched in a column the raw entries do not have (e.g. image_link),
+    the keyword predicate is left to filter_by_keywords
+    """
+
+    def __init__(
+        self,
+        max_days_old: int,
+        case_sen_search_kw: list[str],
+        case_insen_search_kw: list[str],
+        filter_column: str = "title",
+    ):
+        """
+        Args:
+            max_days_old: int -> Maximum days old an entry must have
+            case_sen_search_kw: list[str] -> Case Sensitive Search Keywords
+            case_insen_search_kw: list[str] -> Case Insensitive Search Keywords
+            filter_column: str -> Key of the entries the keywords are searched in. The same
+                                column used by filter_by_keywords
+        """
+        self.__max_days_old = max_days_old
+        self.__filter_column = filter_column
+        self.__case_sen_search_kw = case_sen_search_kw
+        self.__case_insen_search_kw = case_insen_search_kw
+        self.__keyword_matcher = compile_keyword_matcher(
+            tuple(case_sen_search_kw), tuple(case_insen_search_kw)
+        )
+
+    @property
+    def max_days_old(self) -> int:
+        return self.__max_days_old
+
+    @property
+    def filter_column(self) -> str:
+        return self.__filter_column
+
+    @property
+    def case_sen_search_kw(self) -> list[str]:
+        return self.__case_sen_search_kw
+
+    @property
+    def case_insen_search_kw(self) -> list[str]:
+        return self.__case_insen_search_kw
+
+    def filter(self, feed_url: str, entries: list[dict]) -> list[dict]:
+        # As publish_date is in UTC, the current_date must also be in this timezone
+        max_publish_date = pd.Timestamp.utcnow() - pd.Timedelta(days=self.max_days_old)
+
+        kept_entries = [
+            entry
+            for entry in entries
+            if entry["publish_date"] >= max_publish_date
+            and (
+                self.__filter_column not in entry
+                or self.__keyword_matcher.matches(entry[self.__filter_column])
+            )
+        ]
+
+        logger.info(
+            f"{len(kept_entries)} of {len(entries)} entries from {feed_url} match the "
+            "date and keyword filters"
+        )
+
+        return kept_entries
+
+
+class KnownArticleEntryFilter(BaseEntryFilter):
+    """
+    Drops the entries whose article is already stored in the database, so their pages are not
+    fetched again
+    """
+
+    def __init__(self, stored_links_lookup: Callable[[list[str]], set[str]]):
+        """
+        Args:
+            stored_links_lookup: Callable[[list[str]], set[str]] -> Receives a list of news links
+                                and returns the ones already stored
+        """
+        self.__stored_links_lookup = stored_links_lookup
+
+    def filter(self, feed_url: str, entries: list[dict]) -> list[dict]:
+        try:
+            stored_links = self.__stored_links_lookup(
+                [entry["news_link"] for entry in entries]
+            )
+
+        except Exception as e:
+            # The database deduplication is still done when storing the articles
+            logger.error(
+                f"Stored articles from {feed_url} could not be checked, keeping all of them: {e}"
+            )
+            return entries
+
+        kept_entries = [
+            entry for entry in entries if entry["news_link"] not in stored_links
+        ]
+
+        logger.info(
+            f"{len(entries) - len(kept_entries)} of {len(entries)} entries from {feed_url} "
+            "are already stored"
+        )
+
+        return kept_entries
+
+
+class WatermarkEntryFilter(BaseEntryFilter):
+    """
+    Keeps, per feed, the publish_date of the latest article successfully stored (watermark), and
+    drops the entries published at or before it, so each run only processes the new entries.
+    The articles stored depend on the filters of the run, so the watermarks are kept per feed
+    and filter_key: a run never skips the older entries that only its filters would keep
+    """
+
+    def __init__(self, state_store: StateStore, filter_key: Optional[str] = None):
+        """
+        Args:
+            state_store: StateStore -> Store where the watermarks are persisted between runs
+            filter_key: Optional[str] -> Identifies the filters of the run (e.g.
+                            PipelineArgs.filter_key). If None, the watermarks are kept per feed
+        """
+        self.__state_store = state_store
+        self.__filter_key = filter_key
+
+    def __state_key(self, feed_url: str) -> str:
+        if self.__filter_key is None:
+            return feed_url
+
+        return f"{feed_url}#{self.__filter_key}"
+
+    def get_watermark(self, feed_url: str) -> Optional[pd.Timestamp]:
+        """
+        Args:
+            feed_url: str -> Feed to get the watermark from
+
+        Returns:
+            Optional[pd.Timestamp] -> Watermark of the feed (UTC), None if it has none yet
+        """
+        watermark = self.__state_store.get(
+            FEED_WATERMARKS_NAMESPACE, self.__state_key(feed_url)
+        )
+
+        return pd.Timestamp(watermark["publish_date"]) if watermark else None
+
+    def update_watermark(self, feed_url: str, publish_date: pd.Timestamp) -> None:
+        """
+        Moves the watermark of a feed forward. Dates older than the current watermark are ignored
+
+        Args:
+            feed_url: str -> Feed the stored articles come from
+            publish_date: pd.Timestamp -> publish_date (UTC) of the latest article stored
+        """
+        current_watermark = self.get_watermark(feed_url)
+
+        if current_watermark is not None and publish_date <= current_watermark:
+            return
+
+        self.__state_store.set(
+            FEED_WATERMARKS_NAMESPACE,
+            self.__state_key(feed_url),
+            {"publish_date": publish_date.isoformat()},
+        )
+        logger.info(f"Watermark of {feed_url} moved to {publish_date}")
+
+    def filter(self, feed_url: str, entries: list[dict]) -> list[dict]:
+        try:
+            watermark = self.get_watermark(feed_url)
+
+        except Exception as e:
+            logger.error(
+                f"Watermark of {feed_url} could not be read, keeping all the entries: {e}"
+            )
+            return entries
+
+        if watermark is None:
+            return entries
+
+        kept_entries = [entry for entry in entries if entry["publish_date"] > watermark]
+
+        logger.info(
+            f"{len(kept_entries)} of {len(entries)} entries from {feed_url} were published "
+            f"after its watermark ({watermark})"
+        )
+
+        return kept_entries
+
+
+class CountingEntryFilter(BaseEntryFilter):
+    """
+    Wraps another filter, reporting how many entries it drops from each feed (e.g. to export
+    them as metrics)
+    """
+
+    def __init__(
+        self, entry_filter: BaseEntryFilter, on_dropped: Callable[[str, int], None]
+    ):
+        """
+        Args:
+            entry_filter: BaseEntryFilter -> Filter applied
+            on_dropped: Callable[[str, int], None] -> Receives the feed_url and the number of
+                                entries dropped from it
+        """
+        self.__entry_filter = entry_filter
+        self.__on_dropped = on_dropped
+
+    def filter(self, feed_url: str, entries: list[dict]) -> list[dict]:
+        kept_entries = self.__entry_filter.filter(feed_url, entries)
+        self.__on_dropped(feed_url, len(entries) - len(kept_entries))
+
+        return kept_entries
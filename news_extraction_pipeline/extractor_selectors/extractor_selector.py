@@ -1,19 +1,22 @@
 from loguru import logger
 import re
-from typing import Optional, Type
+from typing import Type
 from news_extraction_pipeline.extractors.image_url.image_url_extractors import (
     BaseImageExtractor,
     AINEWSImageExtractor,
     MITImageExtractor,
+    OpenGraphImageExtractor,
 )
 
-from news_extraction_pipeline.config import AINewsConfig
+from news_extraction_pipeline.config import get_news_config
 
-news_config = AINewsConfig()
+news_config = get_news_config()
 
 
 class ImageExtractorSelector:
     __base_url_pattern: str = news_config.BASE_URL_PATTERN
+    # Used for the sites without a registered extractor
+    __default_extractor: Type[BaseImageExtractor] = OpenGraphImageExtractor
 
     def __init__(self):
         self.__extractors = self.__define_extractors()
@@ -49,7 +52,7 @@ class ImageExtractorSelector:
         """
         return re.search(self.__base_url_pattern, url).group().rstrip("/")
 
-    def get_extractor(self, url: str) -> Optional[BaseImageExtractor]:
+    def get_extractor(self, url: str) -> BaseImageExtractor:
         """
         Based on the extractors selected and the url introduced, retrieves
         a BaseImageExtractor instance
@@ -58,17 +61,12 @@ class ImageExtractorSelector:
             url: str -> Link to the news article
 
         Returns:
-            Optional[BaseImageExtractor]: An instance of a BaseImageExtractor the right one is found
+            BaseImageExtractor: An instance of the BaseImageExtractor registered for the site,
+                                or of the default one if there is none
         """
         base_url = self._get_base_url(url=url)
 
-        extractor = self.extractors.get(base_url, None)
-
-        if not extractor:
-            logger.warning(
-                f"No image extractor found for the url: {url}. The data retrieve will not contain an image_url"
-            )
-            return None
+        extractor = self.extractors.get(base_url, self.__default_extractor)
 
         logger.info(
             f"Extractor '{extractor.__name__}' selected for base URL: {base_url}"
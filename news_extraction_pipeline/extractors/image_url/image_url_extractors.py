@@ -1,14 +1,24 @@
 from abc import ABC, abstractmethod
-from bs4 import BeautifulSoup
+import itertools
+from bs4 import BeautifulSoup, SoupStrainer
 import requests
 from loguru import logger
-from typing import Optional
+from typing import Iterable, Optional
+from urllib.parse import urljoin
 import re
 
-from news_extraction_pipeline.config import AINewsConfig
+from news_extraction_pipeline.config import get_news_config
+from news_extraction_pipeline.resources import (
+    get_rate_limiter,
+    get_response_cache,
+    get_retry_policy,
+)
+from utils.deadline import Deadline
+from utils.http.rate_limiter import parse_retry_after
+from utils.http.streaming import read_until_match
 
 
-news_config = AINewsConfig()
+news_config = get_news_config()
 
 
 class BaseImageExtractor(ABC):
@@ -16,6 +26,17 @@ class BaseImageExtractor(ABC):
     __base_url_pattern: str = news_config.BASE_URL_PATTERN
     _feed_url: Optional[str] = None
     _base_feed_url: Optional[str] = None
+    # Optional class attributes to avoid downloading and parsing the whole article:
+    #   _stop_reading_pattern -> Once the downloaded html matches it, the rest is not downloaded.
+    #       The html is searched as it arrives, so its matches must be bounded in length (up to
+    #       STOP_PATTERN_OVERLAP_BYTES)
+    #   _parse_only -> Only the tags matched by it are parsed
+    _stop_reading_pattern: Optional[re.Pattern] = None
+    _parse_only: Optional[SoupStrainer] = None
+    # Generic extractors work for any site, so they do not define a _feed_url
+    _generic: bool = False
+    # Try first the Open Graph metadata of the article, which only requires its <head>
+    _open_graph_first: bool = True
 
     def __init__(self):
         self.current_article_url: Optional[str] = None
@@ -27,6 +48,9 @@ class BaseImageExtractor(ABC):
         """
         Make sure subclasses defines required attributes
         """
+        if cls._generic:
+            cls._base_feed_url = None
+            return
 
         if not cls._feed_url:
             raise NotImplementedError(
@@ -49,49 +73,170 @@ class BaseImageExtractor(ABC):
         """
         return re.search(cls.__base_url_pattern, url).group().rstrip("/")
 
-    def _fetch_html_code(self, article_url: str) -> bool:
+    def _supports_url(self, article_url: str) -> bool:
         """
-        Protected method; retrieves the HTML code from the article_url. If the
-        extraction was sucessful, stores the html and the article_url as instance attributes
+        Checks if the article_url belongs to the site of the extractor, logging an error if not
+
+        Args:
+            article_url: str -> URL of the article
+
+        Returns:
+            bool -> True if the extractor can be used with the article_url
+        """
+        if self._generic or self._get_base_url(article_url) == self._base_feed_url:
+            return True
+
+        logger.error(
+            f"The URL introduced in article_url: {article_url} does not correspond to the ImageExtractor defined"
+        )
+        return False
+
+    @property
+    def stop_reading_pattern(self) -> Optional[re.Pattern]:
+        return self._stop_reading_pattern
+
+    @property
+    def open_graph_first(self) -> bool:
+        return self._open_graph_first
+
+    def _has_needed_html(self, article_url: str, html_content: bytes) -> bool:
+        """
+        Protected method; checks if an html that might have been partially read (e.g. cached)
+        contains the part of the page this extractor needs
+
+        Args:
+            article_url: str -> URL the html belongs to
+            html_content: bytes -> Raw html code of the article_url
+
+        Returns:
+            bool: True if the image can be extracted from html_content
+        """
+        if self._stop_reading_pattern is None or self._stop_reading_pattern.search(
+            html_content
+        ):
+            return True
+
+        return (
+            self._open_graph_first
+            and OpenGraphImageExtractor().extract_from_html(article_url, html_content)
+            is not None
+        )
+
+    def _read_html(
+        self, article_url: str, chunks: Iterable[bytes], max_bytes: int
+    ) -> bytes:
+        """
+        Protected method; reads the html of the article_url from the chunks of its streamed
+        response. If _open_graph_first, only the <head> is read at first, and the rest of the
+        page is only read, up to _stop_reading_pattern, when the <head> has no Open Graph image
+
+        Args:
+            article_url: str -> URL the html belongs to
+            chunks: Iterable[bytes] -> Chunks of the response body, in order
+            max_bytes: int -> Bytes read at most
+
+        Returns:
+            bytes -> html read
+        """
+        chunks = iter(chunks)
+
+        if self._open_graph_first:
+            open_graph_extractor = OpenGraphImageExtractor()
+            head = read_until_match(
+                chunks, open_graph_extractor.stop_reading_pattern, max_bytes
+            )
+            if open_graph_extractor.extract_from_html(article_url, head):
+                return head
+
+            # The same response keeps being read
+            chunks = itertools.chain([head], chunks)
+
+        return read_until_match(chunks, self._stop_reading_pattern, max_bytes)
+
+    def _fetch_html_content(
+        self, article_url: str, deadline: Optional[Deadline] = None
+    ) -> Optional[bytes]:
+        """
+        Protected method; retrieves the HTML code from the article_url.
+        Pages are looked up first in the response cache shared by all the extractors, and the
+        html is streamed only until the part this extractor needs is read (see _read_html).
+        Requests are paced by the rate limiter shared by all the extractors, and retried if
+        they fail with transient errors
 
         Args:
             article_url: str -> URL that is required to get its html code
+            deadline: Optional[Deadline] -> Time budget of the request, which bounds the
+                            timeout of each attempt and the retries
         Returns:
-            bool: True if the retrieval was successfull otherwise False
+            Optional[bytes]: The html if the retrieval was successfull otherwise None
         """
         if not isinstance(article_url, str):
             raise ValueError(
                 "No article url has been introduced. Introduce a string representing the URL."
             )
 
-        # In case the html_code has already been extracted
-        if self.current_article_url == article_url:
-            return True
+        elif not self._supports_url(article_url):
+            return None
 
-        elif self._get_base_url(article_url) != self._base_feed_url:
-            logger.error(
-                f"The URL introduced in article_url: {article_url} does not correspond to the ImageExtractor defined"
-            )
-            return False
+        response_cache = get_response_cache()
+        cached_html = response_cache.get(article_url) if response_cache else None
+
+        # Cached html might have been partially read
+        if cached_html is not None and self._has_needed_html(article_url, cached_html):
+            return cached_html
 
         # Build header to get the html from the news_url
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
-        }
+        headers = {"User-Agent": news_config.HTTP_USER_AGENT}
+        deadline = deadline or Deadline()
+
+        def request() -> bytes:
+            with (
+                get_rate_limiter().limit(article_url) as permit,
+                requests.get(
+                    article_url,
+                    headers=headers,
+                    timeout=deadline.timeout(news_config.HTTP_TIMEOUT_SECONDS),
+                    stream=True,
+                ) as response,
+            ):
+                permit.record(
+                    response.status_code,
+                    parse_retry_after(response.headers.get("Retry-After")),
+                )
+                response.raise_for_status()
+                return self._read_html(
+                    article_url,
+                    response.iter_content(chunk_size=16 * 1024),
+                    max_bytes=int(news_config.HTTP_MAX_PAGE_SIZE_MB * 1024 * 1024),
+                )
 
         try:
-            response = requests.get(article_url, headers=headers, timeout=60)
-            response.raise_for_status()
+            html_content = get_retry_policy().run(
+                request, description=f"fetch {article_url}", deadline=deadline
+            )
 
-            self.current_html_code = BeautifulSoup(response.content, "html.parser")
-            self.current_article_url = article_url
+            if response_cache:
+                response_cache.set(article_url, html_content)
 
         except requests.RequestException as e:
             error_message = f"Error fetching html from page {article_url}: {e}"
             logger.error(error_message)
-            return False
+            return None
+
+        return html_content
 
-        return True
+    def _load_html_code(self, article_url: str, html_content: bytes) -> None:
+        """
+        Protected method; parses the html of the article_url and stores both as instance attributes
+
+        Args:
+            article_url: str -> URL the html belongs to
+            html_content: bytes -> Raw html code of the article_url
+        """
+        self.current_html_code = BeautifulSoup(
+            html_content, "html.parser", parse_only=self._parse_only
+        )
+        self.current_article_url = article_url
 
     @abstractmethod
     def _get_image_link(self) -> Optional[str]:
@@ -102,25 +247,150 @@ class BaseImageExtractor(ABC):
         """
         pass
 
-    def extract(self, article_url: str) -> Optional[str]:
+    def extract(
+        self, article_url: str, deadline: Optional[Deadline] = None
+    ) -> Optional[str]:
         """
-        Orchestrates the image URL extraction
+        Orchestrates the image URL extraction. If _open_graph_first, the Open Graph metadata
+        is tried before the site specific extraction, over the same response
         Args:
             article_url: str -> URL that is required to get its html code
+            deadline: Optional[Deadline] -> Time budget of the request
 
         Returns: Optional[str] -> URL of the main image of the url
         """
+        html_content = self._fetch_html_content(article_url, deadline)
+        if html_content is None:
+            return None
 
-        if self._fetch_html_code(article_url):
-            return self._get_image_link()
+        return self.extract_from_html(article_url, html_content)
 
+    def extract_from_html(
+        self, article_url: str, html_content: bytes, try_open_graph: bool = True
+    ) -> Optional[str]:
+        """
+        Gets the image URL from an html already downloaded (e.g. by an AsyncHTTPEngine),
+        so no request is done by the extractor
+
+        Args:
+            article_url: str -> URL the html belongs to
+            html_content: bytes -> Raw html code of the article_url
+            try_open_graph: bool -> False to skip the Open Graph metadata, e.g. if it was
+                                already tried over the <head> of the page
+
+        Returns: Optional[str] -> URL of the main image of the url
+        """
+        if not self._supports_url(article_url):
+            return None
+
+        if self._open_graph_first and try_open_graph:
+            image_link = OpenGraphImageExtractor().extract_from_html(
+                article_url, html_content
+            )
+            if image_link:
+                return image_link
+
+        self._load_html_code(article_url, html_content)
+
+        return self._get_image_link()
+
+
+class OpenGraphImageExtractor(BaseImageExtractor):
+    """
+    Generic extractor for any site. Gets the main image from the metadata in the <head> of the
+    article (og:image, twitter:image or link rel="image_src"), so the rest of the page is
+    neither downloaded nor parsed
+    """
+
+    _generic: bool = True
+    _open_graph_first: bool = False
+    _stop_reading_pattern: re.Pattern = re.compile(
+        rb"</head\s*>|<body[\s>]", re.IGNORECASE
+    )
+    _parse_only: SoupStrainer = SoupStrainer(["meta", "link"])
+    # Metadata checked in order of preference, as (attribute, value) of the <meta> tag
+    __image_meta_tags: tuple[tuple[str, str], ...] = (
+        ("property", "og:image:secure_url"),
+        ("property", "og:image"),
+        ("name", "twitter:image"),
+        ("name", "twitter:image:src"),
+    )
+
+    def _load_html_code(self, article_url: str, html_content: bytes) -> None:
+        # The html might contain the whole page (e.g. downloaded for another extractor),
+        # but only the <head> is needed
+        head_end = self._stop_reading_pattern.search(html_content)
+        if head_end:
+            html_content = html_content[: head_end.start()]
+
+        super()._load_html_code(article_url, html_content)
+
+    def _get_image_link(self) -> Optional[str]:
+        """
+        Get the main image from the Open Graph metadata of the article
+
+        Return:
+            Optional[str] -> Link to the main image
+        """
+        links = list()
+        for attribute, value in self.__image_meta_tags:
+            meta_tag = self.current_html_code.find(
+                "meta", attrs={attribute: re.compile(f"^{re.escape(value)}$", re.I)}
+            )
+            if meta_tag:
+                links.append(meta_tag.get("content", ""))
+
+        link_tag = self.current_html_code.find(
+            "link", rel=lambda rel: rel and "image_src" in rel, href=True
+        )
+        if link_tag:
+            links.append(link_tag["href"])
+
+        for link in links:
+            image_link = self.__to_https_link(link)
+            if image_link:
+                return image_link
+
+        logger.info(f"No Open Graph image found in {self.current_article_url}")
         return None
 
+    def __to_https_link(self, link: str) -> Optional[str]:
+        """
+        Resolves a link of the metadata against the article url, and upgrades it to https, as
+        the image links stored must be https ones
+
+        Args:
+            link: str -> Link as written in the metadata
+
+        Returns:
+            Optional[str] -> The https link, None if empty or of another scheme (e.g. data:)
+        """
+        link = link.strip()
+        if not link:
+            return None
+
+        link = urljoin(self.current_article_url, link)
+        if link.startswith("http://"):
+            link = "https://" + link[len("http://") :]
+
+        return link if link.startswith("https://") else None
+
 
 class MITImageExtractor(BaseImageExtractor):
     # Once defined _feed_url, automatically gets _base_feed_url due to the definition
     # in BaseImageExtractor
     _feed_url: str = news_config.MIT_NEWS_FEED_URL
+    # The main image is the first img inside the media container of the article. The pattern
+    # is tempered so the img must follow the closest container, within a bounded distance,
+    # which keeps the search linear and bounded in length
+    _stop_reading_pattern: re.Pattern = re.compile(
+        rb"news-article--media--image--file"
+        rb"(?:(?!news-article--media--image--file).){0,4096}?<img[^>]{0,1024}>",
+        re.DOTALL,
+    )
+    _parse_only: SoupStrainer = SoupStrainer(
+        "div", class_="news-article--media--image--file"
+    )
 
     # property decorator allows to access a method as if it was an attribute
     # also creates a read-only attribute
@@ -156,6 +426,15 @@ class MITImageExtractor(BaseImageExtractor):
 class AINEWSImageExtractor(BaseImageExtractor):
     # Private class attributes
     _feed_url: str = news_config.AI_NEWS_FEED_URL
+    # The main image is the first 800px wide img inside an elementor container. The pattern is
+    # tempered so the img must follow the closest container, within a bounded distance, which
+    # keeps the search linear and bounded in length
+    _stop_reading_pattern: re.Pattern = re.compile(
+        rb"elementor-widget-container(?:(?!elementor-widget-container).){0,4096}?"
+        rb"<img[^>]{0,1024}width=\"800\"[^>]{0,1024}>",
+        re.DOTALL,
+    )
+    _parse_only: SoupStrainer = SoupStrainer(class_="elementor-widget-container")
 
     # property decorator allows to access a method as if it was an attribute
     # also creates a read-only attribute
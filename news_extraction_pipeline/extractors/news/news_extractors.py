@@ -1,5 +1,9 @@
+import asyncio
+import concurrent.futures
 import feedparser
+import httpx
 import pandas as pd
+import requests
 from loguru import logger
 from typing import Type, Optional
 
@@ -8,21 +12,148 @@ from news_extraction_pipeline.extractor_selectors.extractor_selector import (
 )
 from news_extraction_pipeline.extractors.image_url.image_url_extractors import (
     BaseImageExtractor,
+    OpenGraphImageExtractor,
 )
+from news_extraction_pipeline.config import get_news_config
+from news_extraction_pipeline.entry_filters.entry_filters import BaseEntryFilter
+from news_extraction_pipeline.resources import get_rate_limiter
+from database.state import StateStore
+from utils.http.circuit_breaker import CircuitBreaker
+from utils.http.engine import AsyncHTTPEngine
+from utils.http.rate_limiter import parse_retry_after
+from utils.http.retry import RetryPolicy
+from utils.deadline import Deadline
+
+news_config = get_news_config()
+
+# Namespace of the StateStore where the HTTP validators of each feed are kept
+FEED_VALIDATORS_NAMESPACE = "feed_validators"
+
+
+class FeedValidators:
+    """
+    HTTP validators (ETag and Last-Modified) of the feeds, persisted in a StateStore between
+    runs. A 304 only means that nothing changed for the entries kept by the filters of the run
+    that saved the validators, so they are kept per feed and filter_key.
+
+    The validators received during a run are kept pending, and only persisted by save, which
+    must be called once the articles of the run are stored. Otherwise, a run that failed to
+    store its articles would make the next one skip them
+    """
+
+    def __init__(self, state_store: StateStore, filter_key: Optional[str] = None):
+        """
+        Args:
+            state_store: StateStore -> Store where the validators are persisted
+            filter_key: Optional[str] -> Identifies the filters of the run (e.g.
+                            PipelineArgs.filter_key). If None, the validators are kept per feed
+        """
+        self.__state_store = state_store
+        self.__filter_key = filter_key
+        self.__pending: dict[str, dict] = dict()
+
+    @property
+    def pending(self) -> dict[str, dict]:
+        return dict(self.__pending)
+
+    def __state_key(self, feed_url: str) -> str:
+        if self.__filter_key is None:
+            return feed_url
+
+        return f"{feed_url}#{self.__filter_key}"
+
+    def get(self, feed_url: str) -> dict:
+        """
+        Gets the validators saved for a feed during a previous run
+
+        Args:
+            feed_url: str -> Feed to get the validators from
+
+        Returns:
+            dict -> Dictionary with the keys 'etag' and 'modified', empty if there are none
+        """
+        try:
+            return (
+                self.__state_store.get(
+                    FEED_VALIDATORS_NAMESPACE, self.__state_key(feed_url)
+                )
+                or dict()
+            )
+
+        except Exception as e:
+            logger.warning(f"Validators of {feed_url} could not be read: {e}")
+            return dict()
+
+    def add_pending(
+        self, feed_url: str, etag: Optional[str], modified: Optional[str]
+    ) -> None:
+        """
+        Keeps the validators of a feed response until save is called
+
+        Args:
+            feed_url: str -> Feed the response comes from
+            etag: Optional[str] -> ETag header of the feed response
+            modified: Optional[str] -> Last-Modified header of the feed response
+        """
+        if etag or modified:
+            self.__pending[feed_url] = {"etag": etag, "modified": modified}
+
+    def save(self, skip_feed_urls: Optional[list[str]] = None) -> None:
+        """
+        Persists the pending validators, to be sent by the next runs
+
+        Args:
+            skip_feed_urls: Optional[list[str]] -> Feeds whose validators must not be saved
+                            (e.g. the ones truncated by a deadline, so the next run does not
+                            get a 304 and can process the articles dropped)
+        """
+        pending, self.__pending = self.__pending, dict()
+
+        for feed_url, validators in pending.items():
+            if feed_url in (skip_feed_urls or list()):
+                continue
+
+            try:
+                self.__state_store.set(
+                    FEED_VALIDATORS_NAMESPACE, self.__state_key(feed_url), validators
+                )
+
+            except Exception as e:
+                logger.warning(f"Validators of {feed_url} could not be saved: {e}")
 
 
 class NewsExtractor:
     __img_extr_selector: ImageExtractorSelector = ImageExtractorSelector()
 
-    def __init__(self):
+    def __init__(
+        self,
+        feed_validators: Optional[FeedValidators] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
         """
         Initializes a NewsExtractor instance.
+
+        Args:
+            feed_validators: Optional[FeedValidators] -> HTTP validators of the feeds, sent
+                            as conditional headers so the feeds that did not change are not
+                            downloaded nor parsed again. The validators of the responses are
+                            added to it as pending, to be saved by the caller once the articles
+                            are stored. If None, feeds are always downloaded
+            circuit_breaker: Optional[CircuitBreaker] -> Skips the feeds that keep failing. If
+                            None, feeds are always requested
+            retry_policy: Optional[RetryPolicy] -> Retries the feed requests of get_articles
+                            failing with transient errors. aget_articles uses the retry policy
+                            of its engine
         """
         # Private attributes, which cannot be directly accessed from the outside
         self.__current_feed_url: Optional[str] = None
         self.__previous_feed_url: Optional[str] = None
         self.__img_extractor: Optional[Type[BaseImageExtractor]] = None
         self.__current_data: Optional[pd.DataFrame] = None
+        self.__feed_validators: Optional[FeedValidators] = feed_validators
+        self.__circuit_breaker: Optional[CircuitBreaker] = circuit_breaker
+        self.__retry_policy: Optional[RetryPolicy] = retry_policy
 
     # @property -> to create a read-only attribute without exposing the real one.
     # Won't be allowed to set the attribute:
@@ -90,16 +221,28 @@ class NewsExtractor:
             and self.__previous_feed_url == self.__current_feed_url
         )
 
-    def get_articles(self) -> Optional[pd.DataFrame]:
+    def get_articles(
+        self,
+        entry_filters: Optional[list[BaseEntryFilter]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Optional[pd.DataFrame]:
         """
         Retrieves AI-related news data in its raw format from the feed_url. The data obtained per news is:
             - title
             - news_link
             - image_link
             - publish_date
+            - feed_url
 
         The data obtained is stored in self.__current_data
 
+        Args:
+            entry_filters: Optional[list[BaseEntryFilter]] -> Filters applied over the feed entries
+                                before extracting their images. Only the entries kept are returned
+            deadline: Optional[Deadline] -> Time budget. Once expired, the articles whose image
+                                extraction has not finished are dropped, and the feed is marked
+                                as truncated in the deadline
+
         Returns:
             Optional[pd.DataFrame] -> The data obtained
         """
@@ -109,35 +252,541 @@ class NewsExtractor:
             )
             return self.__current_data
 
+        deadline = deadline or Deadline()
+
+        if not self.__feed_request_allowed(deadline):
+            self.__current_data = None
+            return self.__current_data
+
+        response = self.__fetch_feed(
+            self.__get_conditional_headers(self.__get_feed_validators()), deadline
+        )
+        self.__record_feed_outcome(response, deadline)
+
+        if response is None:
+            self.__current_data = None
+            return self.__current_data
+
+        if response.status_code == 304:
+            return self.__feed_not_modified()
+
+        feed = feedparser.parse(response.content)
+
+        entries = self.__parse_entries(feed.entries)
+        if not entries:
+            return self.__build_articles(entries, list())
+
+        entries = self.__apply_entry_filters(entries, entry_filters)
+        article_urls = [entry["news_link"] for entry in entries]
+
+        if self.__img_extractor and article_urls:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=news_config.IMAGE_EXTRACTION_MAX_WORKERS
+            )
+            futures = [
+                executor.submit(self.__extract_image_link, url, deadline=deadline)
+                for url in article_urls
+            ]
+            concurrent.futures.wait(futures, timeout=deadline.remaining())
+            # Extractions not started are cancelled, and the running ones are not waited for
+            executor.shutdown(wait=False, cancel_futures=True)
+
+            entries, image_links = self.__drop_unfinished(
+                entries,
+                [future.result() if future.done() else None for future in futures],
+                [future.done() for future in futures],
+                deadline,
+            )
+
+        else:
+            image_links = [None] * len(article_urls)
+
+        articles = self.__build_articles(entries, image_links, feed_has_entries=True)
+        self.__add_pending_feed_validators(
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            deadline,
+        )
+
+        return articles
+
+    async def aget_articles(
+        self,
+        engine: AsyncHTTPEngine,
+        entry_filters: Optional[list[BaseEntryFilter]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Asynchronous version of get_articles. The feed and all its article pages are
+        downloaded concurrently through the engine's shared connection pool, and the
+        image extractor only parses the html already downloaded. The blocking work (the local
+        state, and parsing the feed and the html) runs in worker threads.
+
+        Args:
+            engine: AsyncHTTPEngine -> Opened engine used to perform every request
+            entry_filters: Optional[list[BaseEntryFilter]] -> Filters applied over the feed entries
+                                before fetching their article pages
+            deadline: Optional[Deadline] -> Time budget. Once expired, the articles whose page
+                                has not been fetched are dropped, and the feed is marked as
+                                truncated in the deadline
+
+        Returns:
+            Optional[pd.DataFrame] -> The data obtained
+        """
+        if self.articles_extracted():
+            logger.info(
+                f"Articles from feed url {self.__previous_feed_url} already extracted"
+            )
+            return self.__current_data
+
+        deadline = deadline or Deadline()
+
+        if not await asyncio.to_thread(self.__feed_request_allowed, deadline):
+            self.__current_data = None
+            return self.__current_data
+
+        feed_validators = await asyncio.to_thread(self.__get_feed_validators)
+        response = await engine.fetch(
+            self.__current_feed_url,
+            headers=self.__get_conditional_headers(feed_validators),
+            timeout=news_config.FEED_TIMEOUT_SECONDS,
+            deadline=deadline,
+        )
+        await asyncio.to_thread(self.__record_feed_outcome, response, deadline)
+
+        if response is None:
+            logger.error(
+                f"Articles from {self.__current_feed_url} could not be extracted"
+            )
+            self.__current_data = None
+            return self.__current_data
+
+        if response.status_code == 304:
+            return self.__feed_not_modified()
+
+        feed = await asyncio.to_thread(feedparser.parse, response.content)
+
+        entries = self.__parse_entries(feed.entries)
+        if not entries:
+            return self.__build_articles(entries, list())
+
+        # Filters might perform blocking calls (e.g. database queries)
+        entries = await asyncio.to_thread(
+            self.__apply_entry_filters, entries, entry_filters
+        )
+
+        if self.__img_extractor and entries:
+            image_tasks = [
+                asyncio.ensure_future(
+                    self.__afetch_image_link(engine, entry["news_link"], deadline)
+                )
+                for entry in entries
+            ]
+            await asyncio.wait(image_tasks, timeout=deadline.remaining())
+            for task in image_tasks:
+                task.cancel()  # Does nothing on the finished ones
+
+            finished = [task.done() and not task.cancelled() for task in image_tasks]
+            entries, image_links = self.__drop_unfinished(
+                entries,
+                [
+                    task.result() if task_finished else None
+                    for task, task_finished in zip(image_tasks, finished)
+                ],
+                finished,
+                deadline,
+            )
+
+        else:
+            image_links = [None] * len(entries)
+
+        articles = self.__build_articles(entries, image_links, feed_has_entries=True)
+        self.__add_pending_feed_validators(
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified"),
+            deadline,
+        )
+
+        return articles
+
+    def __fetch_feed(
+        self, conditional_headers: dict[str, str], deadline: Deadline
+    ) -> Optional[requests.Response]:
+        """
+        Requests the current feed, retrying it with the retry policy if it fails with a
+        transient error. Each attempt waits at most FEED_TIMEOUT_SECONDS or the time left in
+        the deadline, and the retries stop once it has expired
+
+        Args:
+            conditional_headers: dict[str, str] -> Conditional headers of the request
+            deadline: Deadline -> Time budget of the request
+
+        Returns:
+            Optional[requests.Response] -> The response, None if the request failed
+        """
+        headers = {"User-Agent": news_config.HTTP_USER_AGENT, **conditional_headers}
+
+        def request() -> requests.Response:
+            with get_rate_limiter().limit(self.__current_feed_url) as permit:
+                response = requests.get(
+                    self.__current_feed_url,
+                    headers=headers,
+                    timeout=deadline.timeout(news_config.FEED_TIMEOUT_SECONDS),
+                )
+                permit.record(
+                    response.status_code,
+                    parse_retry_after(response.headers.get("Retry-After")),
+                )
+
+            response.raise_for_status()
+            return response
+
         try:
-            feed = feedparser.parse(self.__current_feed_url)
+            if self.__retry_policy is None:
+                return request()
 
-        except Exception as e:
+            return self.__retry_policy.run(
+                request,
+                description=f"fetch {self.__current_feed_url}",
+                deadline=deadline,
+            )
+
+        except requests.RequestException as e:
             logger.error(
                 f"Articles from {self.__current_feed_url} could not be extracted: {e}"
             )
+            return None
 
-        extracted_articles = [
+    def __feed_request_allowed(self, deadline: Deadline) -> bool:
+        """
+        Checks the deadline and the circuit breaker of the current feed
+
+        Args:
+            deadline: Deadline -> Time budget of the request
+
+        Returns:
+            bool -> False if the feed must be skipped
+        """
+        if deadline.expired():
+            logger.warning(
+                f"Deadline expired before fetching {self.__current_feed_url}, skipping it"
+            )
+            deadline.mark_truncated(self.__current_feed_url)
+            return False
+
+        return self.__circuit_breaker is None or self.__circuit_breaker.allow_request(
+            self.__current_feed_url
+        )
+
+    def __record_feed_outcome(
+        self,
+        response: Optional[httpx.Response | requests.Response],
+        deadline: Deadline,
+    ) -> None:
+        """
+        Records the outcome of the current feed request in the circuit breaker. Any response
+        without an error status is a success, including a 304 for a feed that did not change.
+        A failure caused by the deadline expiring is not the feed's fault, so it is not recorded
+
+        Args:
+            response: Optional[httpx.Response | requests.Response] -> Response of the feed,
+                            None if the request failed
+            deadline: Deadline -> Time budget of the request
+        """
+        succeeded = response is not None and response.status_code < 400
+
+        if not succeeded and deadline.expired():
+            deadline.mark_truncated(self.__current_feed_url)
+            return
+
+        if self.__circuit_breaker is None:
+            return
+
+        if succeeded:
+            self.__circuit_breaker.record_success(self.__current_feed_url)
+        else:
+            self.__circuit_breaker.record_failure(self.__current_feed_url)
+
+    @staticmethod
+    def __get_conditional_headers(validators: dict) -> dict[str, str]:
+        """
+        Builds the conditional request headers from the validators of a feed
+
+        Args:
+            validators: dict -> Dictionary with the keys 'etag' and 'modified'
+
+        Returns:
+            dict[str, str] -> If-None-Match and If-Modified-Since headers, if available
+        """
+        return {
+            header: validators[validator]
+            for header, validator in [
+                ("If-None-Match", "etag"),
+                ("If-Modified-Since", "modified"),
+            ]
+            if validators.get(validator)
+        }
+
+    def __get_feed_validators(self) -> dict:
+        """
+        Gets the HTTP validators saved for the current feed during a previous run
+
+        Returns:
+            dict -> Dictionary with the keys 'etag' and 'modified', empty if there are none
+        """
+        if self.__feed_validators is None:
+            return dict()
+
+        return self.__feed_validators.get(self.__current_feed_url)
+
+    def __add_pending_feed_validators(
+        self,
+        etag: Optional[str],
+        modified: Optional[str],
+        deadline: Optional[Deadline] = None,
+    ) -> None:
+        """
+        Keeps the HTTP validators of the current feed as pending, to be saved once its articles
+        are stored. They are not kept if the feed was truncated, so the next run does not get a
+        304 and can process the articles dropped
+
+        Args:
+            etag: Optional[str] -> ETag header of the feed response
+            modified: Optional[str] -> Last-Modified header of the feed response
+            deadline: Optional[Deadline] -> Time budget of the request
+        """
+        if self.__feed_validators is None:
+            return
+
+        if deadline and self.__current_feed_url in deadline.truncated_sources:
+            return
+
+        self.__feed_validators.add_pending(self.__current_feed_url, etag, modified)
+
+    def __drop_unfinished(
+        self,
+        entries: list[dict],
+        image_links: list[Optional[str]],
+        finished: list[bool],
+        deadline: Deadline,
+    ) -> tuple[list[dict], list[Optional[str]]]:
+        """
+        Drops the entries whose image extraction did not finish before the deadline, marking
+        the current feed as truncated if there is any
+
+        Args:
+            entries: list[dict] -> Raw entries of the feed
+            image_links: list[Optional[str]] -> Image link of each entry
+            finished: list[bool] -> True for the entries whose extraction finished
+
+        Returns:
+            tuple[list[dict], list[Optional[str]]] -> Entries and image links kept
+        """
+        if all(finished):
+            return entries, image_links
+
+        logger.warning(
+            f"Deadline expired, dropping {finished.count(False)} of {len(entries)} articles "
+            f"from {self.__current_feed_url}"
+        )
+        deadline.mark_truncated(self.__current_feed_url)
+
+        kept = [
+            (entry, image_link)
+            for entry, image_link, is_finished in zip(entries, image_links, finished)
+            if is_finished
+        ]
+
+        return [entry for entry, _ in kept], [image_link for _, image_link in kept]
+
+    def __feed_not_modified(self) -> pd.DataFrame:
+        """
+        Handles a feed that has not changed since the last run (HTTP 304). Nothing is parsed
+        and no article is fetched
+
+        Returns:
+            pd.DataFrame -> Empty DataFrame of articles
+        """
+        logger.info(
+            f"Feed {self.__current_feed_url} not modified since the last run, skipping it"
+        )
+
+        return self.__build_articles(list(), list(), feed_has_entries=True)
+
+    def __parse_entries(self, feed_entries: list) -> list[dict]:
+        """
+        Gets the raw data of each entry of a feed parsed by feedparser. publish_date might have
+        different timezones, so all of them are converted to the UTC - 00:00 timezone
+
+        Args:
+            feed_entries: list -> Entries of the feed parsed by feedparser
+
+        Returns:
+            list[dict] -> title, news_link, and publish_date of each entry
+        """
+        return [
             {
                 "title": entry.title.replace("'", ""),  # To avoid issues with strings
                 "news_link": entry.link,
-                "image_link": self.__img_extractor.extract(entry.link)
-                if self.__img_extractor
-                else None,
-                "publish_date": entry.published,
+                "publish_date": pd.to_datetime(entry.published, utc=True),
             }
-            for entry in feed.entries
+            for entry in feed_entries
         ]
 
-        if extracted_articles:
-            logger.info(f"{len(extracted_articles)} articles extracted")
-            articles = pd.DataFrame(extracted_articles)
+    def __apply_entry_filters(
+        self, entries: list[dict], entry_filters: Optional[list[BaseEntryFilter]]
+    ) -> list[dict]:
+        """
+        Applies, in order, all the entry filters over the raw entries of the current feed
+
+        Args:
+            entries: list[dict] -> Raw entries of the feed
+            entry_filters: Optional[list[BaseEntryFilter]] -> Filters to apply
+
+        Returns:
+            list[dict] -> Entries kept by all the filters
+        """
+        for entry_filter in entry_filters or list():
+            if not entries:
+                break
+
+            entries = entry_filter.filter(self.__current_feed_url, entries)
+
+        return entries
+
+    async def __afetch_image_link(
+        self, engine: AsyncHTTPEngine, article_url: str, deadline: Deadline
+    ) -> Optional[str]:
+        """
+        Downloads the page of an article and extracts its image link. If the image extractor
+        tries the Open Graph metadata first, only the <head> of the page is downloaded at first,
+        and the page is only downloaded up to the site specific stop_reading_pattern when the
+        <head> has no Open Graph image
+
+        Args:
+            engine: AsyncHTTPEngine -> Opened engine used to perform the requests
+            article_url: str -> Link to the news article
+            deadline: Deadline -> Time budget of the requests
+
+        Returns:
+            Optional[str] -> Link to the main image of the article
+        """
+        if self.__img_extractor.open_graph_first:
+            open_graph_extractor = OpenGraphImageExtractor()
+            response = await engine.fetch(
+                article_url,
+                use_cache=True,
+                stop_pattern=open_graph_extractor.stop_reading_pattern,
+                timeout=news_config.HTTP_TIMEOUT_SECONDS,
+                deadline=deadline,
+            )
+            if response is None:
+                return None
+
+            image_link = await asyncio.to_thread(
+                self.__extract_image_link,
+                article_url,
+                response.content,
+                open_graph_extractor,
+            )
+            if image_link:
+                return image_link
 
-            # publish_date might have different timezones, so I pass them all to the
-            # UTC - 00:00 timezone
-            articles.publish_date = pd.to_datetime(articles.publish_date).dt.tz_convert(
-                "UTC"
+        response = await engine.fetch(
+            article_url,
+            use_cache=True,
+            stop_pattern=self.__img_extractor.stop_reading_pattern,
+            timeout=news_config.HTTP_TIMEOUT_SECONDS,
+            deadline=deadline,
+        )
+        if response is None:
+            return None
+
+        return await asyncio.to_thread(
+            self.__extract_image_link,
+            article_url,
+            response.content,
+            try_open_graph=False,
+        )
+
+    def __extract_image_link(
+        self,
+        article_url: str,
+        html_content: Optional[bytes] = None,
+        img_extractor: Optional[BaseImageExtractor] = None,
+        try_open_graph: bool = True,
+        deadline: Optional[Deadline] = None,
+    ) -> Optional[str]:
+        """
+        Extracts the image link of a single article. A new ImageExtractor instance is used per
+        article, as they keep the html of the last article as state, so this method can be
+        executed from several threads at once. Errors are logged instead of raised, so a
+        failing article does not affect the rest of them.
+
+        Args:
+            article_url: str -> Link to the news article
+            html_content: Optional[bytes] -> html of the article if already downloaded
+            img_extractor: Optional[BaseImageExtractor] -> Extractor used instead of a new
+                                instance of the image extractor of the feed
+            try_open_graph: bool -> False if the Open Graph metadata of html_content was
+                                already tried
+            deadline: Optional[Deadline] -> Time budget of the request, if the article has
+                                to be downloaded
+
+        Returns:
+            Optional[str] -> Link to the main image of the article
+        """
+        img_extractor = img_extractor or type(self.__img_extractor)()
+
+        try:
+            if html_content is None:
+                return img_extractor.extract(article_url, deadline)
+
+            return img_extractor.extract_from_html(
+                article_url, html_content, try_open_graph=try_open_graph
+            )
+
+        except Exception as e:
+            logger.error(f"Error extracting the image link of {article_url}: {e}")
+            return None
+
+    def __build_articles(
+        self,
+        entries: list[dict],
+        image_links: list[Optional[str]],
+        feed_has_entries: bool = False,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Builds the articles DataFrame from the raw entries and their image links, and stores
+        it in self.__current_data. The feed the articles come from is kept in the column feed_url
+
+        Args:
+            entries: list[dict] -> Raw entries kept from the feed
+            image_links: list[Optional[str]] -> Image link of each entry, in the same order
+            feed_has_entries: bool -> True if the feed had entries, even if all of them were
+                                filtered out. In that case an empty DataFrame is returned
+
+        Returns:
+            Optional[pd.DataFrame] -> The data obtained
+        """
+        extracted_articles = [
+            {**entry, "image_link": image_link, "feed_url": self.__current_feed_url}
+            for entry, image_link in zip(entries, image_links)
+        ]
+
+        if extracted_articles or feed_has_entries:
+            logger.info(f"{len(extracted_articles)} articles extracted")
+            articles = pd.DataFrame(
+                extracted_articles,
+                columns=[
+                    "title",
+                    "news_link",
+                    "image_link",
+                    "publish_date",
+                    "feed_url",
+                ],
             )
+            articles.publish_date = pd.to_datetime(articles.publish_date, utc=True)
 
             self.__current_data = articles
             self.__previous_feed_url = self.__current_feed_url
@@ -0,0 +1,101 @@
+import re
+import pandas as pd
+from functools import lru_cache
+from typing import Optional
+
+
+class KeywordMatcher:
+    """
+    Matches texts against a set of case sensitive and case insensitive keywords. Each group of
+    keywords is compiled once into a single alternation regex, so a text is scanned once per
+    group instead of once per keyword.
+
+    Case insensitive keywords are matched against the lowercased text, which gives the same
+    result as comparing kw.lower() with text.lower()
+    """
+
+    def __init__(
+        self, case_sen_search_kw: tuple[str, ...], case_insen_search_kw: tuple[str, ...]
+    ):
+        """
+        Args:
+            case_sen_search_kw: tuple[str, ...] -> Case Sensitive Search Keywords
+            case_insen_search_kw: tuple[str, ...] -> Case Insensitive Search Keywords
+        """
+        self.__case_sen_pattern = self.__compile(case_sen_search_kw)
+        self.__case_insen_pattern = self.__compile(
+            tuple(kw.lower() for kw in case_insen_search_kw)
+        )
+
+    @staticmethod
+    def __compile(keywords: tuple[str, ...]) -> Optional[re.Pattern]:
+        """
+        Builds a regex matching any of the keywords literally. Without keywords there is no
+        pattern, as an empty alternation would match any text
+        """
+        if not keywords:
+            return None
+
+        # Longest keywords first, so the alternation prefers them
+        unique_keywords = sorted(set(keywords), key=len, reverse=True)
+
+        return re.compile("|".join(re.escape(kw) for kw in unique_keywords))
+
+    def matches(self, text: str) -> bool:
+        """
+        Args:
+            text: str -> Text to search the keywords in
+
+        Returns:
+            bool -> True if at least one keyword is found in the text
+        """
+        if self.__case_sen_pattern and self.__case_sen_pattern.search(text):
+            return True
+
+        return bool(
+            self.__case_insen_pattern and self.__case_insen_pattern.search(text.lower())
+        )
+
+    def match_series(self, texts: pd.Series) -> pd.Series:
+        """
+        Vectorized version of matches over a pandas Series of strings
+
+        Args:
+            texts: pd.Series -> Texts to search the keywords in
+
+        Returns:
+            pd.Series -> Boolean Series, True where at least one keyword is found
+        """
+        matched = pd.Series(False, index=texts.index)
+
+        if self.__case_sen_pattern:
+            matched |= texts.str.contains(self.__case_sen_pattern, na=False)
+
+        if self.__case_insen_pattern:
+            # Only the texts not matched yet need to be lowercased and searched
+            unmatched_texts = texts[~matched]
+            matched |= (
+                unmatched_texts.str.lower()
+                .str.contains(self.__case_insen_pattern, na=False)
+                .reindex(texts.index, fill_value=False)
+            )
+
+        return matched
+
+
+@lru_cache(maxsize=128)
+def compile_keyword_matcher(
+    case_sen_search_kw: tuple[str, ...], case_insen_search_kw: tuple[str, ...]
+) -> KeywordMatcher:
+    """
+    Gets a KeywordMatcher for the keywords. Matchers are cached by their keywords, so each set
+    of keywords is compiled only once
+
+    Args:
+        case_sen_search_kw: tuple[str, ...] -> Case Sensitive Search Keywords
+        case_insen_search_kw: tuple[str, ...] -> Case Insensitive Search Keywords
+
+    Returns:
+        KeywordMatcher -> Compiled matcher
+    """
+    return KeywordMatcher(case_sen_search_kw, case_insen_search_kw)
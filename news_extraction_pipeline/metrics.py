@@ -0,0 +1,64 @@
+from prometheus_client import CollectorRegistry, Counter, Histogram
+
+# Pipeline stages and feeds take much longer than a typical request
+PIPELINE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Metrics of the news extraction pipeline and its API, exposed by /metrics
+registry = CollectorRegistry()
+
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Duration of the requests served by the API",
+    labelnames=("method", "path", "status"),
+    buckets=PIPELINE_BUCKETS,
+    registry=registry,
+)
+pipeline_step_duration_seconds = Histogram(
+    "pipeline_step_duration_seconds",
+    "Wall time of each step of the pipeline runs",
+    labelnames=("step",),
+    buckets=PIPELINE_BUCKETS,
+    registry=registry,
+)
+feed_fetch_duration_seconds = Histogram(
+    "feed_fetch_duration_seconds",
+    "Time to extract the articles of a feed, including their images",
+    labelnames=("feed_url",),
+    buckets=PIPELINE_BUCKETS,
+    registry=registry,
+)
+news_store_duration_seconds = Histogram(
+    "news_store_duration_seconds",
+    "Duration of the inserts of articles into the news table, by NEWS_TABLE_BACKEND",
+    labelnames=("backend",),
+    buckets=PIPELINE_BUCKETS,
+    registry=registry,
+)
+articles_fetched_total = Counter(
+    "articles_fetched_total",
+    "Articles extracted from the feeds",
+    labelnames=("feed_url",),
+    registry=registry,
+)
+article_images_total = Counter(
+    "article_images_total",
+    "Image extractions of the articles fetched, by outcome (found or missing)",
+    labelnames=("outcome",),
+    registry=registry,
+)
+articles_filtered_out_total = Counter(
+    "articles_filtered_out_total",
+    "Articles fetched that were dropped by the date or keyword filters",
+    labelnames=("filter",),
+    registry=registry,
+)
+articles_deduped_total = Counter(
+    "articles_deduped_total",
+    "Feed entries skipped because their article was already stored",
+    registry=registry,
+)
+articles_inserted_total = Counter(
+    "articles_inserted_total",
+    "Articles inserted in the database, without the ones already stored",
+    registry=registry,
+)
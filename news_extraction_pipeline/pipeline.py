@@ -1,81 +1,491 @@
+import asyncio
 import pandas as pd
 from loguru import logger
-from typing import Optional
+from typing import AsyncIterator, Optional
 
-from news_extraction_pipeline.config import AINewsConfig
+from news_extraction_pipeline import metrics
+from news_extraction_pipeline.config import get_news_config
+from news_extraction_pipeline.entry_filters.entry_filters import (
+    BaseEntryFilter,
+    CountingEntryFilter,
+    KnownArticleEntryFilter,
+    PredicateEntryFilter,
+    WatermarkEntryFilter,
+)
+from news_extraction_pipeline.extractors.news.news_extractors import FeedValidators
+from news_extraction_pipeline.resources import get_state_store
 from news_extraction_pipeline.schemas import PipelineArgs
+from utils.deadline import Deadline
+from utils.progress import Progress
+from utils.step_runner import StepMetrics, StepRunner
 from news_extraction_pipeline.pipeline_steps import (
-    extract_from_multiple_feed_urls,
+    aextract_from_multiple_feed_urls,
+    aiter_feed_articles,
+    find_stored_news_links,
     filter_by_date_threshold,
     filter_by_keywords,
     convert_datetime_columns_to_str,
     store_in_database,
+    update_feed_watermarks,
 )
 
-news_config = AINewsConfig()
+news_config = get_news_config()
 
+ARTICLE_COLUMNS = ["title", "news_link", "image_link", "publish_date", "feed_url"]
 
-def main(
-    case_sen_search_kw: Optional[list[str]] = None,
-    case_insen_search_kw: Optional[list[str]] = None,
-    max_days_old: Optional[int] = None,
-) -> pd.DataFrame:
-    """
-    Pipeline that extracts AI-related news from an specific website, clean, filter, and transform the data, and then
-    stores them into an excel file.
+# Name of the runs in their reports
+RUN_NAME = "news_extraction_pipeline"
 
-    Args:
-        case_sen_search_kw: Optional[list[str]] -> List of case sensitive keywords to filter the AI-news by,
-        case_insen_search_kw: Optional[list[str]] -> List of case insensitive keywords to filter the AI-news by,
-        max_days_old: Optional[int] -> Number of days that you want to retrieve the data from
 
-    Returns:
-        pd.DataFrame -> pandas DataFrame containing AI-related news
+def _build_pipeline_args(
+    case_sen_search_kw: Optional[list[str]],
+    case_insen_search_kw: Optional[list[str]],
+    max_days_old: Optional[int],
+    incremental: Optional[bool],
+    skip_stored_articles: Optional[bool],
+    deadline_seconds: Optional[float],
+) -> PipelineArgs:
+    """
+    Validates the arguments of the pipeline, using the defaults of PipelineArgs for the missing ones
     """
-    logger.info("Starting AI news retrieval process...")
-
     raw_args = {
         "case_sen_search_kw": case_sen_search_kw,
         "case_insen_search_kw": case_insen_search_kw,
         "max_days_old": max_days_old,
+        "incremental": incremental,
+        "skip_stored_articles": skip_stored_articles,
+        "deadline_seconds": deadline_seconds,
     }
 
     filtered_args = {k: v for k, v in raw_args.items() if v is not None}
-    pipe_args = PipelineArgs(**filtered_args)
+    return PipelineArgs(**filtered_args)
 
-    # Step 1: Retrieve all the feed_urls registered in AINewsConfig class
+
+def _get_news_sources() -> list[str]:
+    """
+    Retrieves all the feed_urls registered in AINewsConfig class
+    """
     news_config_dict = news_config.model_dump()
-    news_sources = [
-        val for key, val in news_config_dict.items() if key.endswith("_FEED_URL")
+    return [val for key, val in news_config_dict.items() if key.endswith("_FEED_URL")]
+
+
+def _build_entry_filters(
+    pipe_args: PipelineArgs, watermark_filter: WatermarkEntryFilter
+) -> list[BaseEntryFilter]:
+    """
+    The date and keyword filters are also applied over the feed entries, as well as the feed
+    watermarks if incremental, so the images are only extracted for new relevant articles.
+    The entries already stored are only skipped if skip_stored_articles, as they would not be
+    returned either. Otherwise, they are deduplicated when stored
+    """
+    entry_filters = [
+        CountingEntryFilter(
+            PredicateEntryFilter(
+                max_days_old=pipe_args.max_days_old,
+                case_sen_search_kw=pipe_args.case_sen_search_kw,
+                case_insen_search_kw=pipe_args.case_insen_search_kw,
+                filter_column=news_config.COLUMN_TO_FILTER_BY_KW,
+            ),
+            on_dropped=lambda _, dropped: metrics.articles_filtered_out_total.labels(
+                filter="entry_predicate"
+            ).inc(dropped),
+        ),
     ]
 
-    # Step 2: Get all the articles available from the different sources found
-    all_articles = extract_from_multiple_feed_urls(news_sources)
+    if pipe_args.skip_stored_articles:
+        entry_filters.append(
+            CountingEntryFilter(
+                KnownArticleEntryFilter(stored_links_lookup=find_stored_news_links),
+                on_dropped=lambda _, dropped: metrics.articles_deduped_total.inc(
+                    dropped
+                ),
+            )
+        )
+
+    if pipe_args.incremental:
+        entry_filters.insert(
+            1,
+            CountingEntryFilter(
+                watermark_filter,
+                on_dropped=lambda _,
+                dropped: metrics.articles_filtered_out_total.labels(
+                    filter="watermark"
+                ).inc(dropped),
+            ),
+        )
+
+    return entry_filters
+
+
+def _build_feed_validators(pipe_args: PipelineArgs) -> Optional[FeedValidators]:
+    """
+    Conditional requests are only sent by incremental runs, as a backfill must process the
+    feeds even if they did not change. The validators are kept per filter_key, so a 304
+    received by a run never hides entries that only its filters would keep
+    """
+    if not pipe_args.incremental:
+        return None
+
+    return FeedValidators(get_state_store(), filter_key=pipe_args.filter_key())
+
+
+def _build_deadlines(pipe_args: PipelineArgs) -> tuple[Deadline, Deadline]:
+    """
+    Builds the deadline of the run, and the earlier one of the extraction, which leaves time
+    to store what was extracted. The time reserved is capped at a fraction of the budget, so
+    a budget shorter than DEADLINE_STORE_RESERVE_SECONDS still leaves time to extract
+    """
+    deadline = Deadline(pipe_args.deadline_seconds)
+
+    reserve_seconds = news_config.DEADLINE_STORE_RESERVE_SECONDS
+    if pipe_args.deadline_seconds is not None:
+        reserve_seconds = min(
+            reserve_seconds,
+            pipe_args.deadline_seconds
+            * news_config.DEADLINE_STORE_RESERVE_MAX_FRACTION,
+        )
 
-    # Step 3: Filter news articles by date (last 2 days)
+    return deadline, deadline.with_reserve(reserve_seconds)
+
+
+def _empty_articles() -> pd.DataFrame:
+    """
+    DataFrame with the columns of the articles extracted, used when none was extracted
+    """
+    return pd.DataFrame(columns=ARTICLE_COLUMNS).astype(
+        {"publish_date": "datetime64[ns, UTC]"}
+    )
+
+
+def _filter_by_date(articles: pd.DataFrame, pipe_args: PipelineArgs) -> pd.DataFrame:
+    """
+    Filters the articles published in the last max_days_old days
+    """
     logger.info(
         f"Filtering news articles from the last {pipe_args.max_days_old} days..."
     )
-    articles_filtered_by_date = filter_by_date_threshold(
-        df=all_articles,
+    filtered_articles = filter_by_date_threshold(
+        df=articles,
         filter_column=news_config.DATE_COLUMN,
         max_days_old=pipe_args.max_days_old,
     )
+    if isinstance(filtered_articles, pd.DataFrame):
+        metrics.articles_filtered_out_total.labels(filter="date").inc(
+            len(articles) - len(filtered_articles)
+        )
 
-    # Step 4: Filter news articles by search keywords
-    articles_filtered_by_keywords = filter_by_keywords(
-        df=articles_filtered_by_date,
+    return filtered_articles
+
+
+def _filter_by_keywords(
+    articles: pd.DataFrame, pipe_args: PipelineArgs
+) -> pd.DataFrame:
+    """
+    Filters the articles by the search keywords
+    """
+    filtered_articles = filter_by_keywords(
+        df=articles,
         case_insen_search_kw=pipe_args.case_insen_search_kw,
         case_sen_search_kw=pipe_args.case_sen_search_kw,
         filter_column=news_config.COLUMN_TO_FILTER_BY_KW,
     )
+    if isinstance(filtered_articles, pd.DataFrame):
+        metrics.articles_filtered_out_total.labels(filter="keywords").inc(
+            len(articles) - len(filtered_articles)
+        )
 
-    # Step 5: Store data in database
-    store_in_database(articles_filtered_by_keywords)
+    return filtered_articles
 
-    # Step 6: Prepare data to be returned
-    final_articles = convert_datetime_columns_to_str(
-        articles_filtered_by_keywords, string_format=news_config.DATE_STRING_FORMAT
+
+def _filter_articles(
+    articles: Optional[pd.DataFrame], pipe_args: PipelineArgs
+) -> pd.DataFrame:
+    """
+    Filters the articles extracted by date and keywords
+    """
+    if articles is None:
+        articles = _empty_articles()
+
+    return _filter_by_keywords(_filter_by_date(articles, pipe_args), pipe_args)
+
+
+async def _store_articles(
+    articles: pd.DataFrame,
+    watermark_filter: WatermarkEntryFilter,
+    feed_validators: Optional[FeedValidators],
+    deadline: Deadline,
+    progress: Optional[Progress] = None,
+) -> bool:
+    """
+    Stores the articles in database. Only once they are stored, the watermark of each feed is
+    moved to its latest article stored and the HTTP validators received are saved, unless the
+    feed was truncated. Blocking calls run in worker threads
+    """
+    stored = await asyncio.to_thread(store_in_database, articles, deadline)
+
+    if stored:
+        if progress is not None:
+            progress.set("rows_stored", len(articles))
+
+        await asyncio.to_thread(
+            update_feed_watermarks,
+            articles,
+            watermark_filter,
+            deadline.truncated_sources,
+        )
+        if feed_validators is not None:
+            await asyncio.to_thread(feed_validators.save, deadline.truncated_sources)
+
+    return stored
+
+
+def _prepare_output(articles: pd.DataFrame) -> pd.DataFrame:
+    """
+    Prepares the articles to be returned
+    """
+    return convert_datetime_columns_to_str(
+        articles.drop(columns="feed_url"),
+        string_format=news_config.DATE_STRING_FORMAT,
     )
 
+
+def record_step_duration(step: StepMetrics) -> None:
+    metrics.pipeline_step_duration_seconds.labels(step=step.name).observe(
+        step.wall_seconds
+    )
+
+
+def new_step_runner(trace_memory: bool = False) -> StepRunner:
+    """
+    Creates the StepRunner of a pipeline run, exporting the duration of each step
+
+    Args:
+        trace_memory: bool -> Record the peak memory allocated by each step
+
+    Returns:
+        StepRunner -> The step runner
+    """
+    return StepRunner(
+        RUN_NAME, trace_memory=trace_memory, on_step_finished=record_step_duration
+    )
+
+
+async def amain(
+    case_sen_search_kw: Optional[list[str]] = None,
+    case_insen_search_kw: Optional[list[str]] = None,
+    max_days_old: Optional[int] = None,
+    incremental: Optional[bool] = None,
+    skip_stored_articles: Optional[bool] = None,
+    deadline_seconds: Optional[float] = None,
+    progress: Optional[Progress] = None,
+    step_runner: Optional[StepRunner] = None,
+) -> pd.DataFrame:
+    """
+    Pipeline that extracts AI-related news from an specific website, clean, filter, and transform the data, and then
+    stores them into an excel file.
+
+    All the HTTP requests are asynchronous, and the blocking work (the news table, the local
+    state, the HTTP cache, and parsing the feeds and the html) runs in worker threads, so the
+    pipeline can be cancelled while it waits. The pandas filters still run in the event loop.
+
+    Args:
+        case_sen_search_kw: Optional[list[str]] -> List of case sensitive keywords to filter the AI-news by,
+        case_insen_search_kw: Optional[list[str]] -> List of case insensitive keywords to filter the AI-news by,
+        max_days_old: Optional[int] -> Number of days that you want to retrieve the data from
+        incremental: Optional[bool] -> Only process the entries published after the latest article
+                                        stored from each feed
+        skip_stored_articles: Optional[bool] -> Skip, without returning them, the entries whose
+                                        article is already stored
+        deadline_seconds: Optional[float] -> Time budget. Once it runs out, the pending work is
+                                        given up, and the articles extracted so far are stored
+                                        and returned
+        progress: Optional[Progress] -> Receives the feeds_total, feeds_done,
+                                        articles_extracted and rows_stored counters
+        step_runner: Optional[StepRunner] -> Records the time, rows and memory of each step.
+                                        One without memory tracing is used if None
+
+    Returns:
+        pd.DataFrame -> pandas DataFrame containing AI-related news. The feeds cut by the
+                        deadline are listed in its attrs["truncated_sources"], and the
+                        report of the run (also logged as JSON) in its attrs["run_report"]
+    """
+    logger.info("Starting AI news retrieval process...")
+    step_runner = step_runner or new_step_runner()
+
+    pipe_args = _build_pipeline_args(
+        case_sen_search_kw,
+        case_insen_search_kw,
+        max_days_old,
+        incremental,
+        skip_stored_articles,
+        deadline_seconds,
+    )
+
+    # Extraction gives up earlier than the deadline, leaving time to store what was extracted
+    deadline, extraction_deadline = _build_deadlines(pipe_args)
+
+    # Step 1: Retrieve all the feed_urls registered in AINewsConfig class
+    with step_runner.step("get_news_sources") as step:
+        news_sources = _get_news_sources()
+        step.rows_out = len(news_sources)
+
+    # Step 2: Get all the articles available from the different sources found, filtering
+    # their entries before extracting the images
+    watermark_filter = WatermarkEntryFilter(
+        state_store=get_state_store(), filter_key=pipe_args.filter_key()
+    )
+    feed_validators = _build_feed_validators(pipe_args)
+    with step_runner.step("extract_articles", rows_in=len(news_sources)) as step:
+        all_articles = await aextract_from_multiple_feed_urls(
+            news_sources,
+            entry_filters=_build_entry_filters(pipe_args, watermark_filter),
+            deadline=extraction_deadline,
+            progress=progress,
+            feed_validators=feed_validators,
+        )
+        if all_articles is None:
+            all_articles = _empty_articles()
+        step.rows_out = len(all_articles)
+
+    # Step 3: Filter news articles by date
+    with step_runner.step("filter_by_date", rows_in=len(all_articles)) as step:
+        articles_filtered_by_date = _filter_by_date(all_articles, pipe_args)
+        step.rows_out = len(articles_filtered_by_date)
+
+    # Step 4: Filter news articles by search keywords
+    with step_runner.step(
+        "filter_by_keywords", rows_in=len(articles_filtered_by_date)
+    ) as step:
+        articles_filtered_by_keywords = _filter_by_keywords(
+            articles_filtered_by_date, pipe_args
+        )
+        step.rows_out = len(articles_filtered_by_keywords)
+
+    # Step 5: Store data in database, and move the watermark of each feed to its latest
+    # article stored and save its HTTP validators, unless the feed was truncated
+    with step_runner.step(
+        "store_in_database", rows_in=len(articles_filtered_by_keywords)
+    ) as step:
+        stored = await _store_articles(
+            articles_filtered_by_keywords,
+            watermark_filter,
+            feed_validators,
+            deadline,
+            progress,
+        )
+        step.rows_out = len(articles_filtered_by_keywords) if stored else 0
+
+    # Step 6: Prepare data to be returned
+    with step_runner.step(
+        "prepare_output", rows_in=len(articles_filtered_by_keywords)
+    ) as step:
+        final_articles = _prepare_output(articles_filtered_by_keywords)
+        step.rows_out = len(final_articles)
+
+    final_articles.attrs["truncated_sources"] = deadline.truncated_sources
+    final_articles.attrs["run_report"] = step_runner.log_report()
+
+    if deadline.truncated_sources:
+        logger.warning(
+            f"Deadline cut the extraction of: {', '.join(deadline.truncated_sources)}"
+        )
+
     return final_articles
+
+
+async def astream(
+    case_sen_search_kw: Optional[list[str]] = None,
+    case_insen_search_kw: Optional[list[str]] = None,
+    max_days_old: Optional[int] = None,
+    incremental: Optional[bool] = None,
+    skip_stored_articles: Optional[bool] = None,
+    deadline_seconds: Optional[float] = None,
+) -> AsyncIterator[dict]:
+    """
+    Streaming version of amain. The filtered articles of each feed are yielded as soon as the
+    feed finishes, so the first ones do not wait for the slowest feed. Once all the feeds have
+    finished, the articles are stored and a summary is yielded.
+
+    Args: Same as amain
+
+    Returns:
+        AsyncIterator[dict] -> Records of type "article", with the data of an article, followed
+                                by a single record of type "summary" with the keys
+                                total_articles, partial, truncated_sources and stored
+    """
+    logger.info("Starting AI news streaming retrieval process...")
+
+    pipe_args = _build_pipeline_args(
+        case_sen_search_kw,
+        case_insen_search_kw,
+        max_days_old,
+        incremental,
+        skip_stored_articles,
+        deadline_seconds,
+    )
+    deadline, extraction_deadline = _build_deadlines(pipe_args)
+
+    watermark_filter = WatermarkEntryFilter(
+        state_store=get_state_store(), filter_key=pipe_args.filter_key()
+    )
+    feed_validators = _build_feed_validators(pipe_args)
+    filtered_articles_by_feed = list()
+
+    async for feed_url, articles in aiter_feed_articles(
+        _get_news_sources(),
+        entry_filters=_build_entry_filters(pipe_args, watermark_filter),
+        deadline=extraction_deadline,
+        feed_validators=feed_validators,
+    ):
+        if articles is None:
+            continue
+
+        filtered_articles = _filter_articles(articles, pipe_args)
+        filtered_articles_by_feed.append(filtered_articles)
+
+        logger.info(f"Streaming {len(filtered_articles)} articles from {feed_url}")
+        for article in _prepare_output(filtered_articles).to_dict(orient="records"):
+            yield {"type": "article", **article}
+
+    all_articles = (
+        pd.concat(filtered_articles_by_feed)
+        if filtered_articles_by_feed
+        else _filter_articles(None, pipe_args)
+    )
+    stored = await _store_articles(
+        all_articles, watermark_filter, feed_validators, deadline
+    )
+
+    yield {
+        "type": "summary",
+        "total_articles": len(all_articles),
+        "partial": bool(deadline.truncated_sources),
+        "truncated_sources": deadline.truncated_sources,
+        "stored": stored,
+    }
+
+
+def main(
+    case_sen_search_kw: Optional[list[str]] = None,
+    case_insen_search_kw: Optional[list[str]] = None,
+    max_days_old: Optional[int] = None,
+    incremental: Optional[bool] = None,
+    skip_stored_articles: Optional[bool] = None,
+    deadline_seconds: Optional[float] = None,
+) -> pd.DataFrame:
+    """
+    Synchronous entry point of amain. Must not be called from a running event loop
+
+    Returns:
+        pd.DataFrame -> pandas DataFrame containing AI-related news
+    """
+    return asyncio.run(
+        amain(
+            case_sen_search_kw=case_sen_search_kw,
+            case_insen_search_kw=case_insen_search_kw,
+            max_days_old=max_days_old,
+            incremental=incremental,
+            skip_stored_articles=skip_stored_articles,
+            deadline_seconds=deadline_seconds,
+        )
+    )
@@ -1,30 +1,181 @@
-import concurrent.futures
+import asyncio
+import time
 import pandas as pd
 from loguru import logger
-from typing import Optional
-from news_extraction_pipeline.extractors.news.news_extractors import NewsExtractor
-from database.tables.bigquery import NewsExtractionTable
+from pydantic import ValidationError
+from typing import AsyncIterator, Optional
+from news_extraction_pipeline.config import get_news_config
+from news_extraction_pipeline.entry_filters.entry_filters import (
+    BaseEntryFilter,
+    WatermarkEntryFilter,
+)
+from news_extraction_pipeline.extractors.news.news_extractors import (
+    FeedValidators,
+    NewsExtractor,
+)
+from news_extraction_pipeline.keyword_matching import compile_keyword_matcher
+from news_extraction_pipeline import metrics
+from news_extraction_pipeline.resources import (
+    get_feed_circuit_breaker,
+    get_news_extraction_table,
+    get_rate_limiter,
+    get_response_cache,
+    get_retry_policy,
+)
 from database.schemas import NewsMetadata
+from utils.deadline import Deadline
+from utils.progress import Progress
+from utils.http.engine import AsyncHTTPEngine
 
-news_extraction_table = NewsExtractionTable()
+news_config = get_news_config()
 
 
-def extract_from_feed(feed_url: str) -> Optional[pd.DataFrame]:
+def extract_from_feed(
+    feed_url: str,
+    entry_filters: Optional[list[BaseEntryFilter]] = None,
+    deadline: Optional[Deadline] = None,
+    feed_validators: Optional[FeedValidators] = None,
+) -> Optional[pd.DataFrame]:
     """
     Extracts articles from a specific feed_url
     """
-    extractor = NewsExtractor()
+    extractor = NewsExtractor(
+        feed_validators=feed_validators,
+        circuit_breaker=get_feed_circuit_breaker(),
+        retry_policy=get_retry_policy(),
+    )
+    extractor.set_current_feed_url(feed_url)
+
+    return extractor.get_articles(entry_filters=entry_filters, deadline=deadline)
+
+
+async def aextract_from_feed(
+    feed_url: str,
+    engine: AsyncHTTPEngine,
+    entry_filters: Optional[list[BaseEntryFilter]] = None,
+    deadline: Optional[Deadline] = None,
+    feed_validators: Optional[FeedValidators] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Extracts articles from a specific feed_url, performing all the requests through the engine
+    """
+    extractor = NewsExtractor(
+        feed_validators=feed_validators, circuit_breaker=get_feed_circuit_breaker()
+    )
     extractor.set_current_feed_url(feed_url)
 
-    return extractor.get_articles()
+    return await extractor.aget_articles(
+        engine, entry_filters=entry_filters, deadline=deadline
+    )
+
+
+def record_fetched_articles(feed_url: str, articles: pd.DataFrame) -> None:
+    """
+    Counts the articles extracted from a feed, and whether their image was found
+    """
+    images_found = (
+        int(articles["image_link"].notna().sum())
+        if "image_link" in articles.columns
+        else 0
+    )
+
+    metrics.articles_fetched_total.labels(feed_url=feed_url).inc(len(articles))
+    metrics.article_images_total.labels(outcome="found").inc(images_found)
+    metrics.article_images_total.labels(outcome="missing").inc(
+        len(articles) - images_found
+    )
+
+
+async def aiter_feed_articles(
+    feed_urls: list[str],
+    entry_filters: Optional[list[BaseEntryFilter]] = None,
+    deadline: Optional[Deadline] = None,
+    feed_validators: Optional[FeedValidators] = None,
+) -> AsyncIterator[tuple[str, Optional[pd.DataFrame]]]:
+    """
+    Extract the articles from different feed urls concurrently, yielding the articles of each
+    feed as soon as it finishes. All the feeds and article pages are fetched through a single
+    AsyncHTTPEngine, so connections are reused and the number of requests in flight is limited
+    globally and per host.
+
+    Args:
+        feed_urls: list[str] -> List of feed_urls
+        entry_filters: Optional[list[BaseEntryFilter]] -> Filters applied over the entries of
+                            each feed before their article pages are fetched
+        deadline: Optional[Deadline] -> Time budget. The feeds cut by it are marked in it as
+                            truncated, and only the articles completed are returned
+        feed_validators: Optional[FeedValidators] -> HTTP validators sent as conditional
+                            headers. The ones received are left pending, to be saved once the
+                            articles are stored. If None, the feeds are always downloaded
+
+    Returns:
+        AsyncIterator[tuple[str, Optional[pd.DataFrame]]] -> feed_url and articles of each
+                            feed, in the order they finish. Articles are None if the feed failed
+    """
+    async with AsyncHTTPEngine(
+        max_connections=news_config.HTTP_MAX_CONNECTIONS,
+        max_connections_per_host=news_config.HTTP_MAX_CONNECTIONS_PER_HOST,
+        timeout=news_config.HTTP_TIMEOUT_SECONDS,
+        headers={"User-Agent": news_config.HTTP_USER_AGENT},
+        response_cache=get_response_cache(),
+        rate_limiter=get_rate_limiter(),
+        retry_policy=get_retry_policy(),
+        max_page_bytes=int(news_config.HTTP_MAX_PAGE_SIZE_MB * 1024 * 1024),
+    ) as engine:
+
+        async def extract(url: str) -> tuple[str, Optional[pd.DataFrame]]:
+            started_at = time.perf_counter()
+
+            try:
+                articles = await aextract_from_feed(
+                    url, engine, entry_filters, deadline, feed_validators
+                )
+
+            except Exception as e:
+                logger.error(f"Error extracting articles from {url}: {e}")
+                articles = None
+
+            metrics.feed_fetch_duration_seconds.labels(feed_url=url).observe(
+                time.perf_counter() - started_at
+            )
+            if isinstance(articles, pd.DataFrame):
+                record_fetched_articles(url, articles)
+
+            return url, articles
+
+        tasks = [asyncio.ensure_future(extract(url)) for url in feed_urls]
 
+        try:
+            for next_finished in asyncio.as_completed(tasks):
+                yield await next_finished
 
-def extract_from_multiple_feed_urls(feed_urls: list[str]) -> Optional[pd.DataFrame]:
+        finally:
+            # If the consumer stops early, the feeds still in progress are cancelled
+            for task in tasks:
+                task.cancel()
+
+    logger.info(f"Rate limits per host: {get_rate_limiter().metrics()}")
+
+
+async def aextract_from_multiple_feed_urls(
+    feed_urls: list[str],
+    entry_filters: Optional[list[BaseEntryFilter]] = None,
+    deadline: Optional[Deadline] = None,
+    progress: Optional[Progress] = None,
+    feed_validators: Optional[FeedValidators] = None,
+) -> Optional[pd.DataFrame]:
     """
-    Extract the articles from different feed urls using parallelization
+    Extract the articles from different feed urls concurrently (see aiter_feed_articles)
 
     Args:
         feed_urls: list[str] -> List of feed_urls
+        entry_filters: Optional[list[BaseEntryFilter]] -> Filters applied over the entries of
+                            each feed before their article pages are fetched
+        deadline: Optional[Deadline] -> Time budget. The feeds cut by it are marked in it as
+                            truncated, and only the articles completed are returned
+        progress: Optional[Progress] -> Receives the feeds_total, feeds_done and
+                            articles_extracted counters as the feeds finish
+        feed_validators: Optional[FeedValidators] -> See aiter_feed_articles
 
     Returns:
         all_articles: Optional[pd.DataFrame] -> DataFrame containing all the articles
@@ -37,22 +188,25 @@ def extract_from_multiple_feed_urls(feed_urls: list[str]) -> Optional[pd.DataFra
         logger.error("All the entries of the feed_urls list must be not null strings")
         return
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        future_to_url = {
-            executor.submit(extract_from_feed, url): url for url in feed_urls
-        }
-        results = list()
+    progress = progress or Progress()
+    progress.set("feeds_total", len(feed_urls))
 
-        for future in concurrent.futures.as_completed(future_to_url):
-            url = future_to_url[future]
+    articles_by_feed = dict()
+    async for url, data in aiter_feed_articles(
+        feed_urls, entry_filters, deadline, feed_validators
+    ):
+        articles_by_feed[url] = data
 
-            try:
-                data = future.result()
-                if isinstance(data, pd.DataFrame):
-                    results.append(data)
+        progress.increment("feeds_done")
+        if isinstance(data, pd.DataFrame):
+            progress.increment("articles_extracted", len(data))
 
-            except Exception as e:
-                logger.error(f"Error extracting articles from {url}: {e}")
+    # Articles are kept in the order of the feeds, not in the order they finished
+    results = [
+        articles_by_feed[url]
+        for url in feed_urls
+        if isinstance(articles_by_feed.get(url), pd.DataFrame)
+    ]
 
     if results:
         return pd.concat(results)
@@ -60,6 +214,42 @@ def extract_from_multiple_feed_urls(feed_urls: list[str]) -> Optional[pd.DataFra
     logger.error("No articles were extracted from any source")
 
 
+def extract_from_multiple_feed_urls(
+    feed_urls: list[str],
+    entry_filters: Optional[list[BaseEntryFilter]] = None,
+    deadline: Optional[Deadline] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Synchronous entry point of aextract_from_multiple_feed_urls
+
+    Args:
+        feed_urls: list[str] -> List of feed_urls
+        entry_filters: Optional[list[BaseEntryFilter]] -> Filters applied over the entries of
+                            each feed before their article pages are fetched
+        deadline: Optional[Deadline] -> Time budget of the extraction
+
+    Returns:
+        all_articles: Optional[pd.DataFrame] -> DataFrame containing all the articles
+                                            from all the different feed urls
+    """
+    return asyncio.run(
+        aextract_from_multiple_feed_urls(feed_urls, entry_filters, deadline)
+    )
+
+
+def find_stored_news_links(news_links: list[str]) -> set[str]:
+    """
+    Gets the news links that are already stored in the database
+
+    Args:
+        news_links: list[str] -> Links of the news to look for
+
+    Returns:
+        set[str] -> Subset of news_links already stored
+    """
+    return get_news_extraction_table().get_stored_news_links(news_links)
+
+
 def filter_by_keywords(
     df: pd.DataFrame,
     filter_column: str,
@@ -113,16 +303,15 @@ def filter_by_keywords(
     logger.debug(f"{case_insen_search_kw =}")
     logger.debug(f"Filtering by column: {filter_column}")
 
-    def matches_keyword(text: str) -> bool:
-        match = any(kw in text for kw in case_sen_search_kw) | any(
-            kw.lower() in text.lower() for kw in case_insen_search_kw
-        )
-
-        return match
+    # The matcher is compiled once per set of keywords and applied with vectorized string
+    # operations over the whole column
+    keyword_matcher = compile_keyword_matcher(
+        tuple(case_sen_search_kw), tuple(case_insen_search_kw)
+    )
 
     df_copy = df.copy()
 
-    df_copy = df_copy[df_copy[filter_column].apply(matches_keyword)]
+    df_copy = df_copy[keyword_matcher.match_series(df_copy[filter_column])]
 
     # Reset dataframe index to keep sequential order
     df_copy = df_copy.reset_index(drop=True)
@@ -226,16 +415,43 @@ def convert_datetime_columns_to_str(
     return df_copy
 
 
-def store_in_database(df: pd.DataFrame) -> None:
+def _validate_records(record_list: list[dict]) -> list[NewsMetadata]:
+    """
+    Validates each article on its own against the schema of the news table. The invalid ones
+    are logged and dropped, so a single bad article does not fail the whole batch
+    """
+    valid_records = list()
+
+    for news_data in record_list:
+        try:
+            valid_records.append(NewsMetadata(**news_data))
+        except ValidationError as e:
+            logger.error(
+                f"Article {news_data.get('news_link')} is not valid, it will not be "
+                f"stored: {e}"
+            )
+
+    return valid_records
+
+
+def store_in_database(df: pd.DataFrame, deadline: Optional[Deadline] = None) -> bool:
     """
-    Stores the data obtained in BigQuery
+    Stores the data obtained in the news table (BigQuery unless NEWS_TABLE_BACKEND says otherwise)
 
     Args:
         df: pd.DataFrame -> DataFrame containing the data
+        deadline: Optional[Deadline] -> Time budget. The BigQuery calls wait at most the time
+                            remaining
 
     Returns:
-        None
+        bool -> True if all the valid articles are stored after the call. The articles not
+                            matching the schema of the table are dropped
     """
+    deadline = deadline or Deadline()
+    if deadline.expired():
+        logger.error(f"Deadline expired, {len(df)} articles could not be stored")
+        return False
+
     df_copy = df.copy()
 
     # Rename a column to match the BigQuery schema
@@ -247,6 +463,52 @@ def store_in_database(df: pd.DataFrame) -> None:
     # Datetime is respected
     record_list = df_copy.to_dict(orient="records")
 
-    record_list = [NewsMetadata(**news_data) for news_data in record_list]
+    record_list = _validate_records(record_list)
+
+    started_at = time.perf_counter()
+    stored = get_news_extraction_table().add_rows(
+        record_list,
+        timeout=deadline.timeout(),
+        on_inserted=metrics.articles_inserted_total.inc,
+    )
+    metrics.news_store_duration_seconds.labels(
+        backend=news_config.NEWS_TABLE_BACKEND
+    ).observe(time.perf_counter() - started_at)
+
+    return stored
+
+
+def update_feed_watermarks(
+    df: pd.DataFrame,
+    watermark_filter: WatermarkEntryFilter,
+    skip_feed_urls: Optional[list[str]] = None,
+) -> None:
+    """
+    Moves the watermark of each feed to the publish_date of its latest article stored
+
+    Args:
+        df: pd.DataFrame -> DataFrame containing the articles stored, with the columns
+                            feed_url and publish_date
+        watermark_filter: WatermarkEntryFilter -> Filter that keeps the watermarks
+        skip_feed_urls: Optional[list[str]] -> Feeds whose watermark must not move (e.g. the
+                            ones truncated by a deadline, which might have older articles
+                            dropped)
+
+    Returns:
+        None
+    """
+    if not isinstance(df, pd.DataFrame) or df.empty:
+        return
+
+    latest_publish_dates = df.groupby("feed_url")["publish_date"].max()
+
+    for feed_url, publish_date in latest_publish_dates.items():
+        if feed_url in (skip_feed_urls or list()):
+            logger.info(f"Watermark of {feed_url} not moved, as it was truncated")
+            continue
+
+        try:
+            watermark_filter.update_watermark(feed_url, publish_date)
 
-    news_extraction_table.add_rows(record_list)
+        except Exception as e:
+            logger.error(f"Watermark of {feed_url} could not be updated: {e}")
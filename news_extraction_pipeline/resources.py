@@ -0,0 +1,183 @@
+from functools import lru_cache
+from typing import Optional, Union
+
+from database.jobs import InMemoryJobStore, JobStore, SQLiteJobStore
+from database.state import JSONFileStateStore, SQLiteStateStore, StateStore
+from database.tables.bigquery import NewsExtractionTable
+from database.tables.local import (
+    InMemoryNewsExtractionTable,
+    LocalNewsExtractionTable,
+    SQLiteNewsExtractionTable,
+)
+from news_extraction_pipeline.config import get_news_config
+from utils.http.cache import DiskResponseCache
+from utils.http.circuit_breaker import CircuitBreaker
+from utils.http.rate_limiter import AdaptiveRateLimiter
+from utils.http.retry import RetryPolicy
+from utils.jobs import BackgroundJobRunner
+from utils.result_cache import AsyncResultCache
+
+# Resources shared by the whole process (pipeline runs and API requests), built from
+# AINewsConfig the first time they are requested
+
+news_config = get_news_config()
+
+# Namespace of the StateStore where the circuit breaker state of each feed is kept
+FEED_CIRCUIT_BREAKERS_NAMESPACE = "feed_circuit_breakers"
+
+
+@lru_cache(maxsize=1)
+def get_state_store() -> StateStore:
+    """
+    Gets the store of the state kept between pipeline runs (feed watermarks, HTTP validators
+    and circuit breakers). STATE_STORE_BACKEND selects a JSON file or a SQLite database,
+    stored at STATE_STORE_PATH
+
+    Returns:
+        StateStore -> The state store
+    """
+    if news_config.STATE_STORE_BACKEND == "json":
+        return JSONFileStateStore(news_config.STATE_STORE_PATH)
+
+    return SQLiteStateStore(news_config.STATE_STORE_PATH)
+
+
+@lru_cache(maxsize=1)
+def get_news_extraction_table() -> Union[NewsExtractionTable, LocalNewsExtractionTable]:
+    """
+    Gets the table where the articles extracted are stored. NEWS_TABLE_BACKEND selects
+    BigQuery, or a local table kept in memory or in the SQLite database at NEWS_TABLE_PATH
+    for offline runs
+
+    Returns:
+        Union[NewsExtractionTable, LocalNewsExtractionTable] -> The news table
+    """
+    if news_config.NEWS_TABLE_BACKEND == "memory":
+        return InMemoryNewsExtractionTable()
+
+    if news_config.NEWS_TABLE_BACKEND == "sqlite":
+        return SQLiteNewsExtractionTable(news_config.NEWS_TABLE_PATH)
+
+    return NewsExtractionTable()
+
+
+@lru_cache(maxsize=1)
+def get_job_store() -> JobStore:
+    """
+    Gets the store of the API jobs and their results. JOB_STORE_BACKEND selects memory, lost
+    on restart, or the SQLite database at JOB_STORE_PATH. Both keep at most
+    JOB_STORE_MAX_JOBS jobs
+
+    Returns:
+        JobStore -> The job store
+    """
+    if news_config.JOB_STORE_BACKEND == "sqlite":
+        return SQLiteJobStore(
+            news_config.JOB_STORE_PATH, max_jobs=news_config.JOB_STORE_MAX_JOBS
+        )
+
+    return InMemoryJobStore(max_jobs=news_config.JOB_STORE_MAX_JOBS)
+
+
+@lru_cache(maxsize=1)
+def get_job_runner() -> BackgroundJobRunner:
+    """
+    Gets the runner of the pipeline jobs submitted to the API, which runs at most
+    JOBS_MAX_CONCURRENT of them at once and keeps them in the job store
+
+    Returns:
+        BackgroundJobRunner -> The job runner
+    """
+    return BackgroundJobRunner(
+        job_store=get_job_store(), max_concurrent=news_config.JOBS_MAX_CONCURRENT
+    )
+
+
+@lru_cache(maxsize=1)
+def get_response_cache() -> Optional[DiskResponseCache]:
+    """
+    Gets the disk cache of the article pages, shared by the image extractors and the
+    AsyncHTTPEngine. Enabled by HTTP_CACHE_ENABLED, and bounded by HTTP_CACHE_TTL_SECONDS
+    and HTTP_CACHE_MAX_SIZE_MB
+
+    Returns:
+        Optional[DiskResponseCache] -> The response cache, None if it is disabled
+    """
+    if not news_config.HTTP_CACHE_ENABLED:
+        return None
+
+    return DiskResponseCache(
+        db_path=news_config.HTTP_CACHE_PATH,
+        ttl_seconds=news_config.HTTP_CACHE_TTL_SECONDS,
+        max_size_bytes=int(news_config.HTTP_CACHE_MAX_SIZE_MB * 1024 * 1024),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_result_cache() -> Optional[AsyncResultCache]:
+    """
+    Gets the in-memory cache of the /extract_articles results, which also coalesces the
+    concurrent requests with the same arguments. Enabled by RESULT_CACHE_ENABLED
+
+    Returns:
+        Optional[AsyncResultCache] -> The result cache, None if it is disabled
+    """
+    if not news_config.RESULT_CACHE_ENABLED:
+        return None
+
+    return AsyncResultCache(
+        ttl_seconds=news_config.RESULT_CACHE_TTL_SECONDS,
+        max_entries=news_config.RESULT_CACHE_MAX_ENTRIES,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """
+    Gets the per host rate limiter of every feed and article request. Its state must be
+    shared, as it adapts the pace of each host to the responses received from it
+
+    Returns:
+        AdaptiveRateLimiter -> The rate limiter
+    """
+    return AdaptiveRateLimiter(
+        max_rate_per_second=news_config.RATE_LIMIT_MAX_REQUESTS_PER_SECOND,
+        burst=news_config.RATE_LIMIT_BURST,
+        max_concurrency=news_config.HTTP_MAX_CONNECTIONS_PER_HOST,
+        latency_target_seconds=news_config.RATE_LIMIT_LATENCY_TARGET_SECONDS,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_retry_policy() -> RetryPolicy:
+    """
+    Gets the retry policy of every feed and article request, with HTTP_RETRY_MAX_ATTEMPTS
+    attempts and a backoff bounded by HTTP_RETRY_BASE_DELAY_SECONDS and
+    HTTP_RETRY_MAX_DELAY_SECONDS
+
+    Returns:
+        RetryPolicy -> The retry policy
+    """
+    return RetryPolicy(
+        max_attempts=news_config.HTTP_RETRY_MAX_ATTEMPTS,
+        base_delay_seconds=news_config.HTTP_RETRY_BASE_DELAY_SECONDS,
+        max_delay_seconds=news_config.HTTP_RETRY_MAX_DELAY_SECONDS,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_feed_circuit_breaker() -> CircuitBreaker:
+    """
+    Gets the circuit breaker that skips the feeds failing repeatedly, for
+    FEED_CIRCUIT_BREAKER_COOLDOWN_SECONDS after FEED_CIRCUIT_BREAKER_FAILURE_THRESHOLD
+    failures. Its state is kept in the state store, so it survives between runs
+
+    Returns:
+        CircuitBreaker -> The feed circuit breaker
+    """
+    return CircuitBreaker(
+        state_store=get_state_store(),
+        namespace=FEED_CIRCUIT_BREAKERS_NAMESPACE,
+        failure_threshold=news_config.FEED_CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+        cooldown_seconds=news_config.FEED_CIRCUIT_BREAKER_COOLDOWN_SECONDS,
+    )
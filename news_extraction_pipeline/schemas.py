@@ -1,5 +1,7 @@
+import hashlib
+import json
 from pydantic import BaseModel, Field, field_validator
-from typing import Annotated
+from typing import Annotated, Optional
 
 
 class PipelineArgs(BaseModel):
@@ -49,6 +51,33 @@ class PipelineArgs(BaseModel):
             ge=1,
         ),
     ]
+    incremental: Annotated[
+        bool,
+        Field(
+            default=False,
+            description="Only process the entries of each feed published after the latest article "
+            "stored from it. The older ones are not returned either, so repeating a request only "
+            "returns the new articles",
+        ),
+    ]
+    skip_stored_articles: Annotated[
+        bool,
+        Field(
+            default=False,
+            description="Skip the entries whose article is already stored, so their pages are not "
+            "fetched again. They are not returned either, so repeating a request only returns "
+            "the new articles",
+        ),
+    ]
+    deadline_seconds: Annotated[
+        Optional[float],
+        Field(
+            default=None,
+            description="Time budget of the extraction in seconds. Once it runs out, the pending "
+            "work is given up, and the articles extracted so far are stored and returned",
+            gt=0,
+        ),
+    ]
 
     @field_validator("case_sen_search_kw", "case_insen_search_kw", mode="after")
     @classmethod
@@ -62,3 +91,43 @@ class PipelineArgs(BaseModel):
             )
 
         return cleaned
+
+    def _hash_args(self, include: set[str]) -> str:
+        """
+        Args:
+            include: set[str] -> Arguments hashed. Keywords are deduplicated and sorted, as
+                                their order does not change the results
+
+        Returns:
+            str -> SHA-256 of the normalized arguments
+        """
+        normalized_args = self.model_dump(include=include)
+        for kw_field in {"case_sen_search_kw", "case_insen_search_kw"} & include:
+            normalized_args[kw_field] = sorted(set(normalized_args[kw_field]))
+
+        return hashlib.sha256(
+            json.dumps(normalized_args, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def cache_key(self) -> str:
+        """
+        Builds a key identifying the results of the pipeline for these arguments. The deadline
+        is left out, as it only limits the time spent
+
+        Returns:
+            str -> SHA-256 of the normalized arguments
+        """
+        return self._hash_args(set(type(self).model_fields) - {"deadline_seconds"})
+
+    def filter_key(self) -> str:
+        """
+        Builds a key identifying the filters applied over the feed entries (keywords and
+        max_days_old), so the state kept per feed between runs (e.g. HTTP validators) is only
+        used by the runs filtering the same entries
+
+        Returns:
+            str -> SHA-256 of the normalized filter arguments
+        """
+        return self._hash_args(
+            {"case_sen_search_kw", "case_insen_search_kw", "max_days_old"}
+        )
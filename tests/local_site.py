@@ -0,0 +1,67 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+# Receives the path and the headers of a request, and returns the status, headers and body of
+# its response
+Responder = Callable[[str, dict[str, str]], tuple[int, dict[str, str], bytes]]
+
+
+class LocalSite:
+    """
+    Plain HTTP server on 127.0.0.1, answering every GET request with a responder function and
+    keeping the path and headers of the requests received
+
+    Usage:
+        with LocalSite(lambda path, headers: (200, dict(), b"ok")) as site:
+            httpx.get(f"{site.base_url}/feed")
+    """
+
+    def __init__(self, respond: Responder):
+        self.__respond = respond
+        self.__requests: list[tuple[str, dict[str, str]]] = list()
+        self.__server = ThreadingHTTPServer(("127.0.0.1", 0), self.__build_handler())
+        self.__server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.__server.server_address[1]}"
+
+    @property
+    def requests(self) -> list[tuple[str, dict[str, str]]]:
+        return list(self.__requests)
+
+    def _handle(
+        self, path: str, headers: dict[str, str]
+    ) -> tuple[int, dict[str, str], bytes]:
+        self.__requests.append((path, headers))
+        return self.__respond(path, headers)
+
+    def __build_handler(self) -> type[BaseHTTPRequestHandler]:
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, response_headers, body = site._handle(
+                    self.path, dict(self.headers.items())
+                )
+
+                self.send_response(status)
+                for name, value in response_headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self) -> "LocalSite":
+        threading.Thread(target=self.__server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.__server.shutdown()
+        self.__server.server_close()
@@ -0,0 +1,48 @@
+import asyncio
+import json
+
+from news_extraction_pipeline.app.main import stream_records
+
+
+class FakeRequest:
+    """
+    Request whose client disconnects after a number of checks
+    """
+
+    class url:
+        path = "/extract_articles/stream"
+
+    def __init__(self, checks_before_disconnecting: int):
+        self.__checks_left = checks_before_disconnecting
+
+    async def is_disconnected(self) -> bool:
+        self.__checks_left -= 1
+        return self.__checks_left < 0
+
+
+def test_stream_records_stops_the_pipeline_when_the_client_disconnects():
+    """
+    Tests that the records are sent as JSON lines, and that once the client disconnects no
+    more records are requested from the pipeline and it is closed.
+    """
+    requested = list()
+    closed = list()
+
+    async def records():
+        try:
+            for number in range(10):
+                requested.append(number)
+                yield {"type": "article", "title": f"News {number}"}
+
+        finally:
+            closed.append(True)
+
+    async def stream() -> list[str]:
+        return [line async for line in stream_records(FakeRequest(2), records())]
+
+    lines = asyncio.run(stream())
+
+    assert [json.loads(line)["title"] for line in lines] == ["News 0", "News 1"]
+    assert all(line.endswith("\n") for line in lines)
+    assert requested == [0, 1, 2]
+    assert closed == [True]
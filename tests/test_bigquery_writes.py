@@ -0,0 +1,152 @@
+import json
+import pytest
+from datetime import datetime, timezone
+from agent.config import get_gcp_config
+from database.schemas import NewsMetadata
+from database.tables.bigquery import NewsExtractionTable
+from database.tables.bigquery import news_metadata as news_metadata_module
+from utils.gcp import bigquery as bigquery_module
+
+
+class FakeLoadJob:
+    def result(self, timeout=None):
+        return self
+
+
+class FakeClient:
+    def __init__(self):
+        self.loads = list()
+        self.streaming_requests = list()
+
+    def get_table(self, table_id):
+        return table_id
+
+    def load_table_from_file(self, file, table_id, job_config=None, timeout=None):
+        self.loads.append((table_id, file.read(), job_config))
+        return FakeLoadJob()
+
+    def insert_rows_json(self, table_id, rows, timeout=None):
+        self.streaming_requests.append(rows)
+        return []
+
+
+@pytest.fixture
+def client(monkeypatch) -> FakeClient:
+    fake_client = FakeClient()
+    monkeypatch.setattr(bigquery_module, "get_client", lambda: fake_client)
+    return fake_client
+
+
+def test_split_rows_by_count_and_size():
+    """
+    Tests that the batches respect both limits and keep the order of the rows.
+    """
+    rows = [{"id": number, "text": "x" * 100} for number in range(7)]
+
+    batches = bigquery_module.split_rows(rows, max_rows=3, max_bytes=10_000)
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+
+    batches = bigquery_module.split_rows(rows, max_rows=100, max_bytes=250)
+    assert [len(batch) for batch in batches] == [2, 2, 2, 1]
+    assert [row for batch in batches for row in batch] == rows
+
+
+def test_serialize_rows_as_ndjson():
+    """
+    Tests that each row is written as a JSON line.
+    """
+    rows = [{"news_id": "a", "title": "First"}, {"news_id": "b", "title": "Second"}]
+
+    content = bigquery_module.serialize_rows(rows, "ndjson")
+
+    assert [json.loads(line) for line in content.decode().splitlines()] == rows
+
+    with pytest.raises(ValueError):
+        bigquery_module.serialize_rows(rows, "csv")
+
+
+def test_load_rows_uses_a_single_load_job(client):
+    """
+    Tests that all the rows are sent in one newline-delimited JSON file appended to the table.
+    """
+    rows = [{"news_id": str(number)} for number in range(1000)]
+
+    bigquery_module.load_rows("table", "dataset", "project", rows)
+
+    assert len(client.loads) == 1
+    table_id, content, job_config = client.loads[0]
+    assert table_id == "project.dataset.table"
+    assert len(content.decode().splitlines()) == 1000
+    assert job_config.source_format == "NEWLINE_DELIMITED_JSON"
+    assert job_config.write_disposition == "WRITE_APPEND"
+
+
+def test_insert_rows_splits_streaming_requests(client):
+    """
+    Tests that streaming inserts are sent in requests within the limits of the API.
+    """
+    rows = [{"news_id": str(number)} for number in range(1200)]
+
+    bigquery_module.insert_rows("table", "dataset", "project", rows)
+
+    assert [len(request) for request in client.streaming_requests] == [500, 500, 200]
+
+
+@pytest.mark.parametrize("write_mode", ["batch", "streaming"])
+def test_add_rows_follows_write_mode(client, monkeypatch, write_mode):
+    """
+    Tests that the news of a run are written with one load job in batch mode, and with
+    streaming inserts otherwise.
+    """
+    monkeypatch.setattr(get_gcp_config(), "BQ_WRITE_MODE", write_mode)
+    monkeypatch.setattr(
+        NewsExtractionTable, "_ids_in_table", lambda self, **kwargs: set()
+    )
+    news = [
+        NewsMetadata(
+            title="AI Takes Over the World",
+            published_at=datetime.now(timezone.utc),
+            news_link=f"https://example.com/{number}",
+        )
+        for number in range(3)
+    ]
+
+    assert news_metadata_module.NewsExtractionTable().add_rows(news)
+
+    if write_mode == "batch":
+        assert len(client.loads) == 1 and not client.streaming_requests
+    else:
+        assert not client.loads and len(client.streaming_requests) == 1
+
+
+def test_add_row_streams_a_single_row_in_batch_mode(client, monkeypatch):
+    """
+    Tests that adding a single news uses a streaming insert instead of a load job, even in
+    batch mode, and that news already stored are skipped.
+    """
+    monkeypatch.setattr(get_gcp_config(), "BQ_WRITE_MODE", "batch")
+    stored_ids = set()
+    monkeypatch.setattr(
+        NewsExtractionTable,
+        "_id_in_table",
+        lambda self, primary_key_row_value, **kwargs: primary_key_row_value
+        in stored_ids,
+    )
+    table = news_metadata_module.NewsExtractionTable()
+    news = NewsMetadata(
+        title="AI Takes Over the World",
+        published_at=datetime.now(timezone.utc),
+        news_link="https://example.com/0",
+    )
+
+    news_id = table.add_row(news)
+
+    assert not client.loads
+    assert [[row["news_id"] for row in rows] for rows in client.streaming_requests] == [
+        [news_id]
+    ]
+
+    stored_ids.add(news_id)
+    table.add_row(news)
+
+    assert len(client.streaming_requests) == 1
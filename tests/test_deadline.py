@@ -0,0 +1,32 @@
+import pytest
+from utils.deadline import Deadline
+
+
+def test_deadline_without_budget_never_expires():
+    deadline = Deadline()
+
+    assert deadline.remaining() is None
+    assert not deadline.expired()
+    assert deadline.timeout(default=60) == 60
+
+
+def test_deadline_bounds_timeouts():
+    """
+    Tests that timeouts are bounded by the time remaining, and that a reserve makes an earlier
+    deadline sharing the truncated sources.
+    """
+    deadline = Deadline(budget_seconds=30)
+    extraction_deadline = deadline.with_reserve(40)
+
+    assert deadline.timeout(default=60) <= 30
+    assert deadline.timeout(default=5) == 5
+    assert extraction_deadline.expired()
+
+    extraction_deadline.mark_truncated("https://example.com/feed")
+
+    assert deadline.truncated_sources == ["https://example.com/feed"]
+
+
+def test_invalid_budget():
+    with pytest.raises(ValueError):
+        Deadline(budget_seconds=0)
@@ -0,0 +1,156 @@
+import pandas as pd
+from database.state import JSONFileStateStore
+from news_extraction_pipeline.entry_filters.entry_filters import (
+    KnownArticleEntryFilter,
+    PredicateEntryFilter,
+    WatermarkEntryFilter,
+)
+
+FEED_URL = "https://example.com/feed"
+
+
+def build_entry(title: str, days_old: int) -> dict:
+    return {
+        "title": title,
+        "news_link": f"https://example.com/{title.replace(' ', '-')}",
+        "publish_date": pd.Timestamp.utcnow() - pd.Timedelta(days=days_old),
+    }
+
+
+def test_predicate_filter_keeps_recent_matching_entries():
+    """
+    Tests that only the entries within the date threshold that match a keyword are kept.
+    """
+    entries = [
+        build_entry("New AI model released", 0),
+        build_entry("Old AI model released", 5),
+        build_entry("Gardening tips", 0),
+    ]
+    entry_filter = PredicateEntryFilter(
+        max_days_old=2, case_sen_search_kw=["AI"], case_insen_search_kw=["Gemini"]
+    )
+
+    kept_entries = entry_filter.filter(FEED_URL, entries)
+
+    assert [entry["title"] for entry in kept_entries] == ["New AI model released"]
+
+
+def test_predicate_filter_keyword_case_sensitivity():
+    """
+    Tests that case sensitive keywords require an exact match while case insensitive ones do not.
+    """
+    entries = [
+        build_entry("the rain in spain", 0),
+        build_entry("google presents GEMINI", 0),
+    ]
+    entry_filter = PredicateEntryFilter(
+        max_days_old=2, case_sen_search_kw=["AI"], case_insen_search_kw=["Gemini"]
+    )
+
+    kept_entries = entry_filter.filter(FEED_URL, entries)
+
+    assert [entry["title"] for entry in kept_entries] == ["google presents GEMINI"]
+
+
+def test_predicate_filter_uses_filter_column():
+    """
+    Tests that the keywords are searched in the filter column, and that entries without that
+    column are left to the DataFrame filter.
+    """
+    entries = [build_entry("Gardening tips", 0), build_entry("New AI model", 0)]
+    entries[0]["news_link"] = "https://example.com/AI-gardening"
+    entries[1]["news_link"] = "https://example.com/new-model"
+
+    kept_entries = PredicateEntryFilter(
+        max_days_old=2,
+        case_sen_search_kw=["AI"],
+        case_insen_search_kw=[],
+        filter_column="news_link",
+    ).filter(FEED_URL, entries)
+
+    assert [entry["title"] for entry in kept_entries] == ["Gardening tips"]
+
+    kept_entries = PredicateEntryFilter(
+        max_days_old=2,
+        case_sen_search_kw=["AI"],
+        case_insen_search_kw=[],
+        filter_column="image_link",
+    ).filter(FEED_URL, entries)
+
+    assert len(kept_entries) == 2
+
+
+def test_known_article_filter_drops_stored_links():
+    """
+    Tests that the entries whose link is already stored are dropped.
+    """
+    entries = [build_entry("Stored AI news", 0), build_entry("New AI news", 0)]
+    stored_link = entries[0]["news_link"]
+    entry_filter = KnownArticleEntryFilter(
+        stored_links_lookup=lambda links: {
+            link for link in links if link == stored_link
+        }
+    )
+
+    kept_entries = entry_filter.filter(FEED_URL, entries)
+
+    assert [entry["title"] for entry in kept_entries] == ["New AI news"]
+
+
+def test_known_article_filter_keeps_entries_if_lookup_fails():
+    """
+    Tests that all the entries are kept if the stored links cannot be checked.
+    """
+
+    def failing_lookup(links: list[str]) -> set[str]:
+        raise ConnectionError("Database not available")
+
+    entries = [build_entry("Stored AI news", 0), build_entry("New AI news", 0)]
+    entry_filter = KnownArticleEntryFilter(stored_links_lookup=failing_lookup)
+
+    assert entry_filter.filter(FEED_URL, entries) == entries
+
+
+def test_watermark_filter_drops_entries_at_or_before_watermark(tmp_path):
+    """
+    Tests that only the entries published after the feed watermark are kept, and that the
+    watermark never moves backwards.
+    """
+    entries = [
+        build_entry("Newest AI news", 0),
+        build_entry("Stored AI news", 1),
+        build_entry("Oldest AI news", 2),
+    ]
+    entry_filter = WatermarkEntryFilter(
+        state_store=JSONFileStateStore(str(tmp_path / "state.json"))
+    )
+
+    assert entry_filter.filter(FEED_URL, entries) == entries
+
+    entry_filter.update_watermark(FEED_URL, entries[1]["publish_date"])
+    entry_filter.update_watermark(FEED_URL, entries[2]["publish_date"])
+
+    assert entry_filter.get_watermark(FEED_URL) == entries[1]["publish_date"]
+    kept_entries = entry_filter.filter(FEED_URL, entries)
+    assert [entry["title"] for entry in kept_entries] == ["Newest AI news"]
+
+
+def test_watermarks_are_kept_per_filter_key(tmp_path):
+    """
+    Tests that the watermark moved by a run is not used by the runs with other filters.
+    """
+    entries = [build_entry("Newest AI news", 0), build_entry("Older AI news", 1)]
+    state_store = JSONFileStateStore(str(tmp_path / "state.json"))
+
+    WatermarkEntryFilter(state_store, filter_key="narrow").update_watermark(
+        FEED_URL, entries[0]["publish_date"]
+    )
+
+    assert (
+        WatermarkEntryFilter(state_store, filter_key="narrow").filter(FEED_URL, entries)
+        == list()
+    )
+    assert (
+        WatermarkEntryFilter(state_store, filter_key="broad").filter(FEED_URL, entries)
+        == entries
+    )
@@ -0,0 +1,129 @@
+import asyncio
+import time
+import pytest
+
+from tests.local_site import LocalSite
+from utils.http import AsyncHTTPEngine
+from utils.http.cache import DiskResponseCache
+from utils.http.rate_limiter import AdaptiveRateLimiter
+
+SLOW_RESPONSE_SECONDS = 0.5
+
+FEED_ETAG = '"v1"'
+FEED_LAST_MODIFIED = "Mon, 12 Oct 2026 08:00:00 GMT"
+
+
+def respond(path: str, headers: dict[str, str]) -> tuple[int, dict[str, str], bytes]:
+    if path == "/slow":
+        time.sleep(SLOW_RESPONSE_SECONDS)
+
+    validators = {"ETag": FEED_ETAG, "Last-Modified": FEED_LAST_MODIFIED}
+    if path == "/feed" and (
+        headers.get("If-None-Match") == FEED_ETAG
+        or headers.get("If-Modified-Since") == FEED_LAST_MODIFIED
+    ):
+        return 304, validators, b""
+
+    return 200, validators, b"<html><head></head><body>News</body></html>"
+
+
+@pytest.fixture
+def local_sites():
+    with LocalSite(respond) as first_site, LocalSite(respond) as second_site:
+        yield first_site, second_site
+
+
+def test_requests_to_a_slow_host_do_not_hold_global_slots(local_sites):
+    """
+    Tests that the requests queued for a busy host do not take the global slots, so a request
+    to another host is sent right away.
+    """
+    slow_site, fast_site = local_sites
+
+    async def fetch_while_slow_host_is_busy() -> float:
+        async with AsyncHTTPEngine(
+            max_connections=2, max_connections_per_host=1
+        ) as engine:
+            slow_requests = [
+                asyncio.create_task(engine.fetch(f"{slow_site.base_url}/slow"))
+                for _ in range(4)
+            ]
+            await asyncio.sleep(0.1)
+
+            start = time.perf_counter()
+            response = await engine.fetch(f"{fast_site.base_url}/fast")
+            elapsed = time.perf_counter() - start
+
+            assert response is not None and response.status_code == 200
+            for slow_request in slow_requests:
+                slow_request.cancel()
+            await asyncio.gather(*slow_requests, return_exceptions=True)
+
+            return elapsed
+
+    assert asyncio.run(fetch_while_slow_host_is_busy()) < SLOW_RESPONSE_SECONDS
+
+
+def test_time_queued_for_a_global_slot_is_not_host_latency(local_sites):
+    """
+    Tests that the latency recorded by the rate limiter for a host does not include the time
+    its request waited for a global slot held by a slow request to another host.
+    """
+    slow_site, fast_site = local_sites
+    rate_limiter = AdaptiveRateLimiter()
+
+    async def fetch_behind_slow_host() -> None:
+        async with AsyncHTTPEngine(
+            max_connections=1, rate_limiter=rate_limiter
+        ) as engine:
+            slow_request = asyncio.create_task(
+                engine.fetch(f"{slow_site.base_url}/slow")
+            )
+            await asyncio.sleep(0.1)
+
+            response = await engine.fetch(f"{fast_site.base_url}/fast")
+
+            assert response is not None and response.status_code == 200
+            await slow_request
+
+    asyncio.run(fetch_behind_slow_host())
+
+    fast_host = AdaptiveRateLimiter.get_host(fast_site.base_url)
+    latency = rate_limiter.metrics()[fast_host]["latency_ewma_seconds"]
+
+    assert latency < SLOW_RESPONSE_SECONDS / 2
+
+
+@pytest.mark.parametrize(
+    "conditional_headers",
+    [{"If-None-Match": FEED_ETAG}, {"If-Modified-Since": FEED_LAST_MODIFIED}],
+)
+def test_not_modified_responses_are_returned(
+    local_sites, tmp_path, conditional_headers
+):
+    """
+    Tests that a 304 answering a conditional request is returned instead of being treated as
+    a failure, and that it is not cached.
+    """
+    site, _ = local_sites
+    response_cache = DiskResponseCache(
+        str(tmp_path / "cache.db"), ttl_seconds=60, max_size_bytes=10**6
+    )
+
+    async def fetch_feed() -> tuple:
+        async with AsyncHTTPEngine(response_cache=response_cache) as engine:
+            return (
+                await engine.fetch(
+                    f"{site.base_url}/feed",
+                    headers=conditional_headers,
+                    use_cache=True,
+                ),
+                await engine.fetch(f"{site.base_url}/feed"),
+            )
+
+    not_modified, modified = asyncio.run(fetch_feed())
+
+    assert not_modified is not None and not_modified.status_code == 304
+    assert modified is not None and modified.status_code == 200
+    assert response_cache.get(f"{site.base_url}/feed") is None
+    assert site.requests[0][1].items() >= conditional_headers.items()
@@ -0,0 +1,151 @@
+from news_extraction_pipeline.extractor_selectors.extractor_selector import (
+    ImageExtractorSelector,
+)
+from news_extraction_pipeline.extractors.image_url.image_url_extractors import (
+    MITImageExtractor,
+    OpenGraphImageExtractor,
+)
+
+ARTICLE_URL = "https://example.com/news/article-1"
+
+
+def build_html(head: str, body: str = "") -> bytes:
+    return f"<html><head>{head}</head><body>{body}</body></html>".encode()
+
+
+def test_open_graph_extractor_prefers_og_image():
+    """
+    Tests that og:image is preferred over twitter:image and that relative links are resolved.
+    """
+    html = build_html(
+        '<meta name="twitter:image" content="https://example.com/twitter.jpg">'
+        '<meta property="og:image" content="/og.jpg">'
+    )
+
+    image_link = OpenGraphImageExtractor().extract_from_html(ARTICLE_URL, html)
+
+    assert image_link == "https://example.com/og.jpg"
+
+
+def test_open_graph_extractor_only_returns_https_links():
+    """
+    Tests that http image links are upgraded to https, and that links of other schemes are
+    skipped in favour of the next metadata, as only https image links can be stored.
+    """
+    http_html = build_html(
+        '<meta property="og:image" content="http://example.com/og.jpg">'
+    )
+    data_html = build_html(
+        '<meta property="og:image" content="data:image/png;base64,AAAA">'
+        '<meta name="twitter:image" content="https://example.com/twitter.jpg">'
+    )
+
+    extractor = OpenGraphImageExtractor()
+
+    assert (
+        extractor.extract_from_html(ARTICLE_URL, http_html)
+        == "https://example.com/og.jpg"
+    )
+    assert (
+        extractor.extract_from_html(ARTICLE_URL, data_html)
+        == "https://example.com/twitter.jpg"
+    )
+
+
+def test_open_graph_extractor_fallbacks():
+    """
+    Tests that twitter:image and link rel="image_src" are used when there is no og:image.
+    """
+    twitter_html = build_html(
+        '<meta name="twitter:image" content="https://example.com/twitter.jpg">'
+    )
+    link_html = build_html('<link rel="image_src" href="https://example.com/link.jpg">')
+
+    extractor = OpenGraphImageExtractor()
+
+    assert (
+        extractor.extract_from_html(ARTICLE_URL, twitter_html)
+        == "https://example.com/twitter.jpg"
+    )
+    assert (
+        extractor.extract_from_html(ARTICLE_URL, link_html)
+        == "https://example.com/link.jpg"
+    )
+
+
+def test_open_graph_extractor_ignores_body():
+    """
+    Tests that only the <head> of the article is used.
+    """
+    html = build_html(
+        "<title>News</title>",
+        '<meta property="og:image" content="https://example.com/body.jpg">',
+    )
+
+    assert OpenGraphImageExtractor().extract_from_html(ARTICLE_URL, html) is None
+
+
+def test_site_extractor_falls_back_to_its_own_structure():
+    """
+    Tests that a site specific extractor uses its own structure when there is no Open Graph
+    metadata, and the Open Graph image when there is.
+    """
+    extractor = MITImageExtractor()
+    article_url = f"{extractor.base_feed_url}/2025/article-1"
+    body = (
+        '<div class="news-article--media--image--file">'
+        '<img data-src="/sites/default/files/image.jpg"></div>'
+    )
+
+    assert (
+        extractor.extract_from_html(article_url, build_html("", body))
+        == f"{extractor.base_feed_url}/sites/default/files/image.jpg"
+    )
+    assert (
+        extractor.extract_from_html(
+            article_url,
+            build_html(
+                '<meta property="og:image" content="https://example.com/og.jpg">', body
+            ),
+        )
+        == "https://example.com/og.jpg"
+    )
+
+
+def test_selector_defaults_to_open_graph_extractor():
+    """
+    Tests that sites without a registered extractor get the OpenGraphImageExtractor.
+    """
+    extractor = ImageExtractorSelector().get_extractor("https://example.com/feed/")
+
+    assert isinstance(extractor, OpenGraphImageExtractor)
+
+
+def test_site_extractor_reads_only_the_head_if_it_has_an_open_graph_image():
+    """
+    Tests that a site specific extractor stops reading the response after the <head> when it
+    has an Open Graph image, and keeps reading the same response up to its own structure
+    when it has not.
+    """
+    extractor = MITImageExtractor()
+    article_url = f"{extractor.base_feed_url}/2025/article-1"
+    body = (
+        '<div class="news-article--media--image--file">'
+        '<img data-src="/sites/default/files/image.jpg"></div>'
+    )
+
+    def read(head: str) -> tuple[bytes, list[bytes]]:
+        chunks = [
+            chunk.encode() for chunk in ("<html><head>", head, "</head>", body, "rest")
+        ]
+        remaining = iter(chunks)
+
+        return extractor._read_html(article_url, remaining, 10_000), list(remaining)
+
+    html, unread = read(
+        '<meta property="og:image" content="https://example.com/og.jpg">'
+    )
+    assert html.endswith(b"</head>") and len(unread) == 2
+
+    html, unread = read("")
+    assert html.endswith(body.encode()) and unread == [b"rest"]
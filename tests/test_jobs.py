@@ -0,0 +1,160 @@
+import asyncio
+import pytest
+from database.jobs import InMemoryJobStore, SQLiteJobStore
+from utils.jobs import BackgroundJobRunner
+from utils.progress import Progress
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def job_store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteJobStore(str(tmp_path / "jobs.db"))
+
+    return InMemoryJobStore()
+
+
+def test_save_get_and_update_job(job_store):
+    """
+    Tests that a saved job is retrieved, that update merges the changes into it, and that
+    updating a missing job does nothing.
+    """
+    job_store.save("job", {"status": "pending", "progress": {}})
+
+    assert job_store.update("job", status="running") == {
+        "status": "running",
+        "progress": {},
+    }
+    assert job_store.get("job") == {"status": "running", "progress": {}}
+    assert job_store.get("other") is None
+    assert job_store.update("other", status="running") is None
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_job_store_removes_oldest_jobs(backend, tmp_path):
+    """
+    Tests that the store keeps max_jobs jobs, removing the oldest ones, and that updating a
+    job does not make it newer.
+    """
+    if backend == "sqlite":
+        job_store = SQLiteJobStore(str(tmp_path / "jobs.db"), max_jobs=2)
+    else:
+        job_store = InMemoryJobStore(max_jobs=2)
+
+    for job_id in ["first", "second", "third"]:
+        job_store.save(job_id, {"job_id": job_id})
+    job_store.update("second", status="running")
+    job_store.save("fourth", {"job_id": "fourth"})
+
+    assert job_store.get("first") is None
+    assert job_store.get("second") is None
+    assert job_store.get("third") == {"job_id": "third"}
+    assert job_store.get("fourth") == {"job_id": "fourth"}
+
+
+def test_job_reports_progress_and_result(job_store):
+    """
+    Tests that a submitted job is pending until it runs, reports its live progress while
+    running, and keeps its result and final progress once it succeeds.
+    """
+    release = asyncio.Event()
+
+    async def run(progress: Progress) -> dict:
+        progress.set("feeds_total", 2)
+        progress.increment("feeds_done")
+        await release.wait()
+        progress.increment("feeds_done")
+        return {"total_articles": 3}
+
+    async def scenario() -> tuple[dict, dict, dict]:
+        runner = BackgroundJobRunner(job_store)
+        submitted = await runner.submit(run, params={"max_days_old": 2})
+
+        await asyncio.sleep(0.05)
+        running = await runner.get(submitted["job_id"])
+
+        release.set()
+        while runner.active_jobs():
+            await asyncio.sleep(0.01)
+
+        return submitted, running, await runner.get(submitted["job_id"])
+
+    submitted, running, finished = asyncio.run(scenario())
+
+    assert submitted["status"] == "pending"
+    assert submitted["params"] == {"max_days_old": 2}
+    assert running["status"] == "running"
+    assert running["progress"] == {"feeds_total": 2, "feeds_done": 1}
+    assert finished["status"] == "succeeded"
+    assert finished["progress"] == {"feeds_total": 2, "feeds_done": 2}
+    assert finished["result"] == {"total_articles": 3}
+    assert finished["finished_at"] is not None
+
+
+def test_failed_job_keeps_error_and_jobs_wait_for_a_free_slot():
+    """
+    Tests that a job raising an error is marked as failed, and that with a single slot the
+    next job stays pending until the running one finishes.
+    """
+
+    async def fail(progress: Progress) -> dict:
+        await asyncio.sleep(0.05)
+        raise RuntimeError("feed unavailable")
+
+    async def succeed(progress: Progress) -> dict:
+        return {}
+
+    async def scenario() -> tuple[dict, dict, dict]:
+        runner = BackgroundJobRunner(InMemoryJobStore(), max_concurrent=1)
+        failing = await runner.submit(fail)
+        waiting = await runner.submit(succeed)
+
+        await asyncio.sleep(0.01)
+        waiting_status = await runner.get(waiting["job_id"])
+
+        while runner.active_jobs():
+            await asyncio.sleep(0.01)
+
+        return (
+            await runner.get(failing["job_id"]),
+            waiting_status,
+            await runner.get(waiting["job_id"]),
+        )
+
+    failed, waiting, succeeded = asyncio.run(scenario())
+
+    assert failed["status"] == "failed"
+    assert failed["error"] == "feed unavailable"
+    assert waiting["status"] == "pending"
+    assert succeeded["status"] == "succeeded"
+
+
+def test_cancelled_jobs_are_marked_as_failed(job_store):
+    """
+    Tests that the jobs still running or pending when their tasks are cancelled (e.g. when
+    the event loop shuts down) are marked as failed instead of being left as such.
+    """
+
+    async def run_forever(progress: Progress) -> dict:
+        await asyncio.Event().wait()
+        return {}
+
+    async def scenario() -> list[str]:
+        runner = BackgroundJobRunner(job_store, max_concurrent=1)
+        jobs = [await runner.submit(run_forever) for _ in range(2)]
+
+        await asyncio.sleep(0.05)
+        return [job["job_id"] for job in jobs]
+
+    # asyncio.run cancels the tasks still running once the scenario returns
+    job_ids = asyncio.run(scenario())
+
+    for job_id in job_ids:
+        job = job_store.get(job_id)
+        assert job["status"] == "failed"
+        assert job["error"] == "Job cancelled"
+        assert job["finished_at"] is not None
+
+
+def test_max_concurrent_must_be_positive():
+    with pytest.raises(ValueError):
+        BackgroundJobRunner(InMemoryJobStore(), max_concurrent=0)
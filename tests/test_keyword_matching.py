@@ -0,0 +1,66 @@
+import pandas as pd
+from news_extraction_pipeline.keyword_matching import (
+    KeywordMatcher,
+    compile_keyword_matcher,
+)
+
+CASE_SEN_KW = ("AI", "A.I.", "AI-")
+CASE_INSEN_KW = ("Machine Learning", "ChatGPT", "Gemini")
+TITLES = [
+    "New AI model released",
+    "The rain in Spain",
+    "A.I. reaches the classroom",
+    "machine learning for farmers",
+    "CHATGPT gets an update",
+    "Gardening tips (with regex chars?)",
+    "",
+]
+
+
+def naive_matches(text: str) -> bool:
+    return any(kw in text for kw in CASE_SEN_KW) or any(
+        kw.lower() in text.lower() for kw in CASE_INSEN_KW
+    )
+
+
+def test_matcher_is_equivalent_to_substring_search():
+    """
+    Tests that the compiled matcher gives the same result as searching each keyword.
+    """
+    matcher = KeywordMatcher(CASE_SEN_KW, CASE_INSEN_KW)
+
+    assert [matcher.matches(title) for title in TITLES] == [
+        naive_matches(title) for title in TITLES
+    ]
+
+
+def test_match_series_is_equivalent_to_matches():
+    """
+    Tests that the vectorized matching gives the same result as matching each text.
+    """
+    matcher = KeywordMatcher(CASE_SEN_KW, CASE_INSEN_KW)
+    titles = pd.Series(TITLES, index=range(10, 10 + len(TITLES)))
+
+    matched = matcher.match_series(titles)
+
+    assert matched.index.equals(titles.index)
+    assert matched.tolist() == [matcher.matches(title) for title in TITLES]
+
+
+def test_matcher_without_keywords_never_matches():
+    """
+    Tests that an empty group of keywords does not match every text.
+    """
+    matcher = KeywordMatcher(tuple(), ("Gemini",))
+
+    assert not matcher.matches("New AI model released")
+    assert matcher.matches("gemini 2 released")
+
+
+def test_compiled_matchers_are_cached():
+    """
+    Tests that the same keywords return the same compiled matcher.
+    """
+    assert compile_keyword_matcher(CASE_SEN_KW, CASE_INSEN_KW) is (
+        compile_keyword_matcher(CASE_SEN_KW, CASE_INSEN_KW)
+    )
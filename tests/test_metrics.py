@@ -0,0 +1,45 @@
+from prometheus_client import CollectorRegistry, generate_latest
+
+from news_extraction_pipeline.app import metrics as app_metrics
+from news_extraction_pipeline.app.metrics import SharedStateCollector
+
+
+class FakeRateLimiter:
+    def metrics(self) -> dict[str, dict[str, float]]:
+        return {"example.com": {"concurrency_limit": 4, "throttle_events": 2}}
+
+
+class FakeResultCache:
+    def stats(self) -> dict[str, int]:
+        return {"entries": 1, "in_flight": 0, "hits": 3, "misses": 1, "coalesced": 2}
+
+
+def test_shared_state_is_exported_as_counters_at_scrape_time(monkeypatch):
+    """
+    Tests that the throttle events and the result cache events are exported as counters, and
+    the concurrency limit as a gauge, with the values read when the registry is scraped.
+    """
+    monkeypatch.setattr(app_metrics, "get_rate_limiter", FakeRateLimiter)
+    monkeypatch.setattr(app_metrics, "get_result_cache", FakeResultCache)
+    registry = CollectorRegistry()
+    registry.register(SharedStateCollector())
+
+    assert {metric.name: metric.type for metric in registry.collect()} == {
+        "rate_limiter_concurrency_limit": "gauge",
+        "rate_limiter_throttle_events": "counter",
+        "result_cache_events": "counter",
+    }
+
+    exposition = generate_latest(registry).decode().splitlines()
+    assert 'rate_limiter_concurrency_limit{host="example.com"} 4.0' in exposition
+    assert 'rate_limiter_throttle_events_total{host="example.com"} 2.0' in exposition
+    assert 'result_cache_events_total{event="coalesced"} 2.0' in exposition
+
+
+def test_disabled_result_cache_is_not_exported(monkeypatch):
+    monkeypatch.setattr(app_metrics, "get_rate_limiter", FakeRateLimiter)
+    monkeypatch.setattr(app_metrics, "get_result_cache", lambda: None)
+    registry = CollectorRegistry()
+    registry.register(SharedStateCollector())
+
+    assert b"result_cache_events" not in generate_latest(registry)
@@ -0,0 +1,223 @@
+import asyncio
+import re
+import time
+import pandas as pd
+import pytest
+from typing import Optional
+
+from database.state import SQLiteStateStore
+from news_extraction_pipeline.benchmarks.fake_news_site import build_feed
+from news_extraction_pipeline.extractor_selectors.extractor_selector import (
+    ImageExtractorSelector,
+)
+from news_extraction_pipeline.extractors.image_url.image_url_extractors import (
+    BaseImageExtractor,
+)
+from news_extraction_pipeline.extractors.news.news_extractors import (
+    FEED_VALIDATORS_NAMESPACE,
+    FeedValidators,
+    NewsExtractor,
+)
+from tests.local_site import LocalSite
+from utils.http import AsyncHTTPEngine
+from utils.deadline import Deadline
+from utils.http.circuit_breaker import CircuitBreaker
+from utils.http.retry import RetryPolicy
+
+FEED_ETAG = '"v1"'
+ARTICLE_HTML = (
+    b'<html><head><meta property="og:image" content="https://example.com/image.jpg">'
+    b"</head><body>News</body></html>"
+)
+
+
+@pytest.fixture
+def site(monkeypatch):
+    # The local site is served over plain HTTP
+    monkeypatch.setattr(
+        ImageExtractorSelector,
+        "_ImageExtractorSelector__base_url_pattern",
+        r"http://[\w\.:-]+/",
+    )
+
+    def respond(path: str, headers: dict[str, str]):
+        if path != "/feed":
+            return 200, {"Content-Type": "text/html"}, ARTICLE_HTML
+        if headers.get("If-None-Match") == FEED_ETAG:
+            return 304, {"ETag": FEED_ETAG}, b""
+
+        return 200, {"ETag": FEED_ETAG}, build_feed("news", local_site.base_url, 2)
+
+    with LocalSite(respond) as local_site:
+        yield local_site
+
+
+@pytest.fixture
+def state_store(tmp_path) -> SQLiteStateStore:
+    return SQLiteStateStore(str(tmp_path / "state.db"))
+
+
+def extract(
+    feed_url: str,
+    feed_validators: Optional[FeedValidators] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+) -> Optional[pd.DataFrame]:
+    async def aextract() -> Optional[pd.DataFrame]:
+        extractor = NewsExtractor(
+            feed_validators=feed_validators, circuit_breaker=circuit_breaker
+        )
+        extractor.set_current_feed_url(feed_url)
+
+        async with AsyncHTTPEngine() as engine:
+            return await extractor.aget_articles(engine)
+
+    return asyncio.run(aextract())
+
+
+def test_feed_validators_are_only_saved_when_asked(site, state_store):
+    """
+    Tests that the validators of a feed are kept pending until save is called, and that once
+    saved they are sent by the next runs with the same filter key, which skip the feed on a 304.
+    """
+    feed_url = f"{site.base_url}/feed"
+    feed_validators = FeedValidators(state_store, filter_key="defaults")
+
+    articles = extract(feed_url, feed_validators)
+
+    assert len(articles) == 2
+    assert articles["image_link"].eq("https://example.com/image.jpg").all()
+    assert feed_validators.pending == {feed_url: {"etag": FEED_ETAG, "modified": None}}
+    assert state_store.get(FEED_VALIDATORS_NAMESPACE, f"{feed_url}#defaults") is None
+
+    feed_validators.save()
+
+    not_modified = extract(feed_url, FeedValidators(state_store, filter_key="defaults"))
+    assert not_modified is not None and not_modified.empty
+    path, headers = site.requests[-1]
+    assert path == "/feed" and headers["If-None-Match"] == FEED_ETAG
+
+    other_filters = extract(feed_url, FeedValidators(state_store, filter_key="other"))
+    assert len(other_filters) == 2
+
+
+@pytest.mark.parametrize("use_engine", [False, True])
+def test_feed_retries_stop_at_the_deadline(use_engine, monkeypatch):
+    """
+    Tests that a feed failing slowly with a transient error is retried only while the deadline
+    allows it, so the extraction returns once the deadline expires instead of after every
+    attempt and backoff.
+    """
+    monkeypatch.setattr(
+        ImageExtractorSelector,
+        "_ImageExtractorSelector__base_url_pattern",
+        r"http://[\w\.:-]+/",
+    )
+
+    def respond(path: str, headers: dict[str, str]):
+        time.sleep(0.6)
+        return 503, dict(), b""
+
+    retry_policy = RetryPolicy(
+        max_attempts=3, base_delay_seconds=1, max_delay_seconds=1
+    )
+
+    async def aextract(feed_url: str, deadline: Deadline) -> Optional[pd.DataFrame]:
+        extractor = NewsExtractor()
+        extractor.set_current_feed_url(feed_url)
+
+        async with AsyncHTTPEngine(retry_policy=retry_policy) as engine:
+            return await extractor.aget_articles(engine, deadline=deadline)
+
+    with LocalSite(respond) as site:
+        feed_url = f"{site.base_url}/feed"
+        deadline = Deadline(budget_seconds=1)
+        started_at = time.monotonic()
+
+        if use_engine:
+            articles = asyncio.run(aextract(feed_url, deadline))
+        else:
+            extractor = NewsExtractor(retry_policy=retry_policy)
+            extractor.set_current_feed_url(feed_url)
+            articles = extractor.get_articles(deadline=deadline)
+
+        elapsed = time.monotonic() - started_at
+
+    assert articles is None
+    assert elapsed < 1.5
+    assert feed_url in deadline.truncated_sources
+
+
+def test_not_modified_feed_closes_the_circuit(site, state_store):
+    """
+    Tests that a 304 is recorded as a success by the circuit breaker.
+    """
+    feed_url = f"{site.base_url}/feed"
+    circuit_breaker = CircuitBreaker(state_store, "circuits", failure_threshold=2)
+    feed_validators = FeedValidators(state_store)
+    feed_validators.add_pending(feed_url, FEED_ETAG, None)
+    feed_validators.save()
+
+    circuit_breaker.record_failure(feed_url)
+    assert state_store.get("circuits", feed_url)["failures"] == 1
+
+    articles = extract(feed_url, FeedValidators(state_store), circuit_breaker)
+
+    assert articles is not None and articles.empty
+    assert state_store.get("circuits", feed_url) is None
+
+
+def test_open_graph_head_is_fetched_before_the_site_pattern(monkeypatch):
+    """
+    Tests that a site specific extractor first downloads only the <head> of the articles, and
+    downloads them up to its own stop pattern only when they have no Open Graph image.
+    """
+    monkeypatch.setattr(
+        ImageExtractorSelector,
+        "_ImageExtractorSelector__base_url_pattern",
+        r"http://[\w\.:-]+/",
+    )
+    monkeypatch.setattr(
+        BaseImageExtractor,
+        "_BaseImageExtractor__base_url_pattern",
+        r"http://[\w\.:-]+/",
+    )
+    main_image = b'<img class="main" src="/main.jpg">'
+    articles_html = {
+        "/news/articles/0/": ARTICLE_HTML.replace(b"News", b"x" * 100_000 + main_image),
+        "/news/articles/1/": b"<html><head></head><body>"
+        + main_image
+        + b"</body></html>",
+    }
+
+    def respond(path: str, headers: dict[str, str]):
+        if path == "/feed":
+            return 200, dict(), build_feed("news", local_site.base_url, 2)
+
+        return 200, {"Content-Type": "text/html"}, articles_html[path]
+
+    with LocalSite(respond) as local_site:
+
+        class LocalSiteImageExtractor(BaseImageExtractor):
+            _feed_url = f"{local_site.base_url}/feed"
+            _stop_reading_pattern = re.compile(rb'<img class="main"[^>]{0,1024}>')
+
+            def _get_image_link(self):
+                return self.current_html_code.find("img", class_="main")["src"]
+
+        monkeypatch.setitem(
+            NewsExtractor._NewsExtractor__img_extr_selector.extractors,
+            local_site.base_url,
+            LocalSiteImageExtractor,
+        )
+        articles = extract(f"{local_site.base_url}/feed")
+        article_requests = [path for path, _ in local_site.requests if path != "/feed"]
+
+    assert articles.set_index("news_link")["image_link"].to_dict() == {
+        f"{local_site.base_url}/news/articles/0/": "https://example.com/image.jpg",
+        f"{local_site.base_url}/news/articles/1/": "/main.jpg",
+    }
+    assert sorted(article_requests) == [
+        "/news/articles/0/",
+        "/news/articles/1/",
+        "/news/articles/1/",
+    ]
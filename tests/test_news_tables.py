@@ -0,0 +1,139 @@
+import pandas as pd
+import pytest
+from datetime import datetime, timezone
+from news_extraction_pipeline import metrics, pipeline_steps
+from news_extraction_pipeline.config import get_news_config
+from database.schemas import NewsMetadata
+from database.tables.local import (
+    InMemoryNewsExtractionTable,
+    SQLiteNewsExtractionTable,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def news_table(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteNewsExtractionTable(str(tmp_path / "news.db"))
+
+    return InMemoryNewsExtractionTable()
+
+
+def build_news(news_link: str) -> NewsMetadata:
+    return NewsMetadata(
+        title="AI Takes Over the World",
+        published_at=datetime.now(timezone.utc),
+        news_link=news_link,
+    )
+
+
+def test_add_rows_skips_stored_and_repeated_news(news_table):
+    """
+    Tests that the news already stored, or repeated in the same batch, are only stored once,
+    and only the rows inserted are reported.
+    """
+    inserted = list()
+
+    assert news_table.add_rows(
+        [build_news("https://example.com/a")], on_inserted=inserted.append
+    )
+    assert news_table.add_rows(
+        [
+            build_news("https://example.com/a"),
+            build_news("https://example.com/b"),
+            build_news("https://example.com/b"),
+        ],
+        on_inserted=inserted.append,
+    )
+    assert inserted == [1, 1]
+
+    rows = news_table.rows
+    assert [row["news_link"] for row in rows] == [
+        "https://example.com/a",
+        "https://example.com/b",
+    ]
+    assert all(row["news_id"] and row["extracted_at"] for row in rows)
+
+
+def test_get_stored_news_links(news_table):
+    """
+    Tests that only the links already stored are returned.
+    """
+    news_table.add_rows([build_news("https://example.com/a")])
+
+    assert news_table.get_stored_news_links(
+        ["https://example.com/a", "https://example.com/b"]
+    ) == {"https://example.com/a"}
+
+    news_table.clear()
+    assert news_table.get_stored_news_links(["https://example.com/a"]) == set()
+
+
+def test_get_stored_news_links_in_large_batches(news_table):
+    """
+    Tests the lookup of more links than fit in a single SQLite query.
+    """
+    news_links = [f"https://example.com/{number}" for number in range(1200)]
+    news_table.add_rows([build_news(news_link) for news_link in news_links[::2]])
+
+    assert news_table.get_stored_news_links(news_links) == set(news_links[::2])
+
+
+def test_add_row_returns_id(news_table):
+    """
+    Tests that add_row stores a single news and returns its id, also if it was already stored.
+    """
+    news_id = news_table.add_row(build_news("https://example.com/a"))
+
+    assert news_table.add_row(build_news("https://example.com/a")) == news_id
+    assert [row["news_id"] for row in news_table.rows] == [news_id]
+
+
+def test_add_rows_rejects_invalid_input(news_table):
+    """
+    Tests that add_rows fails without storing anything if it does not receive NewsMetadata objects.
+    """
+    assert not news_table.add_rows([{"news_link": "https://example.com/a"}])
+    assert news_table.rows == []
+
+
+def test_sqlite_table_is_persisted(tmp_path):
+    """
+    Tests that the news stored in a SQLite file are found by a new table using it.
+    """
+    db_path = str(tmp_path / "news.db")
+    SQLiteNewsExtractionTable(db_path).add_rows([build_news("https://example.com/a")])
+
+    assert SQLiteNewsExtractionTable(db_path).get_stored_news_links(
+        ["https://example.com/a"]
+    ) == {"https://example.com/a"}
+
+
+def test_store_in_database_drops_invalid_articles(monkeypatch):
+    """
+    Tests that an article not matching the schema of the table is dropped on its own, the
+    rest of the batch is still stored, and the duration is recorded under the backend used.
+    """
+    store_duration_labels = {"backend": get_news_config().NEWS_TABLE_BACKEND}
+    stores_before = metrics.registry.get_sample_value(
+        "news_store_duration_seconds_count", store_duration_labels
+    )
+    news_table = InMemoryNewsExtractionTable()
+    monkeypatch.setattr(pipeline_steps, "get_news_extraction_table", lambda: news_table)
+    articles = pd.DataFrame(
+        {
+            "title": ["Valid", "Invalid image link"],
+            "news_link": ["https://example.com/a", "https://example.com/b"],
+            "image_link": ["https://example.com/a.jpg", "http://example.com/b.jpg"],
+            "publish_date": [datetime.now(timezone.utc)] * 2,
+            "feed_url": ["https://example.com/feed"] * 2,
+        }
+    )
+
+    assert pipeline_steps.store_in_database(articles)
+    assert [row["news_link"] for row in news_table.rows] == ["https://example.com/a"]
+    assert (
+        metrics.registry.get_sample_value(
+            "news_store_duration_seconds_count", store_duration_labels
+        )
+        == (stores_before or 0) + 1
+    )
@@ -0,0 +1,65 @@
+from news_extraction_pipeline.benchmarks.pandas_steps import (
+    STEPS,
+    find_regressions,
+    generate_articles,
+    run_benchmark,
+)
+
+
+def test_generate_articles():
+    """
+    Tests that the articles generated have the columns of the pipeline and some of them
+    match its default keywords.
+    """
+    articles = generate_articles(1000)
+
+    assert len(articles) == 1000
+    assert list(articles.columns) == [
+        "title",
+        "news_link",
+        "image_link",
+        "publish_date",
+        "feed_url",
+    ]
+    assert str(articles["publish_date"].dtype) == "datetime64[ns, UTC]"
+    assert 0 < len(STEPS["filter_by_keywords"](articles)) < 1000
+
+
+def test_run_benchmark_measures_every_step_and_size():
+    """
+    Tests that time and peak memory are measured for every step and size.
+    """
+    results = run_benchmark(sizes=(100, 200), repeats=1)
+
+    assert set(results) == set(STEPS)
+    for results_by_size in results.values():
+        assert set(results_by_size) == {"100", "200"}
+        assert all(
+            measures["seconds"] > 0 and measures["peak_memory_bytes"] > 0
+            for measures in results_by_size.values()
+        )
+
+
+def test_find_regressions():
+    """
+    Tests that only the results beyond the threshold over the baseline are regressions, and
+    that the ones missing from the baseline are not compared.
+    """
+    baseline = {
+        "filter_by_keywords": {"100": {"seconds": 1.0, "peak_memory_bytes": 100}}
+    }
+    results = {
+        "filter_by_keywords": {
+            "100": {"seconds": 1.4, "peak_memory_bytes": 130},
+            "200": {"seconds": 10.0, "peak_memory_bytes": 1000},
+        }
+    }
+
+    regressions = find_regressions(
+        results, baseline, time_threshold=0.5, memory_threshold=0.2
+    )
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith(
+        "filter_by_keywords with 100 rows: peak_memory_bytes"
+    )
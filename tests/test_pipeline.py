@@ -0,0 +1,160 @@
+import asyncio
+import pandas as pd
+import pytest
+
+from database.state import SQLiteStateStore
+from news_extraction_pipeline import pipeline
+from news_extraction_pipeline.entry_filters.entry_filters import WatermarkEntryFilter
+from news_extraction_pipeline.schemas import PipelineArgs
+
+FEED_URL = "https://example.com/feed"
+
+
+def build_articles(feed_url: str, titles: list[str]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "title": titles,
+            "news_link": [f"{feed_url}/{number}" for number in range(len(titles))],
+            "image_link": [None] * len(titles),
+            "publish_date": pd.Timestamp.now(tz="UTC"),
+            "feed_url": feed_url,
+        }
+    )
+
+
+@pytest.fixture
+def stored_articles(monkeypatch, tmp_path) -> list[pd.DataFrame]:
+    """
+    Articles passed to store_in_database, which only checks that the deadline has not expired
+    """
+    stored = list()
+
+    def store_in_database(df: pd.DataFrame, deadline=None) -> bool:
+        assert not deadline.expired()
+        stored.append(df)
+        return True
+
+    state_store = SQLiteStateStore(str(tmp_path / "state.db"))
+    monkeypatch.setattr(pipeline, "get_state_store", lambda: state_store)
+    monkeypatch.setattr(pipeline, "store_in_database", store_in_database)
+    monkeypatch.setattr(pipeline, "_get_news_sources", lambda: [FEED_URL])
+
+    return stored
+
+
+def test_short_deadline_leaves_time_to_extract_and_store(monkeypatch, stored_articles):
+    """
+    Tests that a deadline shorter than the time reserved to store the articles still leaves
+    time to extract them, and that the articles extracted before it expires are stored and
+    returned as partial results.
+    """
+
+    async def extract_until_deadline(
+        feed_urls, entry_filters=None, deadline=None, progress=None, **kwargs
+    ) -> pd.DataFrame:
+        assert not deadline.expired()
+
+        articles = build_articles(FEED_URL, ["Machine Learning news"])
+        await asyncio.sleep(deadline.remaining())
+        deadline.mark_truncated(FEED_URL)
+
+        return articles
+
+    monkeypatch.setattr(
+        pipeline, "aextract_from_multiple_feed_urls", extract_until_deadline
+    )
+
+    articles = pipeline.main(deadline_seconds=0.4)
+
+    assert articles["title"].tolist() == ["Machine Learning news"]
+    assert articles.attrs["truncated_sources"] == [FEED_URL]
+    assert len(stored_articles) == 1 and len(stored_articles[0]) == 1
+
+
+@pytest.mark.parametrize(
+    "pipe_args, kept_entries",
+    [
+        (PipelineArgs(), 1),
+        (PipelineArgs(skip_stored_articles=True), 0),
+        (PipelineArgs(incremental=True), 0),
+    ],
+)
+def test_stored_articles_are_only_skipped_if_asked(
+    monkeypatch, tmp_path, pipe_args, kept_entries
+):
+    """
+    Tests that the entries already stored, and older than the watermark of their feed, are
+    kept by default, so repeating a request returns the same articles, and are only dropped
+    with skip_stored_articles or incremental.
+    """
+    entries = build_articles(FEED_URL, ["Machine Learning news"]).to_dict("records")
+    monkeypatch.setattr(
+        pipeline,
+        "find_stored_news_links",
+        lambda news_links: set(news_links),
+    )
+    watermark_filter = WatermarkEntryFilter(
+        SQLiteStateStore(str(tmp_path / "state.db")), filter_key=pipe_args.filter_key()
+    )
+    watermark_filter.update_watermark(
+        FEED_URL, entries[0]["publish_date"] + pd.Timedelta(minutes=1)
+    )
+
+    entry_filters = pipeline._build_entry_filters(pipe_args, watermark_filter)
+    for entry_filter in entry_filters:
+        entries = entry_filter.filter(FEED_URL, entries)
+
+    assert len(entries) == kept_entries
+
+
+def test_astream_yields_each_feed_before_the_summary(monkeypatch, stored_articles):
+    """
+    Tests that the articles of each feed are yielded as soon as the feed finishes, before the
+    next feed is extracted, and that the summary describes the articles stored.
+    """
+    other_feed_url = "https://example.org/feed"
+    feeds_extracted = list()
+
+    async def iter_feed_articles(
+        feed_urls, entry_filters=None, deadline=None, **kwargs
+    ):
+        for feed_url, titles in [
+            (FEED_URL, ["Machine Learning news", "AI news"]),
+            ("https://example.net/feed", None),
+            (other_feed_url, ["Deep Learning news"]),
+        ]:
+            feeds_extracted.append(feed_url)
+            if feed_url == other_feed_url:
+                deadline.mark_truncated(other_feed_url)
+
+            yield feed_url, None if titles is None else build_articles(feed_url, titles)
+
+    monkeypatch.setattr(pipeline, "aiter_feed_articles", iter_feed_articles)
+
+    async def stream() -> list[tuple[dict, int]]:
+        return [
+            (record, len(feeds_extracted))
+            async for record in pipeline.astream(deadline_seconds=30)
+        ]
+
+    records = asyncio.run(stream())
+
+    # Feeds extracted when each article was received
+    assert [(record["type"], feeds) for record, feeds in records[:-1]] == [
+        ("article", 1),
+        ("article", 1),
+        ("article", 3),
+    ]
+    assert [record["title"] for record, _ in records[:-1]] == [
+        "Machine Learning news",
+        "AI news",
+        "Deep Learning news",
+    ]
+    assert records[-1][0] == {
+        "type": "summary",
+        "total_articles": 3,
+        "partial": True,
+        "truncated_sources": [other_feed_url],
+        "stored": True,
+    }
+    assert len(stored_articles) == 1 and len(stored_articles[0]) == 3
@@ -0,0 +1,118 @@
+import json
+import shutil
+import subprocess
+import sys
+
+import httpx
+import pytest
+
+from news_extraction_pipeline.benchmarks.fake_news_site import (
+    FakeNewsSite,
+    build_article,
+    generate_certificate,
+)
+from news_extraction_pipeline.benchmarks.pipeline_benchmark import percentile
+from news_extraction_pipeline.extractors.image_url.image_url_extractors import (
+    AINEWSImageExtractor,
+)
+
+
+def test_percentile_interpolates_between_ranks():
+    """
+    Tests the percentiles of the values measured, and that no values give None.
+    """
+    assert percentile([3.0, 1.0, 2.0, 4.0], 50) == 2.5
+    assert percentile([1.0, 2.0], 95) == pytest.approx(1.95)
+    assert percentile([5.0], 95) == 5.0
+    assert percentile([], 50) is None
+
+
+def test_article_image_is_in_the_last_widget_container():
+    """
+    Tests that, with several AI-News widget containers, the 800px image is only in the last
+    one, and the AI-News extractor still finds it.
+    """
+    base_url = AINEWSImageExtractor().base_feed_url
+    article_path = "/ai-news/articles/0/"
+    html = build_article(
+        article_path, base_url, 5_000, open_graph=False, widget_containers=3
+    )
+
+    widgets = html.split(b'<div class="elementor-widget-container">')[1:]
+    assert len(widgets) == 3
+    assert [b'width="800"' in widget for widget in widgets] == [False, False, True]
+    assert (
+        AINEWSImageExtractor().extract_from_html(f"{base_url}{article_path}", html)
+        == f"{base_url}/images/ai-news/articles/0.jpg"
+    )
+
+
+@pytest.mark.skipif(shutil.which("openssl") is None, reason="openssl is not installed")
+def test_fake_site_answers_conditional_feed_requests(tmp_path):
+    """
+    Tests that the feeds are sent with their validators, and answered with a 304 when the
+    request matches them.
+    """
+    cert_file, key_file = generate_certificate(str(tmp_path))
+
+    with FakeNewsSite(cert_file, key_file, entries_per_feed=2) as site:
+        feed_url = site.feed_urls["MIT_NEWS_FEED_URL"]
+
+        with httpx.Client(verify=cert_file) as client:
+            response = client.get(feed_url)
+            etag, modified = response.headers["ETag"], response.headers["Last-Modified"]
+
+            assert response.status_code == 200 and response.content
+            assert (
+                client.get(feed_url, headers={"If-None-Match": etag}).status_code == 304
+            )
+            assert (
+                client.get(
+                    feed_url, headers={"If-Modified-Since": modified}
+                ).status_code
+                == 304
+            )
+            assert (
+                client.get(
+                    feed_url,
+                    headers={"If-None-Match": '"other"', "If-Modified-Since": modified},
+                ).status_code
+                == 200
+            )
+
+
+@pytest.mark.skipif(shutil.which("openssl") is None, reason="openssl is not installed")
+def test_benchmark_runs_pipeline_against_fake_site(tmp_path):
+    """
+    Tests that the pipeline runs end to end against the fake news site, extracting all the
+    articles of its feeds. Run in a new interpreter, as the benchmark loads the settings.
+    """
+    output = tmp_path / "benchmark.json"
+    completed_process = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "news_extraction_pipeline.benchmarks.pipeline_benchmark",
+            "--runs",
+            "2",
+            "--warmup-runs",
+            "0",
+            "--entries",
+            "3",
+            "--page-kb",
+            "5",
+            "--output",
+            str(output),
+        ],
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert completed_process.returncode == 0, completed_process.stderr
+
+    results = json.loads(output.read_text())["results"]
+    assert results["runs"] == 2
+    assert results["articles"] == 2 * 2 * 3  # Runs * feeds * entries
+    assert results["articles_per_second"] > 0
+    assert results["peak_rss_bytes"] > 0
+    assert results["step_seconds"]["extract_articles"]["p95"] > 0
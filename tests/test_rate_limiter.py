@@ -0,0 +1,69 @@
+import asyncio
+import pytest
+from utils.http.rate_limiter import AdaptiveRateLimiter
+
+URL = "https://example.com/article"
+HOST = "example.com"
+
+
+def send_requests(rate_limiter: AdaptiveRateLimiter, status_code: int, n: int) -> None:
+    for _ in range(n):
+        with rate_limiter.limit(URL) as permit:
+            permit.record(status_code)
+
+
+def test_concurrency_grows_with_successful_responses():
+    """
+    Tests that the concurrency limit grows additively up to its maximum while the host responds
+    quickly and successfully.
+    """
+    rate_limiter = AdaptiveRateLimiter(
+        max_rate_per_second=1000, burst=100, max_concurrency=4
+    )
+
+    send_requests(rate_limiter, 200, 20)
+
+    metrics = rate_limiter.metrics()[HOST]
+    assert metrics["concurrency_limit"] == 4
+    assert metrics["requests"] == 20
+    assert metrics["in_flight"] == 0
+
+
+def test_throttling_responses_decrease_limits():
+    """
+    Tests that a 429 response halves the concurrency limit and the rate, and is counted.
+    """
+    rate_limiter = AdaptiveRateLimiter(
+        max_rate_per_second=1000, burst=100, max_concurrency=4
+    )
+    send_requests(rate_limiter, 200, 20)
+
+    send_requests(rate_limiter, 429, 1)
+
+    metrics = rate_limiter.metrics()[HOST]
+    assert metrics["concurrency_limit"] == 2
+    assert metrics["rate_per_second"] == 500
+    assert metrics["throttle_events"] == 1
+
+
+def test_rate_is_limited_by_token_bucket():
+    """
+    Tests that once the burst is spent, requests are paced at the allowed rate.
+    """
+    rate_limiter = AdaptiveRateLimiter(max_rate_per_second=20, burst=1)
+
+    async def send_async_requests():
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+        for _ in range(3):
+            async with rate_limiter.alimit(URL) as permit:
+                permit.record(200)
+        return loop.time() - started_at
+
+    # The first request uses the burst, the next two wait 1 / 20 seconds each
+    assert asyncio.run(send_async_requests()) >= 0.09
+
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        AdaptiveRateLimiter(max_concurrency=0)
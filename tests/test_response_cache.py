@@ -0,0 +1,70 @@
+import os
+import pytest
+from utils.http import cache as cache_module
+from utils.http.cache import DiskResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake_clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, "time", fake_clock.time)
+    return fake_clock
+
+
+def test_hit_and_miss(tmp_path, clock):
+    """
+    Tests that stored bodies are returned as stored, and that hits and misses are counted.
+    """
+    cache = DiskResponseCache(str(tmp_path / "cache.db"), 60, 1024 * 1024)
+    cache.set("https://example.com/a", b"<html>a</html>")
+
+    assert cache.get("https://example.com/a") == b"<html>a</html>"
+    assert cache.get("https://example.com/b") is None
+
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"]) == (1, 1, 1)
+
+
+def test_expired_responses_are_misses(tmp_path, clock):
+    """
+    Tests that a response is no longer returned once its TTL has passed.
+    """
+    cache = DiskResponseCache(str(tmp_path / "cache.db"), 60, 1024 * 1024)
+    cache.set("https://example.com/a", b"<html>a</html>")
+
+    clock.now += 61
+
+    assert cache.get("https://example.com/a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_responses_are_evicted(tmp_path, clock):
+    """
+    Tests that the least recently used response is evicted when the cache exceeds its size.
+    """
+    # Random bytes are not compressible, so each body takes ~400 bytes in the cache
+    bodies = {f"https://example.com/{page}": os.urandom(400) for page in "abc"}
+    cache = DiskResponseCache(str(tmp_path / "cache.db"), 60, 1000)
+
+    for url in ["https://example.com/a", "https://example.com/b"]:
+        clock.now += 1
+        cache.set(url, bodies[url])
+
+    clock.now += 1
+    cache.get("https://example.com/a")  # b becomes the least recently used
+
+    clock.now += 1
+    cache.set("https://example.com/c", bodies["https://example.com/c"])
+
+    assert cache.get("https://example.com/b") is None
+    assert cache.get("https://example.com/a") == bodies["https://example.com/a"]
+    assert cache.get("https://example.com/c") == bodies["https://example.com/c"]
+    assert cache.stats()["evictions"] == 1
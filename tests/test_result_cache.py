@@ -0,0 +1,147 @@
+import asyncio
+import pytest
+from news_extraction_pipeline.schemas import PipelineArgs
+from utils.result_cache import AsyncResultCache
+
+
+def test_concurrent_identical_calls_are_coalesced():
+    """
+    Tests that concurrent calls with the same key run the computation once, and that later
+    calls are served from the cache.
+    """
+    executions = list()
+
+    async def compute() -> str:
+        executions.append(1)
+        await asyncio.sleep(0.01)
+        return "articles"
+
+    async def run() -> tuple[list[str], dict[str, int]]:
+        result_cache = AsyncResultCache(ttl_seconds=60)
+        results = await asyncio.gather(
+            *(result_cache.get_or_compute("key", compute) for _ in range(5))
+        )
+        results.append(await result_cache.get_or_compute("key", compute))
+        return results, result_cache.stats()
+
+    results, stats = asyncio.run(run())
+
+    assert results == ["articles"] * 6
+    assert len(executions) == 1
+    assert stats == {
+        "entries": 1,
+        "in_flight": 0,
+        "hits": 1,
+        "misses": 1,
+        "coalesced": 4,
+    }
+
+
+def test_errors_and_rejected_results_are_not_cached():
+    """
+    Tests that errors are raised to the caller without being cached, and that results rejected
+    by should_cache are computed again.
+    """
+
+    async def fail() -> None:
+        raise ValueError("Pipeline failed")
+
+    async def compute() -> str:
+        return "partial articles"
+
+    async def run() -> dict[str, int]:
+        result_cache = AsyncResultCache(ttl_seconds=60)
+        with pytest.raises(ValueError):
+            await result_cache.get_or_compute("key", fail)
+
+        for _ in range(2):
+            await result_cache.get_or_compute(
+                "key", compute, should_cache=lambda result: False
+            )
+
+        return result_cache.stats()
+
+    assert asyncio.run(run())["misses"] == 3
+
+
+def test_computation_is_cancelled_once_no_caller_waits():
+    """
+    Tests that the shared computation keeps running while a caller waits for it, and is
+    cancelled once every caller has been cancelled.
+    """
+    cancelled = list()
+
+    async def compute() -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+        return "articles"
+
+    async def run() -> dict[str, int]:
+        result_cache = AsyncResultCache(ttl_seconds=60)
+        callers = [
+            asyncio.ensure_future(result_cache.get_or_compute("key", compute))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.01)
+
+        callers[0].cancel()
+        await asyncio.sleep(0.01)
+        assert not cancelled
+
+        callers[1].cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.01)
+
+        return result_cache.stats()
+
+    assert asyncio.run(run())["in_flight"] == 0
+    assert cancelled == [1]
+
+
+def test_calls_with_different_flight_keys_are_not_coalesced():
+    """
+    Tests that calls sharing the key but not the flight key compute their results separately,
+    and that both share the result cached.
+    """
+    executions = list()
+
+    async def compute() -> str:
+        executions.append(1)
+        await asyncio.sleep(0.01)
+        return "articles"
+
+    async def run() -> dict[str, int]:
+        result_cache = AsyncResultCache(ttl_seconds=60)
+        await asyncio.gather(
+            result_cache.get_or_compute("key", compute, flight_key="key:None"),
+            result_cache.get_or_compute("key", compute, flight_key="key:5.0"),
+        )
+        await result_cache.get_or_compute("key", compute, flight_key="key:5.0")
+
+        return result_cache.stats()
+
+    stats = asyncio.run(run())
+
+    assert len(executions) == 2
+    assert stats["misses"] == 2 and stats["hits"] == 1 and stats["entries"] == 1
+
+
+def test_pipeline_args_cache_key_is_normalized():
+    """
+    Tests that the order of the keywords and the deadline do not change the cache key.
+    """
+    args = PipelineArgs(case_sen_search_kw=["AI", "A.I."], case_insen_search_kw=["LLM"])
+    same_args = PipelineArgs(
+        case_sen_search_kw=["A.I.", "AI", "AI"],
+        case_insen_search_kw=["LLM"],
+        deadline_seconds=30,
+    )
+    other_args = PipelineArgs(
+        case_sen_search_kw=["AI", "A.I."], case_insen_search_kw=["LLM"], max_days_old=5
+    )
+
+    assert args.cache_key() == same_args.cache_key()
+    assert args.cache_key() != other_args.cache_key()
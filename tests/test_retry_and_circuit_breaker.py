@@ -0,0 +1,103 @@
+import httpx
+import pytest
+from database.state import JSONFileStateStore
+from utils.deadline import Deadline
+from utils.http import circuit_breaker as circuit_breaker_module
+from utils.http.circuit_breaker import CircuitBreaker
+from utils.http.retry import RetryPolicy
+
+FEED_URL = "https://example.com/feed"
+
+
+def build_status_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", FEED_URL)
+    return httpx.HTTPStatusError(
+        "error", request=request, response=httpx.Response(status_code, request=request)
+    )
+
+
+def test_retry_policy_retries_transient_errors():
+    """
+    Tests that transient errors are retried until the operation succeeds.
+    """
+    errors = [httpx.ConnectTimeout("timeout"), build_status_error(503)]
+
+    def operation() -> str:
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    retry_policy = RetryPolicy(max_attempts=3, base_delay_seconds=0)
+
+    assert retry_policy.run(operation) == "ok"
+
+
+def test_retry_policy_does_not_retry_permanent_errors():
+    """
+    Tests that non transient errors are raised at the first attempt.
+    """
+    attempts = list()
+
+    def operation() -> None:
+        attempts.append(1)
+        raise build_status_error(404)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        RetryPolicy(max_attempts=3, base_delay_seconds=0).run(operation)
+
+    assert len(attempts) == 1
+
+
+def test_retry_policy_stops_at_the_deadline(monkeypatch):
+    """
+    Tests that the wait before a retry is cut to the time left in the deadline, and that no
+    attempt is started once it has expired.
+    """
+    attempts = list()
+
+    def operation() -> None:
+        attempts.append(1)
+        raise build_status_error(503)
+
+    retry_policy = RetryPolicy(max_attempts=5)
+    monkeypatch.setattr(retry_policy, "get_delay", lambda attempt: 10)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        retry_policy.run(operation, deadline=Deadline(budget_seconds=0.2))
+
+    assert len(attempts) == 1
+
+
+def test_retry_policy_delays_are_bounded():
+    retry_policy = RetryPolicy(base_delay_seconds=1, max_delay_seconds=4)
+
+    assert all(0 <= retry_policy.get_delay(attempt) <= 4 for attempt in range(10))
+
+
+def test_circuit_breaker_opens_and_recovers(tmp_path, monkeypatch):
+    """
+    Tests that the circuit opens after the failure threshold, allows a trial request after the
+    cool-down, and closes once it succeeds. The state is shared through the StateStore.
+    """
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker_module.time, "time", lambda: now[0])
+    state_store = JSONFileStateStore(str(tmp_path / "state.json"))
+    circuit_breaker = CircuitBreaker(
+        state_store, "feeds", failure_threshold=2, cooldown_seconds=60
+    )
+
+    circuit_breaker.record_failure(FEED_URL)
+    assert circuit_breaker.allow_request(FEED_URL)
+    circuit_breaker.record_failure(FEED_URL)
+
+    # A new instance, as the next run would have, reads the same state
+    next_run_circuit_breaker = CircuitBreaker(
+        state_store, "feeds", failure_threshold=2, cooldown_seconds=60
+    )
+    assert not next_run_circuit_breaker.allow_request(FEED_URL)
+
+    now[0] += 61
+    assert next_run_circuit_breaker.allow_request(FEED_URL)
+    next_run_circuit_breaker.record_success(FEED_URL)
+
+    assert state_store.get("feeds", FEED_URL) is None
@@ -0,0 +1,43 @@
+import os
+import pytest
+from news_extraction_pipeline.config import get_news_config
+from utils.startup_profiler import profile_imports
+
+API_MODULE = "news_extraction_pipeline.app.main"
+
+# Budget to import the API on a cold start, only checked where it is set (e.g. a CI runner of
+# known speed), as wall-clock times vary too much between machines. Around 1.4s are expected,
+# mostly fastapi and pandas
+STARTUP_IMPORT_BUDGET_SECONDS = os.environ.get("STARTUP_IMPORT_BUDGET_SECONDS")
+
+
+def test_api_import_does_not_import_gcp_clients():
+    """
+    Tests that importing the API, as Cloud Run does on a cold start, does not import the GCP
+    client libraries, which are only needed on first use.
+    """
+    profile = profile_imports(API_MODULE)
+
+    assert profile.imported_modules("google.cloud") == [], profile.report()
+
+
+@pytest.mark.skipif(
+    STARTUP_IMPORT_BUDGET_SECONDS is None,
+    reason="STARTUP_IMPORT_BUDGET_SECONDS is not set",
+)
+def test_api_import_time_is_within_budget():
+    """
+    Tests that importing the API on a cold start stays within STARTUP_IMPORT_BUDGET_SECONDS.
+    """
+    profile = profile_imports(API_MODULE)
+
+    assert profile.total_seconds < float(STARTUP_IMPORT_BUDGET_SECONDS), (
+        profile.report()
+    )
+
+
+def test_news_config_is_shared():
+    """
+    Tests that the settings are read once and shared by the whole process.
+    """
+    assert get_news_config() is get_news_config()
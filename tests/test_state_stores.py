@@ -0,0 +1,44 @@
+import pytest
+from database.state import JSONFileStateStore, SQLiteStateStore
+
+
+@pytest.fixture(params=["sqlite", "json"])
+def state_store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteStateStore(str(tmp_path / "state.db"))
+
+    return JSONFileStateStore(str(tmp_path / "state.json"))
+
+
+def test_set_and_get_value(state_store):
+    """
+    Tests that a stored value is retrieved under the same namespace and key only.
+    """
+    state_store.set("feed_validators", "https://example.com/feed", {"etag": '"v1"'})
+
+    assert state_store.get("feed_validators", "https://example.com/feed") == {
+        "etag": '"v1"'
+    }
+    assert state_store.get("feed_validators", "https://example.com/other") is None
+    assert state_store.get("other_namespace", "https://example.com/feed") is None
+
+
+def test_set_replaces_previous_value(state_store):
+    """
+    Tests that setting an existing key replaces its value.
+    """
+    state_store.set("feed_validators", "feed", {"etag": '"v1"'})
+    state_store.set("feed_validators", "feed", {"etag": '"v2"'})
+
+    assert state_store.get("feed_validators", "feed") == {"etag": '"v2"'}
+
+
+def test_delete_value(state_store):
+    """
+    Tests that a deleted value is no longer retrieved, and that deleting a missing key does not fail.
+    """
+    state_store.set("feed_validators", "feed", {"etag": '"v1"'})
+    state_store.delete("feed_validators", "feed")
+    state_store.delete("feed_validators", "missing_feed")
+
+    assert state_store.get("feed_validators", "feed") is None
@@ -0,0 +1,96 @@
+import json
+import pytest
+from loguru import logger
+from utils.step_runner import StepRunner
+
+
+def test_steps_record_time_and_rows():
+    """
+    Tests that each step records its wall and CPU time and its rows in and out, in the order
+    the steps were run.
+    """
+    step_runner = StepRunner("run")
+
+    with step_runner.step("extract") as step:
+        step.rows_out = 10
+    with step_runner.step("filter", rows_in=10) as step:
+        sum(range(100_000))
+        step.rows_out = 4
+
+    report = step_runner.report()
+
+    assert report["run"] == "run"
+    assert [step["name"] for step in report["steps"]] == ["extract", "filter"]
+    assert report["steps"][1]["rows_in"] == 10
+    assert report["steps"][1]["rows_out"] == 4
+    assert report["steps"][1]["wall_seconds"] > 0
+    assert report["steps"][1]["cpu_seconds"] >= 0
+    assert report["steps"][1]["peak_memory_delta_bytes"] is None
+    assert report["total_wall_seconds"] >= report["steps"][1]["wall_seconds"]
+
+
+def test_memory_is_traced_on_demand():
+    """
+    Tests that, with memory tracing, a step allocating memory reports a peak delta of at
+    least the memory it allocated.
+    """
+    step_runner = StepRunner("run", trace_memory=True)
+
+    with step_runner.step("allocate"):
+        data = bytearray(1_000_000)
+        del data
+
+    assert step_runner.report()["steps"][0]["peak_memory_delta_bytes"] >= 1_000_000
+
+
+def test_overlapping_steps_do_not_trace_memory_at_once():
+    """
+    Tests that a step started while another run is tracing the memory does not record it, and
+    does not stop the tracing of the other run.
+    """
+    tracing_run = StepRunner("tracing", trace_memory=True)
+    other_run = StepRunner("other", trace_memory=True)
+
+    with tracing_run.step("allocate"):
+        with other_run.step("overlapping"):
+            pass
+        data = bytearray(1_000_000)
+        del data
+
+    with other_run.step("after"):
+        pass
+
+    assert tracing_run.report()["steps"][0]["peak_memory_delta_bytes"] >= 1_000_000
+    other_steps = other_run.report()["steps"]
+    assert other_steps[0]["peak_memory_delta_bytes"] is None
+    assert other_steps[1]["peak_memory_delta_bytes"] is not None
+
+
+def test_failed_step_is_recorded_and_raised():
+    step_runner = StepRunner("run")
+
+    with pytest.raises(RuntimeError):
+        with step_runner.step("store"):
+            raise RuntimeError("BigQuery unavailable")
+
+    assert step_runner.report()["steps"][0]["failed"] is True
+
+
+def test_report_is_logged_as_single_json_record():
+    """
+    Tests that the report is logged as one JSON record.
+    """
+    messages = list()
+    handler_id = logger.add(messages.append, format="{message}")
+
+    try:
+        step_runner = StepRunner("run")
+        with step_runner.step("extract"):
+            pass
+        report = step_runner.log_report()
+
+    finally:
+        logger.remove(handler_id)
+
+    assert len(messages) == 1
+    assert json.loads(messages[0]) == {"event": "run_report", **report}
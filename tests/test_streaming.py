@@ -0,0 +1,101 @@
+import asyncio
+import re
+import time
+
+from news_extraction_pipeline.extractors.image_url.image_url_extractors import (
+    AINEWSImageExtractor,
+    MITImageExtractor,
+)
+from utils.http.streaming import (
+    STOP_PATTERN_OVERLAP_BYTES,
+    aread_until_match,
+    read_until_match,
+)
+
+HEAD_END = re.compile(rb"</head>")
+
+
+class CountingPattern:
+    """
+    Wraps a pattern, counting the bytes it is searched over
+    """
+
+    def __init__(self, pattern: re.Pattern):
+        self.pattern = pattern
+        self.bytes_searched = 0
+
+    def search(self, body, pos: int = 0):
+        self.bytes_searched += len(body) - pos
+        return self.pattern.search(body, pos)
+
+
+def split_in_chunks(content: bytes, chunk_size: int) -> list[bytes]:
+    return [
+        content[start : start + chunk_size]
+        for start in range(0, len(content), chunk_size)
+    ]
+
+
+def test_match_split_between_chunks_stops_reading():
+    """
+    Tests that a match split between two chunks is found, and that the chunks after it are
+    not read.
+    """
+    chunks = [b"<html><head><title>News</ti", b"tle></he", b"ad><body>", b"rest"]
+
+    assert read_until_match(iter(chunks), HEAD_END) == b"".join(chunks[:3])
+
+
+def test_each_chunk_is_searched_once():
+    """
+    Tests that the bytes searched grow linearly with the body, instead of searching the whole
+    body again on every chunk.
+    """
+    body = b"x" * 1_000_000 + b"</head>"
+    pattern = CountingPattern(HEAD_END)
+
+    assert read_until_match(split_in_chunks(body, 16 * 1024), pattern) == body
+    assert pattern.bytes_searched < len(body) + 70 * STOP_PATTERN_OVERLAP_BYTES
+
+
+def test_max_bytes_limits_the_body_read():
+    """
+    Tests that the body is cut at max_bytes if the pattern never matches, also asynchronously.
+    """
+    chunks = [b"x" * 1000] * 10
+
+    async def achunks():
+        for chunk in chunks:
+            yield chunk
+
+    assert len(read_until_match(chunks, HEAD_END, max_bytes=2500)) == 2500
+    assert len(asyncio.run(aread_until_match(achunks(), HEAD_END, max_bytes=2500))) == (
+        2500
+    )
+    assert len(read_until_match(chunks, None)) == 10_000
+
+
+def test_site_patterns_search_in_linear_time():
+    """
+    Tests that the site specific patterns do not backtrack over pages full of containers
+    without the image, and still match the image they look for.
+    """
+    for extractor, container, image in [
+        (
+            AINEWSImageExtractor,
+            b'<div class="elementor-widget-container"><p>text</p></div>',
+            b'<div class="elementor-widget-container"><img src="a.jpg" width="800"></div>',
+        ),
+        (
+            MITImageExtractor,
+            b'<div class="news-article--media--image--file"><p>text</p></div>',
+            b'<div class="news-article--media--image--file"><img data-src="/a.jpg"></div>',
+        ),
+    ]:
+        page = container * 20_000
+
+        start = time.perf_counter()
+        assert extractor().stop_reading_pattern.search(page) is None
+        assert time.perf_counter() - start < 1
+
+        assert extractor().stop_reading_pattern.search(page + image)
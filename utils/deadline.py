@@ -0,0 +1,98 @@
+import copy
+import threading
+import time
+from typing import Optional
+
+
+class Deadline:
+    """
+    Time budget of a request, shared by all the stages that work on it. Each stage asks for the
+    time remaining to bound its own waits, and gives up on its remaining work once the deadline
+    has expired, marking the sources it could not complete as truncated.
+
+    A Deadline without budget never expires, so stages can always receive one.
+
+    Usage:
+        deadline = Deadline(budget_seconds=30)
+        response = requests.get(url, timeout=deadline.timeout(default=60))
+        if deadline.expired():
+            deadline.mark_truncated(feed_url)
+    """
+
+    def __init__(self, budget_seconds: Optional[float] = None):
+        """
+        Args:
+            budget_seconds: Optional[float] -> Seconds available from now. None means no limit
+        """
+        if budget_seconds is not None and budget_seconds <= 0:
+            raise ValueError("budget_seconds must be greater than zero")
+
+        self.__expires_at: Optional[float] = (
+            None if budget_seconds is None else time.monotonic() + budget_seconds
+        )
+        self.__truncated_sources: set[str] = set()
+        self.__lock = threading.Lock()
+
+    @property
+    def truncated_sources(self) -> list[str]:
+        with self.__lock:
+            return sorted(self.__truncated_sources)
+
+    def remaining(self) -> Optional[float]:
+        """
+        Returns:
+            Optional[float] -> Seconds left (never negative), None if there is no limit
+        """
+        if self.__expires_at is None:
+            return None
+
+        return max(0.0, self.__expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() == 0
+
+    def timeout(self, default: Optional[float] = None) -> Optional[float]:
+        """
+        Gets the timeout for a single wait, bounded by the time remaining
+
+        Args:
+            default: Optional[float] -> Timeout used when the deadline allows a longer one
+
+        Returns:
+            Optional[float] -> The lower of default and the time remaining
+        """
+        remaining = self.remaining()
+
+        if remaining is None or default is None:
+            return default if remaining is None else remaining
+
+        return min(default, remaining)
+
+    def with_reserve(self, reserve_seconds: float) -> "Deadline":
+        """
+        Gets a deadline expiring reserve_seconds earlier, so the time reserved is left for the
+        stages run after it (e.g. storing the partial results). Truncated sources are shared
+
+        Args:
+            reserve_seconds: float -> Seconds reserved at the end of the budget
+
+        Returns:
+            Deadline -> The earlier deadline
+        """
+        # A shallow copy shares the truncated sources and their lock
+        earlier_deadline = copy.copy(self)
+
+        if self.__expires_at is not None:
+            earlier_deadline.__expires_at = self.__expires_at - reserve_seconds
+
+        return earlier_deadline
+
+    def mark_truncated(self, source: str) -> None:
+        """
+        Records that the work of a source was cut because the deadline expired
+
+        Args:
+            source: str -> Source cut (e.g. a feed url)
+        """
+        with self.__lock:
+            self.__truncated_sources.add(source)
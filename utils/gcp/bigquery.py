@@ -1,8 +1,33 @@
-from google.cloud import bigquery
+import io
+import json
+from functools import lru_cache
 from loguru import logger
+from typing import TYPE_CHECKING, Literal, Optional
 
+if TYPE_CHECKING:
+    from google.cloud import bigquery
 
-client = bigquery.Client()
+# Limits of each streaming insert request: BigQuery rejects requests over 10 MB, and
+# recommends at most 500 rows per request
+STREAMING_INSERT_MAX_ROWS = 500
+STREAMING_INSERT_MAX_BYTES = 9 * 1024 * 1024
+
+# Formats of the files sent to the load jobs, by their name in the settings
+LOAD_SOURCE_FORMATS = {"ndjson": "NEWLINE_DELIMITED_JSON", "parquet": "PARQUET"}
+
+
+@lru_cache(maxsize=1)
+def get_client() -> "bigquery.Client":
+    """
+    Gets the BigQuery client, created on the first call and shared by the whole process.
+    The google-cloud-bigquery import is also deferred, as it is slow
+
+    Returns:
+        bigquery.Client -> The client
+    """
+    from google.cloud import bigquery
+
+    return bigquery.Client()
 
 
 def dataset_exists(dataset_name: str, project_id: str) -> bool:
@@ -27,7 +52,7 @@ def dataset_exists(dataset_name: str, project_id: str) -> bool:
     dataset_id = f"{project_id}.{dataset_name}"
 
     try:
-        client.get_dataset(dataset_id)
+        get_client().get_dataset(dataset_id)
         return True
     except Exception as e:
         if "Not found" in str(e):
@@ -63,7 +88,7 @@ def table_exists(table_name: str, dataset_name: str, project_id: str) -> bool:
     table_id = f"{project_id}.{dataset_name}.{table_name}"
 
     try:
-        client.get_table(table_id)
+        get_client().get_table(table_id)
         return True
     except Exception as e:
         if "Not found" in str(e):
@@ -84,6 +109,8 @@ def create_dataset(dataset_name: str, dataset_location: str, project_id: str) ->
     Returns:
         None
     """
+    from google.cloud import bigquery
+
     # dataset_exists already has error handlers for its parameters
     if dataset_exists(dataset_name, project_id):
         raise ValueError(
@@ -96,7 +123,7 @@ def create_dataset(dataset_name: str, dataset_location: str, project_id: str) ->
     dataset.location = dataset_location
 
     try:
-        client.create_dataset(dataset)
+        get_client().create_dataset(dataset)
         logger.info(f"Dataset {dataset_name} created.")
     except Exception as e:
         logger.info(f"Error creating the dataset: {e}")
@@ -127,6 +154,8 @@ def create_table(
     Returns:
         None
     """
+    from google.cloud import bigquery
+
     # table_exists already has error handlers for its parameters
     if table_exists(table_name, dataset_name, project_id):
         raise ValueError(
@@ -143,7 +172,7 @@ def create_table(
     table = bigquery.Table(table_id, schema=schema)
 
     try:
-        client.create_table(table)
+        get_client().create_table(table)
         logger.info(f"Table {table_name} created.")
     except Exception as e:
         logger.info(f"Error creating the table: {e}")
@@ -169,7 +198,7 @@ def delete_dataset(dataset_name: str, project_id: str) -> None:
     dataset_id = f"{project_id}.{dataset_name}"
 
     try:
-        client.delete_dataset(dataset_id, delete_contents=True)
+        get_client().delete_dataset(dataset_id, delete_contents=True)
         logger.info(f"Dataset {dataset_name} deleted.")
     except Exception as e:
         raise ValueError(f"Error deleting the dataset: {e}")
@@ -196,28 +225,43 @@ def delete_table(table_name: str, dataset_name: str, project_id: str) -> None:
     table_id = f"{project_id}.{dataset_name}.{table_name}"
 
     try:
-        client.delete_table(table_id)
+        get_client().delete_table(table_id)
         logger.info(f"Table {table_name} deleted.")
     except Exception as e:
         raise ValueError(f"Error deleting the table: {e}")
 
 
-def query_data(query: str) -> list:
+def query_data(
+    query: str,
+    query_parameters: Optional[
+        list["bigquery.ScalarQueryParameter | bigquery.ArrayQueryParameter"]
+    ] = None,
+    timeout: Optional[float] = None,
+) -> list:
     """
     Query data from a table in BigQuery.
 
     Args:
         query (str): The SQL query to execute.
+        query_parameters (Optional[list]): Named parameters referenced in the query
+                as @parameter_name. Ex:
+
+                [bigquery.ArrayQueryParameter("ids", "STRING", ["id_1", "id_2"])]
+        timeout (Optional[float]): Seconds to wait for the results. None waits indefinitely.
 
     Returns:
         list: A list of rows returned by the query.
     """
+    from google.cloud import bigquery
+
     if not isinstance(query, str) or query == "":
         raise ValueError("The query must be a non-empty string.")
 
+    job_config = bigquery.QueryJobConfig(query_parameters=query_parameters or [])
+
     try:
-        query_job = client.query(query)
-        results = query_job.result()
+        query_job = get_client().query(query, job_config=job_config, timeout=timeout)
+        results = query_job.result(timeout=timeout)
         return results
 
     except Exception as e:
@@ -225,7 +269,11 @@ def query_data(query: str) -> list:
 
 
 def insert_rows(
-    table_name: str, dataset_name: str, project_id: str, rows: list[dict]
+    table_name: str,
+    dataset_name: str,
+    project_id: str,
+    rows: list[dict],
+    timeout: Optional[float] = None,
 ) -> None:
     """
     Insert rows into a table in BigQuery.
@@ -250,6 +298,7 @@ def insert_rows(
                             "column_name4": "2023-10-02T00:00:00Z"
                         }
                     ]
+        timeout (Optional[float]): Seconds to wait for the insertion. None waits indefinitely.
 
     Returns:
         None
@@ -263,14 +312,162 @@ def insert_rows(
     table_id = f"{project_id}.{dataset_name}.{table_name}"
 
     try:
-        errors = client.insert_rows_json(table_id, rows)
-        if errors:
-            raise ValueError(f"Errors occurred while inserting rows: {errors}")
+        # Each request stays within the limits of the streaming API
+        for batch in split_rows(
+            rows, STREAMING_INSERT_MAX_ROWS, STREAMING_INSERT_MAX_BYTES
+        ):
+            errors = get_client().insert_rows_json(table_id, batch, timeout=timeout)
+            if errors:
+                raise ValueError(f"Errors occurred while inserting rows: {errors}")
         logger.info(f"Rows inserted into {table_name}.")
     except Exception as e:
         raise ValueError(f"Error inserting rows: {e}")
 
 
+def split_rows(rows: list[dict], max_rows: int, max_bytes: int) -> list[list[dict]]:
+    """
+    Splits rows into batches with at most max_rows rows and max_bytes bytes of JSON each.
+    A row bigger than max_bytes is sent in a batch of its own
+
+    Args:
+        rows (list[dict]): Rows to split.
+        max_rows (int): Maximum number of rows of each batch.
+        max_bytes (int): Maximum size of each batch, as JSON.
+
+    Returns:
+        list[list[dict]]: Batches of rows, in the original order.
+    """
+    if max_rows < 1 or max_bytes < 1:
+        raise ValueError("max_rows and max_bytes must be positive integers.")
+
+    batches, batch, batch_bytes = list(), list(), 0
+    for row in rows:
+        row_bytes = len(json.dumps(row, default=str).encode("utf-8")) + 1
+        if batch and (len(batch) >= max_rows or batch_bytes + row_bytes > max_bytes):
+            batches.append(batch)
+            batch, batch_bytes = list(), 0
+
+        batch.append(row)
+        batch_bytes += row_bytes
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+
+def serialize_rows(
+    rows: list[dict],
+    file_format: Literal["ndjson", "parquet"] = "ndjson",
+    schema: Optional[list["bigquery.SchemaField"]] = None,
+) -> bytes:
+    """
+    Serializes rows in memory to the format of a load job file.
+
+    Args:
+        rows (list[dict]): Rows to serialize.
+        file_format (str): ndjson (newline-delimited JSON) or parquet. Parquet needs pyarrow.
+        schema (Optional[list[bigquery.SchemaField]]): Schema of the destination table. With
+                parquet, its TIMESTAMP, DATETIME and DATE columns are converted from strings,
+                as parquet columns are loaded with their own type.
+
+    Returns:
+        bytes: Content of the file.
+    """
+    if file_format not in LOAD_SOURCE_FORMATS:
+        raise ValueError(
+            f"file_format must be one of {', '.join(LOAD_SOURCE_FORMATS.keys())}."
+        )
+
+    if file_format == "ndjson":
+        return "".join(f"{json.dumps(row, default=str)}\n" for row in rows).encode(
+            "utf-8"
+        )
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ValueError("pyarrow must be installed to load rows as parquet.")
+
+    import pandas as pd
+
+    df = pd.DataFrame(rows)
+    for field in schema or []:
+        if field.name not in df.columns:
+            continue
+        if field.field_type == "TIMESTAMP":
+            df[field.name] = pd.to_datetime(df[field.name], utc=True)
+        elif field.field_type == "DATETIME":
+            df[field.name] = pd.to_datetime(df[field.name])
+        elif field.field_type == "DATE":
+            df[field.name] = pd.to_datetime(df[field.name]).dt.date
+
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+
+    return buffer.getvalue()
+
+
+def load_rows(
+    table_name: str,
+    dataset_name: str,
+    project_id: str,
+    rows: list[dict],
+    file_format: Literal["ndjson", "parquet"] = "ndjson",
+    timeout: Optional[float] = None,
+) -> None:
+    """
+    Appends rows to a table in BigQuery with a single load job, serializing them in memory.
+    Unlike insert_rows (streaming API), load jobs are free, have no request-size limits and
+    leave no rows in a streaming buffer, so the table can be modified with DML right after.
+
+    Args:
+        table_name (str): The name of the table to load rows into.
+        dataset_name (str): The name of the dataset where the table is located.
+        project_id (str): The project ID where the dataset is located.
+        rows (list): A list of dictionaries representing the rows to load, as in insert_rows.
+        file_format (str): Format of the file loaded, ndjson or parquet. Parquet needs pyarrow.
+        timeout (Optional[float]): Seconds to wait for the upload and for the job to finish.
+                None waits indefinitely.
+
+    Returns:
+        None
+    """
+    from google.cloud import bigquery
+
+    # table_exists already has error handlers for its parameters
+    if not table_exists(table_name, dataset_name, project_id):
+        raise ValueError(
+            f"Table {table_name} does not exist in dataset {dataset_name}."
+        )
+
+    if not rows:
+        return
+
+    table_id = f"{project_id}.{dataset_name}.{table_name}"
+
+    try:
+        schema = None
+        if file_format == "parquet":
+            schema = get_client().get_table(table_id).schema
+
+        content = serialize_rows(rows, file_format, schema)
+
+        job_config = bigquery.LoadJobConfig(
+            source_format=LOAD_SOURCE_FORMATS[file_format],
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+        )
+        load_job = get_client().load_table_from_file(
+            io.BytesIO(content), table_id, job_config=job_config, timeout=timeout
+        )
+        load_job.result(timeout=timeout)
+        logger.info(
+            f"{len(rows)} rows loaded into {table_name} ({len(content)} bytes of {file_format})."
+        )
+    except Exception as e:
+        raise ValueError(f"Error loading rows: {e}")
+
+
 def update_row(
     table_name: str,
     dataset_name: str,
@@ -314,7 +511,7 @@ def update_row(
             SET {", ".join([f"{key} = '{value}'" for key, value in update_data.items()])}
             WHERE {primary_key_column_name} = '{row_id}'
         """
-        client.query(query).result()
+        get_client().query(query).result()
         logger.info(f"Row with ID {row_id} updated in {table_name}.")
     except Exception as e:
         raise ValueError(f"Error updating row: {e}")
@@ -1,11 +1,25 @@
-from google.cloud import storage
+from functools import lru_cache
 from loguru import logger
 import os
 from io import BytesIO
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from google.cloud import storage
 
-# Create a general storage client
-client = storage.Client()
+
+@lru_cache(maxsize=1)
+def get_client() -> "storage.Client":
+    """
+    Gets the general storage client, created on the first call and shared by the whole
+    process. The google-cloud-storage import is also deferred, as it is slow
+
+    Returns:
+        storage.Client -> The client
+    """
+    from google.cloud import storage
+
+    return storage.Client()
 
 
 def bucket_exists(bucket_name: str) -> bool:
@@ -21,7 +35,7 @@ def bucket_exists(bucket_name: str) -> bool:
     if not isinstance(bucket_name, str) or bucket_name == "":
         raise TypeError("The parameter bucket_name must be a not null string")
 
-    return client.bucket(bucket_name).exists()
+    return get_client().bucket(bucket_name).exists()
 
 
 def blob_exists(blob_name: str, bucket_name: str) -> bool:
@@ -48,7 +62,7 @@ def blob_exists(blob_name: str, bucket_name: str) -> bool:
         raise ValueError(f"The bucket {bucket_name} does not exists")
 
     # Get a list of objects inside the bucket
-    blobs = client.list_blobs(bucket_name)
+    blobs = get_client().list_blobs(bucket_name)
 
     blobs_name = [blob.name for blob in blobs]
 
@@ -58,7 +72,7 @@ def blob_exists(blob_name: str, bucket_name: str) -> bool:
     return False
 
 
-def create_bucket(bucket_name: str, location: str) -> storage.Client.bucket:
+def create_bucket(bucket_name: str, location: str) -> "storage.Bucket":
     """
     Create a new bucket on GCP
 
@@ -71,7 +85,7 @@ def create_bucket(bucket_name: str, location: str) -> storage.Client.bucket:
     if bucket_exists(bucket_name):
         raise ValueError(f"The bucket {bucket_name} already exists")
 
-    bucket = client.create_bucket(bucket_name, location=location)
+    bucket = get_client().create_bucket(bucket_name, location=location)
     logger.info(f"Bucket {bucket_name} successfully created!")
 
     return bucket
@@ -90,7 +104,7 @@ def delete_bucket(bucket_name: str) -> None:
     if not bucket_exists(bucket_name):
         raise ValueError(f"The bucket {bucket_name} does not exists")
 
-    bucket = client.get_bucket(bucket_name)
+    bucket = get_client().get_bucket(bucket_name)
     bucket.delete()
 
     logger.info(f"Bucket {bucket_name} deleted")
@@ -146,7 +160,7 @@ def upload_file(
         raise ValueError(f"The bucket {bucket_name} does not exists")
 
     # Get the bucket
-    bucket = client.bucket(bucket_name)
+    bucket = get_client().bucket(bucket_name)
 
     # Upload file in the bucket
     blob = bucket.blob(destination_file_path)
@@ -192,7 +206,7 @@ def upload_bytes(
             "blob_name and content_type parameters must be non-empty strings"
         )
 
-    bucket = client.bucket(bucket_name)
+    bucket = get_client().bucket(bucket_name)
     blob = bucket.blob(blob_name)
     blob.upload_from_file(BytesIO(bytes_data), content_type=content_type)
 
@@ -219,7 +233,7 @@ def delete_file(file_name: str, bucket_name: str) -> None:
             f"The file {file_name} does not exist in the bucket {bucket_name}"
         )
 
-    bucket = client.bucket(bucket_name)
+    bucket = get_client().bucket(bucket_name)
     blob = bucket.blob(file_name)
     blob.delete()
     logger.info(f"The file {file_name} was deleted successfully")
@@ -249,7 +263,7 @@ def download_file(gcs_file_path: str, local_file_path: str, bucket_name: str) ->
         raise ValueError(f"The path {file_path} does not exists")
 
     # Get the bucket and the file
-    bucket = client.bucket(bucket_name)
+    bucket = get_client().bucket(bucket_name)
     blob = bucket.blob(gcs_file_path)
 
     # Download the file
@@ -277,7 +291,7 @@ def get_file(
             f"{gcs_file_path} does not exists. Check the path and try again"
         )
 
-    bucket = client.bucket(bucket_name)
+    bucket = get_client().bucket(bucket_name)
     blob = bucket.blob(gcs_file_path)
 
     memory_blob = blob.download_as_bytes()
@@ -299,7 +313,7 @@ def list_blobs(bucket_name: str) -> list[dict]:
     if not bucket_exists(bucket_name):
         raise ValueError(f"The bucket {bucket_name} does not exists")
 
-    blobs = client.list_blobs(bucket_name)
+    blobs = get_client().list_blobs(bucket_name)
 
     blobs_data = [
         {
@@ -0,0 +1,3 @@
+from .engine import AsyncHTTPEngine
+
+__all__ = ["AsyncHTTPEngine"]
@@ -0,0 +1,198 @@
+import sqlite3
+import time
+import zlib
+from contextlib import contextmanager
+from loguru import logger
+from typing import Iterator, Optional
+
+
+class DiskResponseCache:
+    """
+    Persistent cache of HTTP response bodies keyed by URL, stored in a local SQLite file.
+    Bodies are stored compressed, expire after a TTL, and the least recently used ones are
+    evicted once the total compressed size exceeds a limit. Hit, miss and eviction counters
+    are also persisted, so they account for every run using the same file.
+    """
+
+    def __init__(self, db_path: str, ttl_seconds: float, max_size_bytes: int):
+        """
+        Args:
+            db_path: str -> Path to the SQLite file. Created if it does not exist
+            ttl_seconds: float -> Seconds a response is valid since it was stored
+            max_size_bytes: int -> Maximum total size of the compressed bodies stored
+        """
+        if not isinstance(db_path, str) or db_path.strip() == "":
+            raise ValueError("db_path must be a non-empty string")
+        if ttl_seconds <= 0 or max_size_bytes <= 0:
+            raise ValueError("ttl_seconds and max_size_bytes must be greater than zero")
+
+        self.__db_path = db_path
+        self.__ttl_seconds = ttl_seconds
+        self.__max_size_bytes = max_size_bytes
+
+        with self.__connect() as connection:
+            connection.execute(
+                "create table if not exists responses ("
+                "url text primary key, "
+                "body blob not null, "
+                "size integer not null, "
+                "stored_at real not null, "
+                "last_accessed_at real not null)"
+            )
+            connection.execute(
+                "create index if not exists responses_last_accessed_at "
+                "on responses (last_accessed_at)"
+            )
+            connection.execute(
+                "create table if not exists counters ("
+                "name text primary key, "
+                "value integer not null)"
+            )
+
+    @property
+    def db_path(self) -> str:
+        return self.__db_path
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self.__ttl_seconds
+
+    @property
+    def max_size_bytes(self) -> int:
+        return self.__max_size_bytes
+
+    @contextmanager
+    def __connect(self) -> Iterator[sqlite3.Connection]:
+        # A new connection per operation allows using the cache from several threads
+        connection = sqlite3.connect(self.__db_path, timeout=30)
+
+        try:
+            with connection:  # Commits the transaction if no exception is raised
+                yield connection
+
+        finally:
+            connection.close()
+
+    @staticmethod
+    def __increase_counter(
+        connection: sqlite3.Connection, name: str, amount: int = 1
+    ) -> None:
+        connection.execute(
+            "insert into counters (name, value) values (?, ?) "
+            "on conflict (name) do update set value = value + excluded.value",
+            (name, amount),
+        )
+
+    def get(self, url: str) -> Optional[bytes]:
+        """
+        Args:
+            url: str -> URL of the response
+
+        Returns:
+            Optional[bytes] -> Body of the response, None if it is not cached or has expired
+        """
+        try:
+            return self.__get(url)
+
+        except sqlite3.Error as e:
+            # The cache is a best-effort optimization, so errors are treated as misses
+            logger.warning(f"Response of {url} could not be read from the cache: {e}")
+            return None
+
+    def __get(self, url: str) -> Optional[bytes]:
+        now = time.time()
+
+        with self.__connect() as connection:
+            row = connection.execute(
+                "select body, stored_at from responses where url = ?", (url,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.__ttl_seconds:
+                if row is not None:
+                    connection.execute("delete from responses where url = ?", (url,))
+
+                self.__increase_counter(connection, "misses")
+                return None
+
+            connection.execute(
+                "update responses set last_accessed_at = ? where url = ?", (now, url)
+            )
+            self.__increase_counter(connection, "hits")
+
+        return zlib.decompress(row[0])
+
+    def set(self, url: str, body: bytes) -> None:
+        """
+        Stores the body of a response, evicting the least recently used ones if the cache
+        exceeds its maximum size
+
+        Args:
+            url: str -> URL of the response
+            body: bytes -> Body of the response
+        """
+        compressed_body = zlib.compress(body)
+        now = time.time()
+
+        if len(compressed_body) > self.__max_size_bytes:
+            logger.warning(
+                f"Response of {url} is bigger than the cache, not storing it"
+            )
+            return
+
+        try:
+            with self.__connect() as connection:
+                connection.execute(
+                    "insert or replace into responses "
+                    "(url, body, size, stored_at, last_accessed_at) values (?, ?, ?, ?, ?)",
+                    (url, compressed_body, len(compressed_body), now, now),
+                )
+                self.__evict(connection)
+
+        except sqlite3.Error as e:
+            logger.warning(f"Response of {url} could not be stored in the cache: {e}")
+
+    def __evict(self, connection: sqlite3.Connection) -> None:
+        """
+        Removes the least recently used responses until the cache fits its maximum size
+        """
+        total_size = connection.execute(
+            "select coalesce(sum(size), 0) from responses"
+        ).fetchone()[0]
+
+        if total_size <= self.__max_size_bytes:
+            return
+
+        evicted_urls = list()
+        for url, size in connection.execute(
+            "select url, size from responses order by last_accessed_at"
+        ).fetchall():
+            if total_size <= self.__max_size_bytes:
+                break
+
+            evicted_urls.append((url,))
+            total_size -= size
+
+        connection.executemany("delete from responses where url = ?", evicted_urls)
+        self.__increase_counter(connection, "evictions", len(evicted_urls))
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns:
+            dict[str, int] -> Number of entries, total compressed size, and the hit, miss and
+                              eviction counters of the cache
+        """
+        with self.__connect() as connection:
+            entries, size_bytes = connection.execute(
+                "select count(*), coalesce(sum(size), 0) from responses"
+            ).fetchone()
+            counters = dict(
+                connection.execute("select name, value from counters").fetchall()
+            )
+
+        return {
+            "entries": entries,
+            "size_bytes": size_bytes,
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+        }
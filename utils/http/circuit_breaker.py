@@ -0,0 +1,106 @@
+import time
+from loguru import logger
+from typing import Optional
+
+from database.state import StateStore
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a resource (e.g. a feed) after failure_threshold consecutive
+    failures, for cooldown_seconds. Once the cool-down has passed, a single trial request is
+    allowed: if it succeeds the circuit closes, otherwise it stays open for another cool-down.
+
+    The state of each resource is persisted in a StateStore, so a resource that keeps failing
+    is also skipped by the next runs
+    """
+
+    def __init__(
+        self,
+        state_store: StateStore,
+        namespace: str,
+        failure_threshold: int = 3,
+        cooldown_seconds: float = 30 * 60,
+    ):
+        """
+        Args:
+            state_store: StateStore -> Store where the state of each resource is persisted
+            namespace: str -> Namespace of the StateStore used by this circuit breaker
+            failure_threshold: int -> Consecutive failures that open the circuit
+            cooldown_seconds: float -> Seconds the circuit stays open before a trial request
+        """
+        if not isinstance(failure_threshold, int) or failure_threshold < 1:
+            raise ValueError("failure_threshold must be a positive integer")
+        if cooldown_seconds <= 0:
+            raise ValueError("cooldown_seconds must be greater than zero")
+
+        self.__state_store = state_store
+        self.__namespace = namespace
+        self.__failure_threshold = failure_threshold
+        self.__cooldown_seconds = cooldown_seconds
+
+    def __get_state(self, key: str) -> dict:
+        try:
+            return self.__state_store.get(self.__namespace, key) or dict()
+
+        except Exception as e:
+            logger.warning(f"Circuit breaker state of {key} could not be read: {e}")
+            return dict()
+
+    def __set_state(self, key: str, state: Optional[dict]) -> None:
+        try:
+            if state is None:
+                self.__state_store.delete(self.__namespace, key)
+            else:
+                self.__state_store.set(self.__namespace, key, state)
+
+        except Exception as e:
+            logger.warning(f"Circuit breaker state of {key} could not be saved: {e}")
+
+    def allow_request(self, key: str) -> bool:
+        """
+        Args:
+            key: str -> Resource about to be requested
+
+        Returns:
+            bool -> False if the circuit of the resource is open and still cooling down
+        """
+        opened_at = self.__get_state(key).get("opened_at")
+
+        if opened_at is None:
+            return True
+
+        remaining_seconds = opened_at + self.__cooldown_seconds - time.time()
+        if remaining_seconds > 0:
+            logger.warning(
+                f"Circuit of {key} is open, skipping it for {remaining_seconds:.0f} more seconds"
+            )
+            return False
+
+        logger.info(f"Cool-down of {key} has passed, sending a trial request")
+        return True
+
+    def record_success(self, key: str) -> None:
+        """
+        Closes the circuit of the resource
+        """
+        if self.__get_state(key):
+            logger.info(f"Circuit of {key} closed")
+            self.__set_state(key, None)
+
+    def record_failure(self, key: str) -> None:
+        """
+        Counts a failure of the resource, opening its circuit once the threshold is reached.
+        A failed trial request opens the circuit again
+        """
+        state = self.__get_state(key)
+        failures = state.get("failures", 0) + 1
+
+        opened_at = state.get("opened_at")
+        if failures >= self.__failure_threshold:
+            opened_at = time.time()
+            logger.warning(
+                f"Circuit of {key} opened after {failures} consecutive failures"
+            )
+
+        self.__set_state(key, {"failures": failures, "opened_at": opened_at})
@@ -0,0 +1,328 @@
+import asyncio
+import re
+import httpx
+from loguru import logger
+from typing import Callable, Optional
+from urllib.parse import urlsplit
+
+from utils.deadline import Deadline
+from utils.http.cache import DiskResponseCache
+from utils.http.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+from utils.http.retry import RetryPolicy
+from utils.http.streaming import aread_until_match
+
+# Headers describing the encoding of the original body, which no longer apply once it has been
+# decoded and possibly truncated
+_BODY_ENCODING_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+class AsyncHTTPEngine:
+    """
+    Asynchronous HTTP client that shares a single keep-alive connection pool among all
+    the requests done through it, limiting the number of requests in flight both globally
+    and per host.
+
+    Usage:
+        async with AsyncHTTPEngine(max_connections=20, max_connections_per_host=5) as engine:
+            responses = await engine.fetch_many(["https://...", "https://..."])
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_connections_per_host: int = 5,
+        timeout: float = 60,
+        headers: Optional[dict[str, str]] = None,
+        response_cache: Optional[DiskResponseCache] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        max_page_bytes: Optional[int] = None,
+    ):
+        """
+        Args:
+            max_connections: int -> Maximum number of requests in flight at the same time
+            max_connections_per_host: int -> Maximum number of requests in flight to a same host
+            timeout: float -> Seconds to wait for a response before giving up
+            headers: Optional[dict[str, str]] -> Headers sent in every request
+            response_cache: Optional[DiskResponseCache] -> Cache used by the requests done
+                                with use_cache=True
+            rate_limiter: Optional[AdaptiveRateLimiter] -> Paces the requests sent to each
+                                host, on top of max_connections_per_host
+            retry_policy: Optional[RetryPolicy] -> Retries the requests failing with transient
+                                errors. If None, requests are not retried
+            max_page_bytes: Optional[int] -> Bytes read at most from the bodies fetched with a
+                                stop_pattern, if it never matches. If None, there is no limit
+        """
+        if not all(
+            isinstance(limit, int) and limit > 0
+            for limit in [max_connections, max_connections_per_host]
+        ):
+            raise ValueError(
+                "max_connections and max_connections_per_host must be positive integers"
+            )
+
+        self.__max_connections = max_connections
+        self.__max_connections_per_host = max_connections_per_host
+        self.__timeout = timeout
+        self.__headers = headers or dict()
+        self.__response_cache = response_cache
+        self.__rate_limiter = rate_limiter
+        self.__retry_policy = retry_policy
+        self.__max_page_bytes = max_page_bytes
+
+        self.__client: Optional[httpx.AsyncClient] = None
+        self.__global_semaphore: Optional[asyncio.Semaphore] = None
+        self.__host_semaphores: dict[str, asyncio.Semaphore] = dict()
+
+    @property
+    def max_connections(self) -> int:
+        return self.__max_connections
+
+    @property
+    def max_connections_per_host(self) -> int:
+        return self.__max_connections_per_host
+
+    async def __aenter__(self) -> "AsyncHTTPEngine":
+        self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def open(self) -> None:
+        """
+        Creates the connection pool. Must be called inside a running event loop
+        """
+        if self.__client is not None:
+            return
+
+        self.__client = httpx.AsyncClient(
+            headers=self.__headers,
+            timeout=self.__timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.__max_connections,
+                max_keepalive_connections=self.__max_connections,
+            ),
+        )
+        self.__global_semaphore = asyncio.Semaphore(self.__max_connections)
+        self.__host_semaphores = dict()
+
+    async def aclose(self) -> None:
+        """
+        Closes all the connections of the pool
+        """
+        if self.__client is not None:
+            await self.__client.aclose()
+            self.__client = None
+
+    def __get_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+
+        if host not in self.__host_semaphores:
+            self.__host_semaphores[host] = asyncio.Semaphore(
+                self.__max_connections_per_host
+            )
+
+        return self.__host_semaphores[host]
+
+    async def fetch(
+        self,
+        url: str,
+        headers: Optional[dict[str, str]] = None,
+        use_cache: bool = False,
+        stop_pattern: Optional[re.Pattern] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Optional[httpx.Response]:
+        """
+        Sends a GET request to the url, waiting for a free slot if the global or the host
+        limit has been reached.
+
+        Args:
+            url: str -> URL to fetch
+            headers: Optional[dict[str, str]] -> Extra headers for this request only
+            use_cache: bool -> Look for the response in the engine's response cache first, and
+                            store it there if it has to be fetched
+            stop_pattern: Optional[re.Pattern] -> Bytes pattern; once the body read matches
+                            it, the rest of the body is not downloaded. A cached body is only
+                            used if it matches it. Its matches must not be longer than
+                            STOP_PATTERN_OVERLAP_BYTES
+            timeout: Optional[float] -> Seconds to wait for this request, instead of the
+                            engine's timeout
+            deadline: Optional[Deadline] -> Time budget of the request. Each attempt waits at
+                            most the time remaining, and the retries stop once it has expired
+
+        Returns:
+            Optional[httpx.Response] -> The response, or None if the request failed. A 304
+                            response to a conditional request is returned, but never cached
+        """
+        if self.__client is None:
+            raise RuntimeError(
+                "The engine is not open. Use it as an async context manager or call open()"
+            )
+
+        use_cache = use_cache and self.__response_cache is not None
+
+        if use_cache:
+            cached_body = await asyncio.to_thread(
+                self.__get_cached_body, url, stop_pattern
+            )
+            if cached_body is not None:
+                return httpx.Response(
+                    200, content=cached_body, request=httpx.Request("GET", url)
+                )
+
+        response = await self.__send(url, headers, stop_pattern, timeout, deadline)
+
+        if use_cache and response is not None and response.status_code == 200:
+            await asyncio.to_thread(self.__response_cache.set, url, response.content)
+
+        return response
+
+    def __get_cached_body(
+        self, url: str, stop_pattern: Optional[re.Pattern]
+    ) -> Optional[bytes]:
+        """
+        Gets the body cached for the url, if it matches stop_pattern. Blocking, as the cache
+        is stored on disk
+        """
+        cached_body = self.__response_cache.get(url)
+
+        if cached_body is None or (
+            stop_pattern is not None and not stop_pattern.search(cached_body)
+        ):
+            return None
+
+        return cached_body
+
+    async def __send(
+        self,
+        url: str,
+        headers: Optional[dict[str, str]],
+        stop_pattern: Optional[re.Pattern],
+        timeout: Optional[float],
+        deadline: Optional[Deadline],
+    ) -> Optional[httpx.Response]:
+        """
+        Sends the GET request, retrying it with the engine's retry policy if it fails with a
+        transient error
+        """
+
+        async def attempt() -> httpx.Response:
+            attempt_timeout = timeout
+            if deadline is not None:
+                attempt_timeout = deadline.timeout(
+                    self.__timeout if timeout is None else timeout
+                )
+
+            return await self.__attempt(url, headers, stop_pattern, attempt_timeout)
+
+        try:
+            if self.__retry_policy is None:
+                return await attempt()
+
+            return await self.__retry_policy.arun(
+                attempt, description=f"fetch {url}", deadline=deadline
+            )
+
+        except httpx.HTTPError as e:
+            logger.error(f"Error fetching {url}: {e}")
+            return None
+
+    async def __attempt(
+        self,
+        url: str,
+        headers: Optional[dict[str, str]],
+        stop_pattern: Optional[re.Pattern],
+        timeout: Optional[float],
+    ) -> httpx.Response:
+        """
+        Sends the GET request once there is a free slot. The slot is released between retries.
+        The host slot and the rate limit permit are acquired before the global slot, so the
+        requests waiting for a slow or throttled host do not hold global slots needed by the
+        requests to other hosts. The latency reported to the rate limiter is measured from
+        the moment the global slot is acquired
+        """
+        async with self.__get_host_semaphore(url):
+            if self.__rate_limiter is None:
+                async with self.__global_semaphore:
+                    return await self.__stream(url, headers, stop_pattern, timeout)
+
+            async with self.__rate_limiter.alimit(url) as permit:
+                async with self.__global_semaphore:
+                    # The time queued for the global slot is not latency of the host
+                    permit.start()
+                    return await self.__stream(
+                        url, headers, stop_pattern, timeout, permit.record
+                    )
+
+    async def __stream(
+        self,
+        url: str,
+        headers: Optional[dict[str, str]],
+        stop_pattern: Optional[re.Pattern],
+        timeout: Optional[float],
+        record_outcome: Optional[Callable[[int, Optional[float]], None]] = None,
+    ) -> httpx.Response:
+        """
+        Streams the body of the response until it matches stop_pattern, reporting the status
+        code of the response to record_outcome (e.g. a rate limiter)
+        """
+        async with self.__client.stream(
+            "GET",
+            url,
+            headers=headers,
+            timeout=httpx.USE_CLIENT_DEFAULT if timeout is None else timeout,
+        ) as response:
+            if record_outcome is not None:
+                record_outcome(
+                    response.status_code,
+                    parse_retry_after(response.headers.get("Retry-After")),
+                )
+            # A 304 answers a conditional request, so it is returned to the caller instead of
+            # being raised as an error
+            if response.status_code != httpx.codes.NOT_MODIFIED:
+                response.raise_for_status()
+            body = await aread_until_match(
+                response.aiter_bytes(),
+                stop_pattern,
+                max_bytes=self.__max_page_bytes if stop_pattern is not None else None,
+            )
+
+        # The body read is already decoded, so it is returned in a new response
+        response_headers = [
+            (name, value)
+            for name, value in response.headers.items()
+            if name.lower() not in _BODY_ENCODING_HEADERS
+        ]
+        return httpx.Response(
+            response.status_code,
+            headers=response_headers,
+            content=body,
+            request=response.request,
+        )
+
+    async def fetch_many(
+        self,
+        urls: list[str],
+        use_cache: bool = False,
+        stop_pattern: Optional[re.Pattern] = None,
+    ) -> list[Optional[httpx.Response]]:
+        """
+        Fetches several urls concurrently
+
+        Args:
+            urls: list[str] -> URLs to fetch
+            use_cache: bool -> Use the engine's response cache for every url
+            stop_pattern: Optional[re.Pattern] -> Stop pattern used for every url
+
+        Returns:
+            list[Optional[httpx.Response]] -> Responses in the same order as urls
+        """
+        return await asyncio.gather(
+            *(
+                self.fetch(url, use_cache=use_cache, stop_pattern=stop_pattern)
+                for url in urls
+            )
+        )
@@ -0,0 +1,319 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from loguru import logger
+from typing import AsyncIterator, Iterator, Optional
+from urllib.parse import urlsplit
+
+# Status codes with which a host signals that it is receiving too many requests
+THROTTLE_STATUS_CODES = (429, 503)
+
+# Seconds between checks while waiting for a free slot of a host
+_SLOT_POLL_SECONDS = 0.02
+
+
+class _HostState:
+    """
+    Token bucket, concurrency limit and metrics of a single host
+    """
+
+    def __init__(self, rate_per_second: float, burst: int, concurrency_limit: float):
+        self.rate_per_second = rate_per_second
+        self.tokens = float(burst)
+        self.last_refill_at = time.monotonic()
+        self.concurrency_limit = concurrency_limit
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.latency_ewma_seconds: Optional[float] = None
+        self.requests = 0
+        self.throttle_events = 0
+        self.slow_responses = 0
+
+
+class RequestPermit:
+    """
+    Slot granted by the AdaptiveRateLimiter for a single request. The outcome of the request
+    must be recorded with record(), so the limiter can adapt to the host
+    """
+
+    def __init__(self, host: str):
+        self.host = host
+        self.status_code: Optional[int] = None
+        self.retry_after_seconds: Optional[float] = None
+        self.started_at = time.monotonic()
+
+    def start(self) -> None:
+        """
+        Restarts the latency clock of the request. Called once the request is actually sent,
+        if it had to wait for another limit after the permit was granted (e.g. a global slot),
+        so that wait is not taken as latency of the host
+        """
+        self.started_at = time.monotonic()
+
+    def record(
+        self, status_code: int, retry_after_seconds: Optional[float] = None
+    ) -> None:
+        """
+        Args:
+            status_code: int -> Status code of the response
+            retry_after_seconds: Optional[float] -> Seconds the host asked to wait before the
+                                    next request (Retry-After header), if any
+        """
+        self.status_code = status_code
+        self.retry_after_seconds = retry_after_seconds
+
+
+class AdaptiveRateLimiter:
+    """
+    Limits the requests sent to each host with a token bucket (requests per second) and a
+    concurrency limit (requests in flight), both adapted with AIMD:
+        - Additive increase: every fast successful response raises the concurrency limit by
+          additive_increase / concurrency_limit (about +additive_increase per round trip) and
+          the rate by additive_increase / rate, up to their maximums
+        - Multiplicative decrease: a throttling response (429 or 503) multiplies both the
+          concurrency limit and the rate by decrease_factor, and a response slower than
+          latency_target_seconds multiplies the concurrency limit by decrease_factor
+
+    So each host is sent requests at the highest pace it tolerates. A single instance is meant
+    to be shared by all the workers of the process, either threads (limit) or coroutines (alimit)
+
+    Usage:
+        with rate_limiter.limit(url) as permit:
+            response = requests.get(url)
+            permit.record(response.status_code)
+    """
+
+    def __init__(
+        self,
+        max_rate_per_second: float = 5,
+        burst: int = 5,
+        max_concurrency: int = 5,
+        min_concurrency: int = 1,
+        min_rate_per_second: float = 0.2,
+        latency_target_seconds: float = 5,
+        additive_increase: float = 1,
+        decrease_factor: float = 0.5,
+    ):
+        """
+        Args:
+            max_rate_per_second: float -> Maximum requests per second sent to a host
+            burst: int -> Requests that can be sent at once to a host before being rate limited
+            max_concurrency: int -> Maximum requests in flight to a host
+            min_concurrency: int -> Requests in flight always allowed to a host
+            min_rate_per_second: float -> Requests per second always allowed to a host
+            latency_target_seconds: float -> Responses slower than this reduce the concurrency
+            additive_increase: float -> Increase of the limits per round trip without problems
+            decrease_factor: float -> Factor applied to the limits when the host is overloaded
+        """
+        if not 0 < min_rate_per_second <= max_rate_per_second:
+            raise ValueError(
+                "Rates must satisfy 0 < min_rate_per_second <= max_rate_per_second"
+            )
+        if not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError(
+                "Concurrencies must satisfy 1 <= min_concurrency <= max_concurrency"
+            )
+        if burst < 1 or latency_target_seconds <= 0 or additive_increase <= 0:
+            raise ValueError(
+                "burst, latency_target_seconds and additive_increase must be greater than zero"
+            )
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+
+        self.__max_rate_per_second = max_rate_per_second
+        self.__min_rate_per_second = min_rate_per_second
+        self.__burst = burst
+        self.__max_concurrency = max_concurrency
+        self.__min_concurrency = min_concurrency
+        self.__latency_target_seconds = latency_target_seconds
+        self.__additive_increase = additive_increase
+        self.__decrease_factor = decrease_factor
+
+        self.__lock = threading.Lock()
+        self.__hosts: dict[str, _HostState] = dict()
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        return urlsplit(url).netloc
+
+    def __get_host_state(self, host: str) -> _HostState:
+        if host not in self.__hosts:
+            self.__hosts[host] = _HostState(
+                rate_per_second=self.__max_rate_per_second,
+                burst=self.__burst,
+                # Starts at the minimum and grows while the host responds well (slow start)
+                concurrency_limit=float(self.__min_concurrency),
+            )
+
+        return self.__hosts[host]
+
+    def __try_acquire(self, host: str) -> float:
+        """
+        Takes a slot of the host if there is one available
+
+        Returns:
+            float -> 0 if the slot was taken, otherwise the seconds to wait before trying again
+        """
+        with self.__lock:
+            state = self.__get_host_state(host)
+            now = time.monotonic()
+
+            if now < state.blocked_until:
+                return state.blocked_until - now
+
+            if state.in_flight >= int(state.concurrency_limit):
+                return _SLOT_POLL_SECONDS
+
+            state.tokens = min(
+                self.__burst,
+                state.tokens + (now - state.last_refill_at) * state.rate_per_second,
+            )
+            state.last_refill_at = now
+
+            if state.tokens < 1:
+                return (1 - state.tokens) / state.rate_per_second
+
+            state.tokens -= 1
+            state.in_flight += 1
+            state.requests += 1
+            return 0
+
+    def __release(self, permit: RequestPermit) -> None:
+        """
+        Frees the slot of the permit and adapts the limits of its host to the outcome
+        """
+        latency = time.monotonic() - permit.started_at
+
+        with self.__lock:
+            state = self.__get_host_state(permit.host)
+            state.in_flight -= 1
+
+            # Requests failed without response do not tell anything about the host load
+            if permit.status_code is None:
+                return
+
+            state.latency_ewma_seconds = (
+                latency
+                if state.latency_ewma_seconds is None
+                else 0.8 * state.latency_ewma_seconds + 0.2 * latency
+            )
+
+            if permit.status_code in THROTTLE_STATUS_CODES:
+                state.throttle_events += 1
+                state.concurrency_limit = max(
+                    self.__min_concurrency,
+                    state.concurrency_limit * self.__decrease_factor,
+                )
+                state.rate_per_second = max(
+                    self.__min_rate_per_second,
+                    state.rate_per_second * self.__decrease_factor,
+                )
+                state.tokens = min(state.tokens, 0)
+
+                if permit.retry_after_seconds:
+                    state.blocked_until = max(
+                        state.blocked_until,
+                        time.monotonic() + permit.retry_after_seconds,
+                    )
+
+                logger.warning(
+                    f"{permit.host} throttled the request ({permit.status_code}). Limits "
+                    f"reduced to {state.concurrency_limit:.1f} requests in flight and "
+                    f"{state.rate_per_second:.2f} requests per second"
+                )
+
+            elif latency > self.__latency_target_seconds:
+                state.slow_responses += 1
+                state.concurrency_limit = max(
+                    self.__min_concurrency,
+                    state.concurrency_limit * self.__decrease_factor,
+                )
+
+            else:
+                state.concurrency_limit = min(
+                    self.__max_concurrency,
+                    state.concurrency_limit
+                    + self.__additive_increase / state.concurrency_limit,
+                )
+                state.rate_per_second = min(
+                    self.__max_rate_per_second,
+                    state.rate_per_second
+                    + self.__additive_increase / state.rate_per_second,
+                )
+
+    @contextmanager
+    def limit(self, url: str) -> Iterator[RequestPermit]:
+        """
+        Blocks the thread until a request to the host of the url is allowed
+
+        Args:
+            url: str -> URL that is going to be requested
+
+        Returns:
+            Iterator[RequestPermit] -> Permit where the outcome of the request is recorded
+        """
+        host = self.get_host(url)
+
+        while (wait_seconds := self.__try_acquire(host)) > 0:
+            time.sleep(wait_seconds)
+
+        permit = RequestPermit(host)
+        try:
+            yield permit
+
+        finally:
+            self.__release(permit)
+
+    @asynccontextmanager
+    async def alimit(self, url: str) -> AsyncIterator[RequestPermit]:
+        """
+        Asynchronous version of limit, waits without blocking the event loop
+        """
+        host = self.get_host(url)
+
+        while (wait_seconds := self.__try_acquire(host)) > 0:
+            await asyncio.sleep(wait_seconds)
+
+        permit = RequestPermit(host)
+        try:
+            yield permit
+
+        finally:
+            self.__release(permit)
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        """
+        Returns:
+            dict[str, dict[str, float]] -> Per host: current concurrency limit, requests in flight,
+                                            current rate, latency (EWMA), requests sent,
+                                            throttle events and slow responses
+        """
+        with self.__lock:
+            return {
+                host: {
+                    "concurrency_limit": round(state.concurrency_limit, 2),
+                    "in_flight": state.in_flight,
+                    "rate_per_second": round(state.rate_per_second, 2),
+                    "latency_ewma_seconds": state.latency_ewma_seconds,
+                    "requests": state.requests,
+                    "throttle_events": state.throttle_events,
+                    "slow_responses": state.slow_responses,
+                }
+                for host, state in self.__hosts.items()
+            }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Args:
+        value: Optional[str] -> Value of a Retry-After header
+
+    Returns:
+        Optional[float] -> Seconds to wait, None if missing or not given in seconds
+    """
+    try:
+        return float(value) if value is not None else None
+
+    except ValueError:
+        return None
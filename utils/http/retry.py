@@ -0,0 +1,180 @@
+import asyncio
+import random
+import time
+import httpx
+import requests
+from loguru import logger
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from utils.deadline import Deadline
+
+T = TypeVar("T")
+
+
+class RetryPolicy:
+    """
+    Retries operations failing with transient errors (connection errors, timeouts and the
+    retry_status_codes), waiting between attempts an exponential backoff with full jitter:
+        delay = random.uniform(0, min(max_delay_seconds, base_delay_seconds * 2 ** attempt))
+
+    The jitter spreads the retries of concurrent workers, so they do not hit a recovering host
+    at the same time
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay_seconds: float = 0.5,
+        max_delay_seconds: float = 8,
+        retry_status_codes: tuple[int, ...] = (429, 500, 502, 503, 504),
+    ):
+        """
+        Args:
+            max_attempts: int -> Attempts done in total, including the first one
+            base_delay_seconds: float -> Maximum delay before the first retry
+            max_delay_seconds: float -> Maximum delay before any retry
+            retry_status_codes: tuple[int, ...] -> Status codes of the responses retried
+        """
+        if not isinstance(max_attempts, int) or max_attempts < 1:
+            raise ValueError("max_attempts must be a positive integer")
+        if base_delay_seconds < 0 or max_delay_seconds < base_delay_seconds:
+            raise ValueError(
+                "Delays must satisfy 0 <= base_delay_seconds <= max_delay_seconds"
+            )
+
+        self.__max_attempts = max_attempts
+        self.__base_delay_seconds = base_delay_seconds
+        self.__max_delay_seconds = max_delay_seconds
+        self.__retry_status_codes = retry_status_codes
+
+    @property
+    def max_attempts(self) -> int:
+        return self.__max_attempts
+
+    def get_delay(self, attempt: int) -> float:
+        """
+        Args:
+            attempt: int -> Number of the attempt that failed, starting at 0
+
+        Returns:
+            float -> Seconds to wait before the next attempt
+        """
+        return random.uniform(
+            0,
+            min(self.__max_delay_seconds, self.__base_delay_seconds * 2**attempt),
+        )
+
+    def is_transient(self, error: Exception) -> bool:
+        """
+        Args:
+            error: Exception -> Error raised by a requests or httpx request
+
+        Returns:
+            bool -> True if the request might succeed if retried
+        """
+        response = getattr(error, "response", None)
+        status_code = getattr(response, "status_code", None)
+
+        if status_code is not None:
+            return status_code in self.__retry_status_codes
+
+        return isinstance(
+            error,
+            (
+                httpx.TransportError,
+                requests.ConnectionError,
+                requests.Timeout,
+            ),
+        )
+
+    def __should_retry(
+        self,
+        error: Exception,
+        attempt: int,
+        description: str,
+        deadline: Optional[Deadline],
+    ) -> bool:
+        if attempt + 1 >= self.__max_attempts or not self.is_transient(error):
+            return False
+
+        if deadline is not None and deadline.expired():
+            logger.warning(
+                f"Attempt {attempt + 1} of {self.__max_attempts} to {description} failed "
+                f"and the deadline has expired, not retrying: {error}"
+            )
+            return False
+
+        logger.warning(
+            f"Attempt {attempt + 1} of {self.__max_attempts} to {description} failed, "
+            f"retrying: {error}"
+        )
+        return True
+
+    def __get_bounded_delay(self, attempt: int, deadline: Optional[Deadline]) -> float:
+        """
+        Gets the delay before the next attempt, cut to the time remaining in the deadline
+        """
+        delay = self.get_delay(attempt)
+
+        if deadline is None:
+            return delay
+
+        return deadline.timeout(delay)
+
+    def run(
+        self,
+        operation: Callable[[], T],
+        description: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> T:
+        """
+        Runs the operation, retrying it while it fails with transient errors. The error of the
+        last attempt is raised
+
+        Args:
+            operation: Callable[[], T] -> Function performing the request. It must bound its
+                            own timeout with the deadline, as it is called once per attempt
+            description: Optional[str] -> What the operation does, for the logs
+            deadline: Optional[Deadline] -> Time budget of the request. The waits between
+                            attempts are cut to the time remaining, and no attempt is started
+                            once it has expired
+
+        Returns:
+            T -> Result of the operation
+        """
+        for attempt in range(self.__max_attempts):
+            try:
+                return operation()
+
+            except Exception as e:
+                if not self.__should_retry(e, attempt, description or "run", deadline):
+                    raise
+
+                time.sleep(self.__get_bounded_delay(attempt, deadline))
+
+                # The wait was cut short, there is no time left for another attempt
+                if deadline is not None and deadline.expired():
+                    raise
+
+    async def arun(
+        self,
+        operation: Callable[[], Awaitable[T]],
+        description: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> T:
+        """
+        Asynchronous version of run, waits without blocking the event loop
+        """
+        for attempt in range(self.__max_attempts):
+            try:
+                return await operation()
+
+            except Exception as e:
+                if not self.__should_retry(e, attempt, description or "run", deadline):
+                    raise
+
+                await asyncio.sleep(self.__get_bounded_delay(attempt, deadline))
+
+                # The wait was cut short, there is no time left for another attempt
+                if deadline is not None and deadline.expired():
+                    raise
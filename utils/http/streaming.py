@@ -0,0 +1,94 @@
+import asyncio
+import re
+from typing import AsyncIterable, Iterable, Optional
+
+# Bytes already read that are searched again with each new chunk, so a match split between
+# chunks is found. The matches of a stop pattern must not be longer than this
+STOP_PATTERN_OVERLAP_BYTES = 8 * 1024
+
+
+def _search_new_bytes(
+    stop_pattern: re.Pattern, body: bytearray, searched_until: int
+) -> bool:
+    """
+    Searches stop_pattern only over the bytes not searched yet, plus an overlap with the
+    previous ones, so the whole body is not searched again on every chunk
+
+    Args:
+        stop_pattern: re.Pattern -> Bytes pattern searched
+        body: bytearray -> Body read so far
+        searched_until: int -> Bytes of the body already searched
+
+    Returns:
+        bool -> True if the pattern matches
+    """
+    return (
+        stop_pattern.search(body, max(0, searched_until - STOP_PATTERN_OVERLAP_BYTES))
+        is not None
+    )
+
+
+def read_until_match(
+    chunks: Iterable[bytes],
+    stop_pattern: Optional[re.Pattern],
+    max_bytes: Optional[int] = None,
+) -> bytes:
+    """
+    Reads the chunks of a streamed response body until the bytes read match stop_pattern,
+    so the rest of the body is never downloaded. Each chunk is searched once, together with
+    the last STOP_PATTERN_OVERLAP_BYTES read before it
+
+    Args:
+        chunks: Iterable[bytes] -> Chunks of the body, in order
+        stop_pattern: Optional[re.Pattern] -> Bytes pattern that marks that enough of the body
+                        has been read. Its matches must not be longer than
+                        STOP_PATTERN_OVERLAP_BYTES. If None, the whole body is read
+        max_bytes: Optional[int] -> Bytes read at most, even if stop_pattern never matches.
+                        If None, there is no limit
+
+    Returns:
+        bytes -> Body read
+    """
+    body = bytearray()
+
+    for chunk in chunks:
+        searched_until = len(body)
+        body += chunk
+
+        if max_bytes is not None and len(body) >= max_bytes:
+            del body[max_bytes:]
+            break
+
+        if stop_pattern is not None and _search_new_bytes(
+            stop_pattern, body, searched_until
+        ):
+            break
+
+    return bytes(body)
+
+
+async def aread_until_match(
+    chunks: AsyncIterable[bytes],
+    stop_pattern: Optional[re.Pattern],
+    max_bytes: Optional[int] = None,
+) -> bytes:
+    """
+    Asynchronous version of read_until_match. The pattern is searched in a worker thread, so
+    a slow search does not block the event loop
+    """
+    body = bytearray()
+
+    async for chunk in chunks:
+        searched_until = len(body)
+        body += chunk
+
+        if max_bytes is not None and len(body) >= max_bytes:
+            del body[max_bytes:]
+            break
+
+        if stop_pattern is not None and await asyncio.to_thread(
+            _search_new_bytes, stop_pattern, body, searched_until
+        ):
+            break
+
+    return bytes(body)
@@ -0,0 +1,162 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from loguru import logger
+from typing import Awaitable, Callable, Optional
+
+from database.jobs import JobStore
+from utils.progress import Progress
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class BackgroundJobRunner:
+    """
+    Runs coroutines as background jobs of the event loop, keeping their status, progress and
+    result in a JobStore, so they can be polled after the request that submitted them has
+    finished. At most max_concurrent jobs run at the same time, the rest wait as pending.
+
+    While a job runs, its progress is read from the Progress it receives, the store is only
+    written when the status changes. Jobs do not survive the process: the ones cancelled
+    before finishing (e.g. when the event loop shuts down) are marked as failed, but if the
+    process is killed they stay as pending or running in a persistent store.
+
+    Must be used from a single event loop
+    """
+
+    def __init__(self, job_store: JobStore, max_concurrent: int = 1):
+        """
+        Args:
+            job_store: JobStore -> Store where the jobs are kept
+            max_concurrent: int -> Maximum number of jobs running at the same time
+        """
+        if not isinstance(max_concurrent, int) or max_concurrent < 1:
+            raise ValueError("max_concurrent must be a positive integer")
+
+        self.__job_store = job_store
+        self.__max_concurrent = max_concurrent
+        self.__semaphore: Optional[asyncio.Semaphore] = None
+
+        # job_id -> (task, progress) of the jobs submitted by this runner and not finished yet
+        self.__active: dict[str, tuple[asyncio.Task, Progress]] = dict()
+
+    async def submit(
+        self, run: Callable[[Progress], Awaitable[dict]], params: Optional[dict] = None
+    ) -> dict:
+        """
+        Creates a job and schedules it, without waiting for it to start
+
+        Args:
+            run: Callable[[Progress], Awaitable[dict]] -> Builds the coroutine of the job, which
+                    reports its progress in the Progress received and returns a
+                    JSON-serializable result
+            params: Optional[dict] -> JSON-serializable parameters of the job, kept with it
+
+        Returns:
+            dict -> The job created
+        """
+        if self.__semaphore is None:  # Created lazily, inside the event loop
+            self.__semaphore = asyncio.Semaphore(self.__max_concurrent)
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "job_id": job_id,
+            "status": JOB_PENDING,
+            "params": params or dict(),
+            "created_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "progress": dict(),
+            "error": None,
+            "result": None,
+        }
+        await asyncio.to_thread(self.__job_store.save, job_id, job)
+
+        progress = Progress()
+        task = asyncio.ensure_future(self.__run(job_id, run, progress))
+        self.__active[job_id] = (task, progress)
+        task.add_done_callback(lambda _: self.__active.pop(job_id, None))
+
+        logger.info(f"Job {job_id} submitted")
+        return job
+
+    async def __run(
+        self,
+        job_id: str,
+        run: Callable[[Progress], Awaitable[dict]],
+        progress: Progress,
+    ) -> None:
+        finishing = False
+
+        try:
+            async with self.__semaphore:
+                await asyncio.to_thread(
+                    self.__job_store.update,
+                    job_id,
+                    status=JOB_RUNNING,
+                    started_at=_now(),
+                )
+
+                try:
+                    result = await run(progress)
+
+                except Exception as e:
+                    logger.error(f"Job {job_id} failed: {e}")
+                    changes = {"status": JOB_FAILED, "error": str(e)}
+
+                else:
+                    logger.info(f"Job {job_id} succeeded")
+                    changes = {"status": JOB_SUCCEEDED, "result": result}
+
+                finishing = True
+                await asyncio.to_thread(self.__finish, job_id, progress, changes)
+
+        except BaseException as e:
+            # Cancelled (e.g. on shutdown) or interrupted while pending or running, so the job
+            # must not be left as such. Written without awaiting, as the task could be
+            # cancelled again
+            if not finishing:
+                error = (
+                    "Job cancelled"
+                    if isinstance(e, asyncio.CancelledError)
+                    else repr(e)
+                )
+                logger.error(f"Job {job_id} failed: {error}")
+                self.__finish(job_id, progress, {"status": JOB_FAILED, "error": error})
+            raise
+
+    def __finish(self, job_id: str, progress: Progress, changes: dict) -> None:
+        self.__job_store.update(
+            job_id, finished_at=_now(), progress=progress.snapshot(), **changes
+        )
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        """
+        Args:
+            job_id: str -> Id of the job
+
+        Returns:
+            Optional[dict] -> The job, with its current progress if it is running. None if
+                              there is no job with that id
+        """
+        job = await asyncio.to_thread(self.__job_store.get, job_id)
+
+        if job is not None and job_id in self.__active:
+            _, progress = self.__active[job_id]
+            job["progress"] = progress.snapshot()
+
+        return job
+
+    def active_jobs(self) -> int:
+        """
+        Returns:
+            int -> Number of jobs submitted by this runner that are pending or running
+        """
+        return len(self.__active)
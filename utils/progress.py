@@ -0,0 +1,44 @@
+import threading
+
+
+class Progress:
+    """
+    Counters of the progress of a long-running task (e.g. feeds done, rows stored), shared by
+    all the stages that work on it. Safe to update from several threads.
+
+    Usage:
+        progress = Progress()
+        progress.set("feeds_total", len(feed_urls))
+        progress.increment("feeds_done")
+        progress.snapshot()  # {"feeds_total": 3, "feeds_done": 1}
+    """
+
+    def __init__(self):
+        self.__counters: dict[str, int] = dict()
+        self.__lock = threading.Lock()
+
+    def set(self, name: str, value: int) -> None:
+        """
+        Args:
+            name: str -> Name of the counter
+            value: int -> New value of the counter
+        """
+        with self.__lock:
+            self.__counters[name] = value
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """
+        Args:
+            name: str -> Name of the counter. Starts at zero if it was not set
+            amount: int -> Amount added to the counter
+        """
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + amount
+
+    def snapshot(self) -> dict[str, int]:
+        """
+        Returns:
+            dict[str, int] -> Copy of the current value of the counters
+        """
+        with self.__lock:
+            return dict(self.__counters)
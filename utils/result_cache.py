@@ -0,0 +1,152 @@
+import asyncio
+import time
+from collections import OrderedDict
+from loguru import logger
+from typing import Any, Awaitable, Callable, Optional
+
+
+class AsyncResultCache:
+    """
+    In-memory cache of the results of coroutines, keyed by a string. Results expire after a
+    TTL, and the least recently used ones are evicted once max_entries is reached.
+
+    Concurrent calls with the same key are coalesced (single-flight): only the first one runs
+    the coroutine, and the rest wait for its result. The shared execution is shielded, so a
+    caller being cancelled (e.g. its client disconnected) does not cancel it for the others,
+    but it is cancelled once no caller is waiting for it anymore.
+
+    Must be used from a single event loop
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 128):
+        """
+        Args:
+            ttl_seconds: float -> Seconds a result is valid since it was computed
+            max_entries: int -> Maximum number of results kept
+        """
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be greater than zero")
+        if not isinstance(max_entries, int) or max_entries < 1:
+            raise ValueError("max_entries must be a positive integer")
+
+        self.__ttl_seconds = ttl_seconds
+        self.__max_entries = max_entries
+
+        # key -> (expires_at, result)
+        self.__results: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self.__in_flight: dict[str, asyncio.Task] = dict()
+        # Callers waiting for each execution in flight
+        self.__waiters: dict[asyncio.Task, int] = dict()
+        self.__counters = {"hits": 0, "misses": 0, "coalesced": 0}
+
+    def __get_valid_result(self, key: str) -> tuple[bool, Any]:
+        if key not in self.__results:
+            return False, None
+
+        expires_at, result = self.__results[key]
+        if time.monotonic() >= expires_at:
+            del self.__results[key]
+            return False, None
+
+        self.__results.move_to_end(key)
+        return True, result
+
+    def __store(self, key: str, result: Any) -> None:
+        self.__results[key] = (time.monotonic() + self.__ttl_seconds, result)
+        self.__results.move_to_end(key)
+
+        while len(self.__results) > self.__max_entries:
+            self.__results.popitem(last=False)
+
+    async def __wait(self, flight_key: str, task: asyncio.Task) -> Any:
+        """
+        Waits for an execution in flight, cancelling it if the caller was the last one waiting
+        """
+        self.__waiters[task] = self.__waiters.get(task, 0) + 1
+
+        try:
+            return await asyncio.shield(task)
+
+        finally:
+            self.__waiters[task] -= 1
+
+            if self.__waiters[task] == 0:
+                del self.__waiters[task]
+
+                if not task.done():
+                    logger.info(f"No caller waiting for {flight_key}, cancelling it")
+                    # Removed right away, so a new call does not wait for the cancelled one
+                    if self.__in_flight.get(flight_key) is task:
+                        del self.__in_flight[flight_key]
+                    task.cancel()
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        should_cache: Optional[Callable[[Any], bool]] = None,
+        flight_key: Optional[str] = None,
+    ) -> Any:
+        """
+        Gets the result of the key, computing it if it is not cached nor being computed
+
+        Args:
+            key: str -> Key of the result
+            compute: Callable[[], Awaitable[Any]] -> Builds the coroutine computing the result
+            should_cache: Optional[Callable[[Any], bool]] -> Decides if a result is cached
+                            (e.g. partial results should not). All of them are if None
+            flight_key: Optional[str] -> Key used to coalesce the concurrent calls, key if
+                            None. Calls with the same key but a different flight_key share the
+                            cached result, but not its computation (e.g. if their time budgets
+                            differ)
+
+        Returns:
+            Any -> The result. Errors raised while computing it are raised to every caller
+                   waiting for it, and are not cached
+        """
+        found, result = self.__get_valid_result(key)
+        if found:
+            self.__counters["hits"] += 1
+            return result
+
+        flight_key = key if flight_key is None else flight_key
+
+        if flight_key in self.__in_flight:
+            self.__counters["coalesced"] += 1
+            return await self.__wait(flight_key, self.__in_flight[flight_key])
+
+        self.__counters["misses"] += 1
+
+        async def compute_and_store() -> Any:
+            try:
+                result = await compute()
+
+                if should_cache is None or should_cache(result):
+                    self.__store(key, result)
+
+                return result
+
+            finally:
+                if self.__in_flight.get(flight_key) is asyncio.current_task():
+                    del self.__in_flight[flight_key]
+
+        task = asyncio.ensure_future(compute_and_store())
+        self.__in_flight[flight_key] = task
+        # Retrieves the exception if nobody is waiting anymore, to avoid asyncio warnings
+        task.add_done_callback(
+            lambda done_task: done_task.cancelled() or done_task.exception()
+        )
+
+        return await self.__wait(flight_key, task)
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns:
+            dict[str, int] -> Number of results cached and in flight, and the hit, miss and
+                              coalesced request counters
+        """
+        return {
+            "entries": len(self.__results),
+            "in_flight": len(self.__in_flight),
+            **self.__counters,
+        }
@@ -0,0 +1,136 @@
+import argparse
+import re
+import subprocess
+import sys
+from typing import Optional
+
+# Line written by python -X importtime: "import time: <self us> | <cumulative us> | <module>"
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+
+class ImportProfile:
+    """
+    Import times of a module and of every module imported by it, measured by
+    profile_imports in a fresh interpreter
+    """
+
+    def __init__(self, module: str, import_times: dict[str, tuple[float, float]]):
+        """
+        Args:
+            module: str -> Module profiled
+            import_times: dict[str, tuple[float, float]] -> Seconds spent importing each
+                            module, by itself and including the modules it imported
+        """
+        self.__module = module
+        self.__import_times = import_times
+
+    @property
+    def module(self) -> str:
+        return self.__module
+
+    @property
+    def total_seconds(self) -> float:
+        """
+        Seconds spent importing the module profiled, including everything it imported
+        """
+        return self.__import_times.get(self.__module, (0.0, 0.0))[1]
+
+    def imported_modules(self, prefix: str = "") -> list[str]:
+        """
+        Args:
+            prefix: str -> Only the modules whose name starts with it are returned
+
+        Returns:
+            list[str] -> Modules imported, sorted by name
+        """
+        return sorted(name for name in self.__import_times if name.startswith(prefix))
+
+    def slowest(
+        self, top: int = 20, cumulative: bool = True
+    ) -> list[tuple[str, float]]:
+        """
+        Args:
+            top: int -> Number of modules returned
+            cumulative: bool -> Sort by the time including the modules imported by each
+                                module, otherwise by the time spent in the module itself
+
+        Returns:
+            list[tuple[str, float]] -> Names and seconds of the slowest modules to import
+        """
+        position = 1 if cumulative else 0
+        import_times = [
+            (name, times[position]) for name, times in self.__import_times.items()
+        ]
+
+        return sorted(import_times, key=lambda item: item[1], reverse=True)[:top]
+
+    def report(self, top: int = 20) -> str:
+        """
+        Returns:
+            str -> Table of the slowest modules to import, in milliseconds
+        """
+        lines = [f"Import of {self.__module}: {self.total_seconds * 1000:.0f} ms"]
+        lines.append(f"{'cumulative ms':>14} {'self ms':>9}  module")
+
+        for name, cumulative_seconds in self.slowest(top):
+            self_seconds = self.__import_times[name][0]
+            lines.append(
+                f"{cumulative_seconds * 1000:>14.1f} {self_seconds * 1000:>9.1f}  {name}"
+            )
+
+        return "\n".join(lines)
+
+
+def profile_imports(
+    module: str, python_executable: Optional[str] = None
+) -> ImportProfile:
+    """
+    Measures the time needed to import a module in a fresh interpreter, as on a cold start,
+    using python -X importtime
+
+    Args:
+        module: str -> Name of the module to import (e.g. news_extraction_pipeline.app.main)
+        python_executable: Optional[str] -> Interpreter used. The current one if None
+
+    Returns:
+        ImportProfile -> Import times of the module and its dependencies
+    """
+    if not isinstance(module, str) or module.strip() == "":
+        raise ValueError("module must be a non-empty string")
+
+    completed_process = subprocess.run(
+        [
+            python_executable or sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            f"import {module}",
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    if completed_process.returncode != 0:
+        raise ValueError(
+            f"Error importing {module}: {completed_process.stderr.strip().splitlines()[-1]}"
+        )
+
+    import_times = dict()
+    for line in completed_process.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, name = match.groups()
+            import_times[name] = (int(self_us) / 1e6, int(cumulative_us) / 1e6)
+
+    return ImportProfile(module, import_times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Report the slowest modules to import on a cold start"
+    )
+    parser.add_argument("module", help="Module to import")
+    parser.add_argument("--top", type=int, default=20, help="Number of modules listed")
+    args = parser.parse_args()
+
+    print(profile_imports(args.module).report(top=args.top))
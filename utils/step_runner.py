@@ -0,0 +1,156 @@
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from loguru import logger
+from typing import Callable, Iterator, Optional
+
+# tracemalloc is global to the process, so only one step at a time traces the memory, and the
+# steps started meanwhile (e.g. by concurrent runs) do not record it
+_memory_tracing_lock = threading.Lock()
+
+
+class StepMetrics:
+    """
+    Measures of a single step run by a StepRunner. The step sets rows_out itself, once its
+    output is known
+    """
+
+    def __init__(self, name: str, rows_in: Optional[int] = None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out: Optional[int] = None
+        self.wall_seconds: Optional[float] = None
+        self.cpu_seconds: Optional[float] = None
+        self.peak_memory_delta_bytes: Optional[int] = None
+        self.failed = False
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "peak_memory_delta_bytes": self.peak_memory_delta_bytes,
+            "failed": self.failed,
+        }
+
+
+class StepRunner:
+    """
+    Wraps the steps of a pipeline run, recording the wall time, CPU time, rows in and out and,
+    optionally, the peak memory allocated by each one, to build a report of the run.
+
+    CPU time is the one of the whole process, so it is approximate while other runs or tasks
+    are working at the same time. Memory is traced with tracemalloc, which is also global and
+    slows down allocations, so it is only enabled on demand, and a step started while another
+    one is tracing the memory leaves its peak_memory_delta_bytes as None. The peak still
+    includes the allocations of other tasks running during the step.
+
+    Usage:
+        step_runner = StepRunner("news_extraction_pipeline")
+        with step_runner.step("filter_by_date", rows_in=len(df)) as step:
+            df = filter_by_date_threshold(df, ...)
+            step.rows_out = len(df)
+        step_runner.log_report()
+    """
+
+    def __init__(
+        self,
+        name: str,
+        trace_memory: bool = False,
+        on_step_finished: Optional[Callable[[StepMetrics], None]] = None,
+    ):
+        """
+        Args:
+            name: str -> Name of the run, included in its report
+            trace_memory: bool -> Record the peak memory allocated by each step
+            on_step_finished: Optional[Callable[[StepMetrics], None]] -> Receives the metrics
+                                of each step once it finishes (e.g. to export them)
+        """
+        self.__name = name
+        self.__trace_memory = trace_memory
+        self.__on_step_finished = on_step_finished
+        self.__steps: list[StepMetrics] = list()
+        self.__started_at = time.perf_counter()
+
+    @contextmanager
+    def step(self, name: str, rows_in: Optional[int] = None) -> Iterator[StepMetrics]:
+        """
+        Measures the code run inside the context as a step. Steps raising an error are
+        recorded as failed, and the error is raised again
+
+        Args:
+            name: str -> Name of the step
+            rows_in: Optional[int] -> Rows received by the step
+
+        Returns:
+            Iterator[StepMetrics] -> Metrics of the step, to set its rows_out
+        """
+        metrics = StepMetrics(name, rows_in)
+        self.__steps.append(metrics)
+
+        tracing_memory = self.__trace_memory and _memory_tracing_lock.acquire(
+            blocking=False
+        )
+        started_tracing = False
+        if tracing_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            memory_before, _ = tracemalloc.get_traced_memory()
+
+        elif self.__trace_memory:
+            logger.debug(
+                f"Memory of step {name} not traced, another step is tracing it"
+            )
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            yield metrics
+
+        except BaseException:
+            metrics.failed = True
+            raise
+
+        finally:
+            metrics.wall_seconds = round(time.perf_counter() - wall_start, 6)
+            metrics.cpu_seconds = round(time.process_time() - cpu_start, 6)
+
+            if tracing_memory:
+                _, peak_memory = tracemalloc.get_traced_memory()
+                metrics.peak_memory_delta_bytes = max(0, peak_memory - memory_before)
+                if started_tracing:
+                    tracemalloc.stop()
+                _memory_tracing_lock.release()
+
+            if self.__on_step_finished is not None:
+                self.__on_step_finished(metrics)
+
+    def report(self) -> dict:
+        """
+        Returns:
+            dict -> Name and total wall time of the run, and the metrics of each step
+        """
+        return {
+            "run": self.__name,
+            "total_wall_seconds": round(time.perf_counter() - self.__started_at, 6),
+            "steps": [metrics.to_dict() for metrics in self.__steps],
+        }
+
+    def log_report(self) -> dict:
+        """
+        Logs the report of the run as a single JSON record
+
+        Returns:
+            dict -> The report logged
+        """
+        report = self.report()
+        logger.info(json.dumps({"event": "run_report", **report}))
+
+        return report